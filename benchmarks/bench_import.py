@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# benchmarks/bench_import.py
+#
+# Import-time regression check for CLI startup. Runs `filetools --version`,
+# `filetools --help` and a full debug run under `python -X importtime` and
+# reports the cumulative import time of each. The run fails if --version or
+# --help imports any of the modules the commands defer, or if the median import
+# time of a cheap command is over --budget-ms.
+#
+# Usage:
+#   python -m benchmarks.bench_import
+#   python -m benchmarks.bench_import --runs 10 --budget-ms 40
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# Loaded by commands that do work, never by --version or --help
+_DEFERRED = [
+    "colorlog",
+    "filetools.logger",
+    "filetools.moving_files",
+    "filetools.naming_files",
+    "filetools.pipeline",
+    "filetools.planner",
+    "filetools.rules",
+    "filetools.shows_map",
+    "filetools.utils",
+    "filetools.watcher",
+]
+
+# Command name, CLI arguments, modules it must not import (None: not checked)
+_COMMANDS = [
+    ("--version", ["--version"], _DEFERRED),
+    ("--help", ["--help"], [*_DEFERRED, "filetools.settings", "importlib.metadata"]),
+    ("debug run", ["--debug", "--batch", "-rn"], None),
+]
+
+_RUNNER = "import sys; from filetools.cli import main; sys.argv[0] = 'filetools'; main()"
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def import_times(args: list[str], cwd: str) -> dict[str, int]:
+    """Run the CLI under -X importtime and return cumulative microseconds per top-level import."""
+    result = subprocess.run(  # noqa: S603 - this interpreter with fixed arguments
+        [sys.executable, "-X", "importtime", "-c", _RUNNER, *args],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        # Nested imports keep their indentation after the separating space
+        times[name[1:]] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    """Time each command's imports and check that cheap commands stay cheap."""
+    parser = argparse.ArgumentParser(description="Check filetools CLI import time")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command, the median is reported")
+    parser.add_argument(
+        "--budget-ms", type=float, help="Fail if --version or --help imports take longer"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as work_dir:
+        for label, cli_args, forbidden in _COMMANDS:
+            runs = [import_times([*cli_args, work_dir], work_dir) for _ in range(args.runs)]
+            # Imports nest; the outermost entries add up to the whole import time
+            totals = [sum(t for name, t in times.items() if not name.startswith(" ")) for times in runs]
+            median_ms = statistics.median(totals) / 1000
+            loaded = {name.strip() for name in runs[0]}
+            print(f"{label:>10}: {median_ms:7.1f} ms imports, {len(loaded)} modules")
+
+            if forbidden is None:
+                continue
+            unexpected = sorted(name for name in forbidden if name in loaded)
+            if unexpected:
+                print(f"            imports deferred modules: {', '.join(unexpected)}")
+                failed = True
+            if args.budget_ms is not None and median_ms > args.budget_ms:
+                print(f"            over budget of {args.budget_ms:g} ms")
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
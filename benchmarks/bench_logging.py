@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+#
+# benchmarks/bench_logging.py
+#
+# Per-file logging overhead at INFO. Replays the log calls one file makes on its
+# way through extract, rename and move (four INFO records plus the DEBUG calls
+# that are filtered out) for --count synthetic files, against:
+#   - the old setup: two console handlers with complementary level filters and
+#     f-string messages, formatted even when DEBUG is off
+#   - the current setup: one LevelDispatchHandler and lazy %-style arguments
+#   - the current setup with the --log-json JSON lines sink added
+# Console output goes to os.devnull so only the logging cost is measured.
+#
+# Usage:
+#   python -m benchmarks.bench_logging
+#   python -m benchmarks.bench_logging --count 10000 --rounds 5
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import argparse
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.synthetic import make_names
+from filetools.logger import QUESTION, LevelDispatchHandler, setup_logger
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def eager_file_calls(log: logging.Logger, src: Path, dest: Path, size: int) -> None:
+    """The log calls for one file, with messages built as f-strings."""
+    log.debug(f"Checking file: {src.name}")
+    log.info(f"Extracting: {src} -> {src.parent.parent / src.name}")
+    log.debug(f"Sanitized: {src.stem} -> {dest.stem}")
+    log.info(f"Renaming.....{src.name} -> {dest.name}")
+    log.debug(f"Creating directory: {dest.parent}")
+    log.info(f"Moving: {src} -> {dest}")
+    log.info(f"Moved in {0.0:.3f} seconds")
+    log.debug(f"Recorded move of {size} bytes: {src} -> {dest}")
+
+
+def lazy_file_calls(log: logging.Logger, src: Path, dest: Path, size: int) -> None:
+    """The log calls for one file, with lazy %-style arguments and event fields."""
+    log.debug("Checking file: %s", src.name)
+    log.info(
+        "Extracting: %s -> %s",
+        src,
+        src.parent.parent / src.name,
+        extra={"event": "extract", "src": src, "dest": src.parent.parent / src.name},
+    )
+    log.debug("Sanitized: %s -> %s", src.stem, dest.stem)
+    log.info(
+        "Renaming.....%s -> %s",
+        src.name,
+        dest.name,
+        extra={"event": "rename", "src": src, "dest": dest},
+    )
+    log.debug("Creating directory: %s", dest.parent)
+    log.info("Moving: %s -> %s", src, dest)
+    log.info(
+        "Moved in %.3f seconds",
+        0.0,
+        extra={"event": "move", "src": src, "dest": dest, "bytes": size, "seconds": 0.0},
+    )
+    log.debug("Recorded move of %s bytes: %s -> %s", size, src, dest)
+
+
+def legacy_logger(name: str, stream: object) -> logging.Logger:
+    """A logger set up the way setup_logger() did before: a handler pair with level filters."""
+    dispatch = setup_logger(name=name)
+    handler = next(h for h in dispatch.handlers if isinstance(h, LevelDispatchHandler))
+    dispatch.removeHandler(handler)
+
+    info_question_handler = logging.StreamHandler(stream)
+    info_question_handler.setFormatter(handler._formatters[logging.INFO])
+    info_question_handler.addFilter(lambda record: record.levelno in (logging.INFO, QUESTION))
+
+    standard_handler = logging.StreamHandler(stream)
+    standard_handler.setFormatter(handler._default)
+    standard_handler.addFilter(lambda record: record.levelno not in (logging.INFO, QUESTION))
+
+    dispatch.addHandler(info_question_handler)
+    dispatch.addHandler(standard_handler)
+    return dispatch
+
+
+def current_logger(name: str, stream: object, json_path: Path | None = None) -> logging.Logger:
+    """A logger from setup_logger() with its console output sent to stream."""
+    log = setup_logger(name=name, json_path=json_path)
+    for handler in log.handlers:
+        if isinstance(handler, LevelDispatchHandler):
+            handler.setStream(stream)
+    return log
+
+
+def time_files(
+    calls: Callable[..., None], log: logging.Logger, files: list[tuple[Path, Path, int]], rounds: int
+) -> float:
+    """Best time over rounds for making one file's log calls for every file."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for src, dest, size in files:
+            calls(log, src, dest, size)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Time each logging setup over the same synthetic files at INFO."""
+    parser = argparse.ArgumentParser(description="Measure per-file logging overhead at INFO")
+    parser.add_argument("--count", type=int, default=10_000, help="Synthetic files to log")
+    parser.add_argument("--rounds", type=int, default=5, help="Runs per setup, the best is reported")
+    args = parser.parse_args()
+
+    source = Path("/srv/downloads")
+    files = []
+    for index, name in enumerate(make_names(args.count)):
+        src = source / name / f"{name}.mkv"
+        dest = Path("/srv/library") / name.split(".")[0].lower() / f"{name.lower()}.mkv"
+        files.append((src, dest, index * 1_048_576))
+
+    with open(os.devnull, "w") as devnull, tempfile.TemporaryDirectory() as work_dir:
+        setups = [
+            ("two handlers, f-strings", eager_file_calls, legacy_logger("bench.legacy", devnull)),
+            ("dispatch, lazy args", lazy_file_calls, current_logger("bench.current", devnull)),
+            (
+                "dispatch + JSON lines",
+                lazy_file_calls,
+                current_logger("bench.json", devnull, Path(work_dir, "log.jsonl")),
+            ),
+        ]
+        baseline = None
+        for label, calls, log in setups:
+            log.propagate = False
+            elapsed = time_files(calls, log, files, args.rounds)
+            per_file = elapsed / len(files) * 1e6
+            baseline = baseline or elapsed
+            print(
+                f"{label:>24}: {per_file:6.2f} us/file  {baseline / elapsed:5.2f}x  (best of {args.rounds})"
+            )
+            for handler in log.handlers:
+                handler.close()
+
+        # The DEBUG calls alone, which INFO filters out before any handler runs
+        quiet = logging.getLogger("bench.quiet")
+        quiet.setLevel(logging.INFO)
+        quiet.propagate = False
+        eager = time_files(
+            lambda lg, s, d, n: lg.debug(f"Moving: {s} -> {d} ({n} bytes)"), quiet, files, 5
+        )
+        lazy = time_files(
+            lambda lg, s, d, n: lg.debug("Moving: %s -> %s (%s bytes)", s, d, n), quiet, files, 5
+        )
+        print(
+            f"{'disabled DEBUG call':>24}: f-string {eager / len(files) * 1e6:5.2f} us  "
+            f"lazy {lazy / len(files) * 1e6:5.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
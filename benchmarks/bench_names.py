@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#
+# benchmarks/bench_names.py
+#
+# Per-name cost of sanitize_show_name() and _format_movie_name() against the
+# versions with the redundant replace passes, over a corpus of release names. Both
+# versions must produce the same names; any difference is printed and fails the
+# run. Without --names a corpus of scene-style release names is generated.
+#
+# Usage:
+#   python -m benchmarks.bench_names --count 50000
+#   python -m benchmarks.bench_names --names release_names.txt
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import argparse
+import logging
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.synthetic import make_names
+from filetools import CONFIG
+from filetools.naming_files import _format_movie_name, sanitize_show_name
+from filetools.utils import CLASSIFIER, FilenameInfo
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def legacy_sanitize_show_name(show_name: str) -> str:
+    """sanitize_show_name() as it was before the redundant passes were dropped."""
+    log.debug(f"\tshow_name: {show_name}")
+    sanitized_filename = show_name
+    for word in CONFIG.name_cleanup_flags:
+        sanitized_filename = sanitized_filename.replace(word, "")
+    log.debug(f"\tsanitized_filename: {sanitized_filename}")
+    sanitized_filename = sanitized_filename.lstrip().lstrip(".").rstrip(".")
+    sanitized_filename = (
+        sanitized_filename.replace(" ", "_")
+        .replace(".", "_")
+        .replace("'", "")
+        .replace(",", "")
+        .replace("!", "")
+        .replace("?", "")
+        .replace("-", "_")
+        .replace("_-_", "_")
+    )
+    prev_name = ""
+    while prev_name != sanitized_filename:
+        prev_name = sanitized_filename
+        sanitized_filename = sanitized_filename.replace("__", "_")
+        sanitized_filename = sanitized_filename.strip("_")
+    return sanitized_filename.lower()
+
+
+def legacy_format_movie_name(filename_wo_ext: str, file_ext: str, info: FilenameInfo) -> str:
+    """_format_movie_name() as it was before the redundant passes were dropped."""
+    info = info or CLASSIFIER.classify(filename_wo_ext)
+    fk = "-4K" if info.uhd else ""
+    hdr = "-hdr" if info.hdr else ""
+    if "." in filename_wo_ext:
+        filename_wo_ext = "_".join(filename_wo_ext.split(".")).lower()
+    filename_wo_ext = filename_wo_ext.replace(" (", "_").replace(" ", "_").replace("'", "").lower()
+    year = info.year
+    if year:
+        return f"{filename_wo_ext.split(year)[0]}({year}){fk}{hdr}{file_ext}"
+    log.warning(f"Failed to rename {filename_wo_ext}: No valid year found.")
+    return filename_wo_ext + file_ext
+
+
+def time_calls(func: Callable[..., str], calls: list[tuple], rounds: int) -> tuple[float, list[str]]:
+    """Best time over rounds for calling func with every argument tuple."""
+    best = float("inf")
+    results: list[str] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = [func(*args) for args in calls]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main() -> None:
+    """Classify the corpus once, then time both versions of each function."""
+    parser = argparse.ArgumentParser(description="Compare name sanitization before and after")
+    parser.add_argument("--count", type=int, default=50_000, help="Release names to generate")
+    parser.add_argument("--names", type=Path, help="File of release names, one per line")
+    parser.add_argument("--rounds", type=int, default=5, help="Runs per version")
+    args = parser.parse_args()
+    log.setLevel(logging.ERROR)
+
+    if args.names:
+        names = [line.strip() for line in args.names.read_text().splitlines() if line.strip()]
+    else:
+        names = make_names(args.count)
+
+    show_calls = []
+    movie_calls = []
+    for name in names:
+        lowered = name.lower()
+        info = CLASSIFIER.classify(lowered)
+        if info.show_name and info.season_episode:
+            show_calls.append((info.show_name,))
+        else:
+            movie_calls.append((lowered, ".mkv", info))
+    print(f"{len(names)} names: {len(show_calls)} shows, {len(movie_calls)} movies")
+
+    failed = False
+    for label, old, new, calls in (
+        ("show", legacy_sanitize_show_name, sanitize_show_name, show_calls),
+        ("movie", legacy_format_movie_name, _format_movie_name, movie_calls),
+    ):
+        if not calls:
+            continue
+        old_time, old_names = time_calls(old, calls, args.rounds)
+        new_time, new_names = time_calls(new, calls, args.rounds)
+        diffs = [
+            (call[0], a, b) for call, a, b in zip(calls, old_names, new_names, strict=True) if a != b
+        ]
+        for original, a, b in diffs[:10]:
+            print(f"  {label} mismatch: {original!r}: {a!r} != {b!r}")
+        failed = failed or bool(diffs)
+
+        per_old = old_time / len(calls) * 1e6
+        per_new = new_time / len(calls) * 1e6
+        print(
+            f"{label:>6}: before {per_old:6.2f} us/name  after {per_new:6.2f} us/name  "
+            f"{old_time / new_time:5.2f}x  ({len(diffs)} mismatches, best of {args.rounds})"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
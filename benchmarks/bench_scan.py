@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+# benchmarks/bench_scan.py
+#
+# Compares the nested dir_scan() passes that extract and cleanup used to make
+# over a download directory with one shared TreeScan snapshot. On a warm local
+# page cache a directory listing is nearly free; --latency-ms adds a delay per
+# scandir() call to model a cold disk or a network mount.
+#
+# Usage:
+#   python -m benchmarks.bench_scan --entries 100000 --dir /mnt/downloads
+#   python -m benchmarks.bench_scan --latency-ms 0.5
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.latency import SimulatedLatency
+from filetools.utils import WORK_TREE_DEPTH, TreeScan, dir_scan
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def make_tree(root: Path, entries: int, files_per_dir: int) -> int:
+    """Create download folders holding empty files, entries in total.
+
+    Returns:
+        int: Number of entries created
+    """
+    dirs = max(1, entries // (files_per_dir + 1))
+    names = ["Show.Name.S01E01.1080p.mkv", "info.nfo", "sample.mkv", "cover.jpg", "eng.srt"]
+    for d in range(dirs):
+        folder = root / f"Release.{d:06}.S01E01.1080p"
+        folder.mkdir()
+        for f in range(files_per_dir):
+            (folder / f"{f:02}_{names[f % len(names)]}").touch()
+    return dirs * (files_per_dir + 1)
+
+
+def nested_passes(root: Path) -> int:
+    """Extract-then-cleanup as two nested dir_scan() walks."""
+    seen = 0
+    for _ in range(2):
+        for dir_obj in dir_scan(root):
+            seen += len(dir_scan(dir_obj.path, True))
+    return seen
+
+
+def single_pass(root: Path) -> int:
+    """Extract-then-cleanup reading one TreeScan snapshot."""
+    tree = TreeScan(root, WORK_TREE_DEPTH, scandir=os.scandir)
+    seen = 0
+    for _ in range(2):
+        for dir_obj in tree.dirs(root):
+            seen += len(tree.files(dir_obj.path))
+    return seen
+
+
+def main() -> None:
+    """Build the synthetic tree and print the best time of each approach."""
+    parser = argparse.ArgumentParser(description="Compare nested dir_scan() walks with one TreeScan")
+    parser.add_argument("--entries", type=int, default=100_000, help="Files and folders to create")
+    parser.add_argument("--files-per-dir", type=int, default=9, help="Files in each download folder")
+    parser.add_argument("--rounds", type=int, default=5, help="Runs per approach")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added per scandir() call")
+    parser.add_argument("--dir", type=Path, help="Directory to build the tree in")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        root = Path(tmp)
+        created = make_tree(root, args.entries, args.files_per_dir)
+        print(f"Tree of {created} entries in {root}")
+
+        results = {}
+        listings = {}
+        for name, func in (("nested", nested_passes), ("single", single_pass)):
+            timings = []
+            for _ in range(args.rounds):
+                with SimulatedLatency(args.latency_ms / 1000, ("scandir",)) as fs:
+                    start = time.perf_counter()
+                    func(root)
+                    timings.append(time.perf_counter() - start)
+            results[name] = min(timings)
+            listings[name] = fs.calls["scandir"]
+
+    for name, elapsed in results.items():
+        print(
+            f"{name:>8}: {elapsed * 1000:10.1f} ms  {listings[name]:>8} listings  (best of {args.rounds})"
+        )
+    print(f"{'speedup':>8}: {results['nested'] / results['single']:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+#
+# benchmarks/bench_shows_map.py
+#
+# Times a full make_shows_map() scan of synthetic show libraries with the
+# network folders checked one at a time and on the scan pool. --latency-ms adds
+# a delay per scandir() call to stand in for the round trip of a network mount,
+# where the pool pays off; on a local disk both take about the same time.
+#
+# Usage:
+#   python -m benchmarks.bench_shows_map --networks 200 --latency-ms 2
+#   python -m benchmarks.bench_shows_map --workers 16 --dir /mnt/nas/tmp
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.latency import SimulatedLatency
+from benchmarks.synthetic import make_show_libraries
+from filetools import CONFIG, shows_map
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def full_scan(workers: int, latency: float) -> tuple[float, int, str]:
+    """Run make_shows_map() without an index so every folder is listed.
+
+    Returns:
+        tuple[float, int, str]: Seconds taken, scandir() calls and the written map
+    """
+    shows_map._index_path().unlink(missing_ok=True)
+    shows_map.shows_map_path().unlink(missing_ok=True)
+    with SimulatedLatency(latency, ("scandir",)) as fs:
+        start = time.perf_counter()
+        shows_map.make_shows_map(workers, scandir=fs.scandir)
+        elapsed = time.perf_counter() - start
+    return elapsed, fs.calls["scandir"], shows_map.shows_map_path().read_text()
+
+
+def main() -> None:
+    """Build the libraries and print the best time with and without the pool."""
+    parser = argparse.ArgumentParser(description="Compare serial and pooled show library scans")
+    parser.add_argument("--libraries", type=int, default=2, help="Show libraries to create")
+    parser.add_argument("--networks", type=int, default=100, help="Network folders per library")
+    parser.add_argument("--shows", type=int, default=20, help="Show folders per network folder")
+    parser.add_argument("--workers", type=int, default=8, help="Pool size to compare with one worker")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Delay added per scandir() call")
+    parser.add_argument("--rounds", type=int, default=3, help="Scans per pool size")
+    parser.add_argument("--dir", type=Path, help="Directory to build the libraries in")
+    args = parser.parse_args()
+    logging.getLogger("filetools").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        root = Path(tmp)
+        CONFIG.shows = make_show_libraries(root, args.libraries, args.networks, args.shows)
+        CONFIG.settings_path = root / "settings.json"
+        print(
+            f"{args.libraries} libraries x {args.networks} networks x {args.shows} shows, "
+            f"{args.latency_ms:g} ms per listing"
+        )
+
+        results = {}
+        maps = {}
+        for workers in (1, args.workers):
+            timings = []
+            for _ in range(args.rounds):
+                elapsed, listings, maps[workers] = full_scan(workers, args.latency_ms / 1000)
+                timings.append(elapsed)
+            results[workers] = min(timings)
+            print(f"{workers:>3} workers: {results[workers] * 1000:10.1f} ms  {listings:>6} listings")
+
+    print(f"    speedup: {results[1] / results[args.workers]:10.2f}x")
+    print(f"  same map: {maps[1] == maps[args.workers]}")
+
+
+if __name__ == "__main__":
+    main()
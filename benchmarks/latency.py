@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+#
+# benchmarks/latency.py
+#
+# Stand-ins for a slow filesystem. SimulatedLatency delays and counts the os
+# calls that are a round trip to the server on an NFS or SMB mount (listings,
+# stats, renames, deletes), so a run on a local disk shows how the code would
+# behave on a network mount. cross_device() makes os.rename() fail with EXDEV,
+# so move_file() takes its copy path on a single filesystem.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import errno
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any, ParamSpec, TypeVar
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# os functions that are a server round trip on a network mount
+NFS_CALLS = ("scandir", "stat", "lstat", "mkdir", "rename", "replace", "rmdir", "unlink", "remove")
+
+_SCANDIR = os.scandir
+
+# Parameters and return type of an os function wrapped by SimulatedLatency
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class SimulatedLatency:
+    """Add a fixed delay to filesystem calls and count them.
+
+    Used as a context manager, the named os functions are replaced for the
+    duration. Functions that take a scandir argument bind os.scandir as their
+    default when they are defined, so pass them the scandir method instead.
+
+    Args:
+        latency: Seconds added to every call, 0 to only count calls
+        calls: Names of the os functions to slow down
+
+    Example:
+        >>> with SimulatedLatency(0.002) as fs:
+        ...     TreeScan(root, scandir=fs.scandir)
+        >>> fs.calls["scandir"]
+    """
+
+    def __init__(self: "SimulatedLatency", latency: float, calls: Iterable[str] = NFS_CALLS) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._names = tuple(calls)
+        self._real: dict[str, Callable[..., Any]] = {}
+
+    def __enter__(self: "SimulatedLatency") -> "SimulatedLatency":
+        self._real = {name: getattr(os, name) for name in self._names}
+        for name, func in self._real.items():
+            setattr(os, name, self._slow(name, func))
+        return self
+
+    def __exit__(self: "SimulatedLatency", *exc_info: object) -> None:
+        for name, func in self._real.items():
+            setattr(os, name, func)
+        self._real = {}
+
+    def scandir(self: "SimulatedLatency", path: str) -> Iterator[os.DirEntry]:
+        """os.scandir() with the delay, for functions that take a scandir argument."""
+        self._wait("scandir")
+        return self._real.get("scandir", _SCANDIR)(path)
+
+    def _slow(self: "SimulatedLatency", name: str, func: Callable[_P, _R]) -> Callable[_P, _R]:
+        """Wrap an os function so every call waits first."""
+
+        def call(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+            self._wait(name)
+            return func(*args, **kwargs)
+
+        return call
+
+    def _wait(self: "SimulatedLatency", name: str) -> None:
+        """Count a call and sleep for the round trip."""
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+@contextmanager
+def cross_device() -> Iterator[None]:
+    """Make os.rename() fail with EXDEV, as it does between two filesystems."""
+    real_rename = os.rename
+
+    def rename(
+        src: str | bytes | os.PathLike, dest: str | bytes | os.PathLike, **kwargs: int | None
+    ) -> None:
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV), str(src), None, str(dest))
+
+    os.rename = rename
+    try:
+        yield
+    finally:
+        os.rename = real_rename
@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+#
+# benchmarks/suite.py
+#
+# Benchmark suite for the hot paths of a run, on synthetic trees built to size:
+# the show library scan (full and incremental), finding files to extract and
+# folders to clean up in a transmission download directory, renaming and
+# sorting loose files, and moving sparse media files. --latency-ms delays every
+# filesystem round trip to stand in for an NFS or SMB mount, and --force-copy
+# makes moves take the cross-device copy path. Results are written as JSON; a
+# run given --compare fails if any benchmark is slower than the baseline by more
+# than --max-regression.
+#
+# Usage:
+#   python -m benchmarks.suite --entries 100000 --output results.json
+#   python -m benchmarks.suite --latency-ms 1 --only get_files_to_extract --only get_empty_dirs
+#   python -m benchmarks.suite --force-copy --media-size-mib 256 --dest-dir /mnt/nas/tmp
+#   python -m benchmarks.suite --compare baseline.json --max-regression 1.25
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import argparse
+import json
+import logging
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import filetools
+from benchmarks.latency import SimulatedLatency, cross_device
+from benchmarks.synthetic import (
+    make_download_tree,
+    make_loose_files,
+    make_media_files,
+    make_show_libraries,
+)
+from filetools import CONFIG, shows_map
+from filetools.moving_files import get_empty_dirs, get_files_to_extract, move_file
+from filetools.naming_files import rename_files
+from filetools.utils import CLASSIFIER, WORK_TREE_DEPTH, TreeScan, sort_media
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# Benchmarks in the order they run
+BENCHMARKS = (
+    "make_shows_map",
+    "make_shows_map_incremental",
+    "get_files_to_extract",
+    "get_empty_dirs",
+    "rename_files",
+    "sort_media",
+    "move_file",
+)
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def measure(
+    rounds: int,
+    latency: float,
+    run: Callable[[SimulatedLatency, Any], int],
+    setup: Callable[[], Any] | None = None,
+    teardown: Callable[[Any], None] | None = None,
+) -> dict[str, Any]:
+    """Time rounds calls of run under the simulated latency.
+
+    setup and teardown run outside the timing and the latency, before and after
+    every round.
+
+    Args:
+        rounds: Times to call run
+        latency: Seconds added to every filesystem call
+        run: Called with the SimulatedLatency and setup's result, returns the items handled
+        setup: Prepares a round, its result is passed to run and teardown
+        teardown: Undoes what a round changed
+
+    Returns:
+        dict[str, Any]: Best and median seconds, every round, items per round,
+            microseconds per item at the best time and the filesystem calls of one round
+    """
+    timings = []
+    items = 0
+    calls: dict[str, int] = {}
+    for _ in range(rounds):
+        state = setup() if setup else None
+        with SimulatedLatency(latency) as fs:
+            start = time.perf_counter()
+            items = run(fs, state)
+            timings.append(time.perf_counter() - start)
+        calls = dict(sorted(fs.calls.items()))
+        if teardown:
+            teardown(state)
+
+    best = min(timings)
+    return {
+        "best": best,
+        "median": statistics.median(timings),
+        "rounds": timings,
+        "items": items,
+        "us_per_item": best / items * 1e6 if items else None,
+        "fs_calls": calls,
+    }
+
+
+def compare(results: dict[str, Any], baseline_path: Path, max_regression: float) -> list[str]:
+    """Print each benchmark's best time against a baseline results file.
+
+    Returns:
+        list[str]: Benchmarks slower than the baseline by more than max_regression
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (version {baseline.get('version', '?')}):")
+
+    regressed = []
+    for name, result in results["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            print(f"{name:>28}: not in baseline")
+            continue
+        ratio = result["best"] / old["best"] if old["best"] else float("inf")
+        flag = ""
+        if ratio > max_regression:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:>28}: {old['best'] * 1000:10.1f} ms -> {result['best'] * 1000:10.1f} ms  {ratio:5.2f}x{flag}"
+        )
+    return regressed
+
+
+def run_suite(args: argparse.Namespace, root: Path, dest_root: Path) -> dict[str, dict[str, Any]]:
+    """Build the synthetic trees under root and run the selected benchmarks.
+
+    Returns:
+        dict[str, dict[str, Any]]: Results of measure() by benchmark name, in BENCHMARKS order
+    """
+    selected = [name for name in BENCHMARKS if not args.only or name in args.only]
+
+    # Show libraries, with the map and index kept next to a settings file of their own
+    CONFIG.shows = make_show_libraries(root / "libraries", args.libraries, args.networks, args.shows)
+    CONFIG.settings_path = root / "settings.json"
+    print(f"Show libraries: {args.libraries} x {args.networks} networks x {args.shows} shows")
+
+    results = {}
+    for bench in (_bench_shows_map, _bench_download, _bench_loose_files, _bench_move):
+        results.update(bench(args, selected, root, dest_root))
+    return results
+
+
+def main() -> None:
+    """Build the trees, run the suite and write the results."""
+    parser = argparse.ArgumentParser(description="Time the hot paths of a run on synthetic media trees")
+    parser.add_argument(
+        "--entries", type=int, default=10_000, help="Files and folders in the download directory"
+    )
+    parser.add_argument("--libraries", type=int, default=2, help="Show libraries to create")
+    parser.add_argument("--networks", type=int, default=100, help="Network folders per library")
+    parser.add_argument("--shows", type=int, default=20, help="Show folders per network folder")
+    parser.add_argument("--workers", type=int, default=8, help="Show library scan workers")
+    parser.add_argument("--loose", type=int, default=1_000, help="Loose files to rename and sort")
+    parser.add_argument("--move-files", type=int, default=20, help="Sparse videos to move")
+    parser.add_argument(
+        "--media-size-mib", type=int, default=16, help="Apparent size of each video; copies write it all"
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added per filesystem call")
+    parser.add_argument("--force-copy", action="store_true", help="Make moves copy as if across devices")
+    parser.add_argument("--dir", type=Path, help="Directory to build the trees in")
+    parser.add_argument("--dest-dir", type=Path, help="Directory to move files into, --dir if not set")
+    parser.add_argument("--only", action="append", choices=BENCHMARKS, help="Run only this benchmark")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Results JSON of an earlier run to compare with")
+    parser.add_argument(
+        "--max-regression", type=float, default=1.25, help="Slowdown over --compare that fails the run"
+    )
+    args = parser.parse_args()
+    for directory in (args.dir, args.dest_dir):
+        if directory is None:
+            continue
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            parser.error(f"can't use {directory}: {e.strerror}")
+    logging.getLogger("filetools").setLevel(logging.ERROR)
+
+    with (
+        tempfile.TemporaryDirectory(dir=args.dir) as tmp,
+        tempfile.TemporaryDirectory(dir=args.dest_dir or args.dir) as dest_tmp,
+    ):
+        started = datetime.now().astimezone()
+        results = run_suite(args, Path(tmp), Path(dest_tmp))
+
+    output = {
+        "version": filetools.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": started.isoformat(timespec="seconds"),
+        "params": {
+            name: str(value) if isinstance(value, Path) else value for name, value in vars(args).items()
+        },
+        "results": results,
+    }
+
+    print(f"\n{args.latency_ms:g} ms per filesystem call, best of {args.rounds}:")
+    for name, result in results.items():
+        per_item = f"{result['us_per_item']:10.2f} us/item" if result["us_per_item"] is not None else ""
+        print(
+            f"{name:>28}: {result['best'] * 1000:10.1f} ms  {result['items']:>8} items {per_item}  "
+            f"{sum(result['fs_calls'].values()):>8} fs calls"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        regressed = compare(output, args.compare, args.max_regression)
+        if regressed:
+            print(f"\nSlower than {args.max_regression:g}x the baseline: {', '.join(regressed)}")
+        sys.exit(1 if regressed else 0)
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _bench_download(
+    args: argparse.Namespace, selected: list[str], root: Path, dest_root: Path
+) -> dict[str, dict[str, Any]]:
+    """Time the extract and cleanup scans of a download directory, which only read it."""
+    if not {"get_files_to_extract", "get_empty_dirs"} & set(selected):
+        return {}
+    download = root / "transmission"
+    download.mkdir()
+    created = make_download_tree(download, args.entries)
+    print(
+        f"Download directory: {created['entries']} entries, {created['folders']} folders, "
+        f"{created['extracted']} extracted"
+    )
+
+    def find_extract(fs: SimulatedLatency, _: None) -> int:
+        get_files_to_extract(download, TreeScan(download, WORK_TREE_DEPTH, scandir=fs.scandir))
+        return created["entries"]
+
+    def find_empty(fs: SimulatedLatency, _: None) -> int:
+        get_empty_dirs(download, TreeScan(download, WORK_TREE_DEPTH, scandir=fs.scandir))
+        return created["entries"]
+
+    return {
+        name: measure(args.rounds, args.latency_ms / 1000, func)
+        for name, func in (("get_files_to_extract", find_extract), ("get_empty_dirs", find_empty))
+        if name in selected
+    }
+
+
+def _bench_loose_files(
+    args: argparse.Namespace, selected: list[str], root: Path, dest_root: Path
+) -> dict[str, dict[str, Any]]:
+    """Time renaming and sorting loose files with a cold classifier cache."""
+    latency = args.latency_ms / 1000
+    results = {}
+
+    # Renaming changes the files, so every round gets fresh ones
+    rename_rounds = iter(range(args.rounds))
+
+    def fresh_loose_files() -> Path:
+        target = root / f"rename_{next(rename_rounds)}"
+        target.mkdir()
+        make_loose_files(target, args.loose)
+        CLASSIFIER.cache_clear()
+        return target
+
+    def rename(fs: SimulatedLatency, target: Path) -> int:
+        rename_files(target, tree=TreeScan(target, WORK_TREE_DEPTH, scandir=fs.scandir))
+        return args.loose
+
+    if "rename_files" in selected:
+        results["rename_files"] = measure(args.rounds, latency, rename, fresh_loose_files, shutil.rmtree)
+
+    # Sorting reads renamed files; the deletable ones went with the rename
+    if "sort_media" in selected:
+        sort_dir = root / "sort"
+        sort_dir.mkdir()
+        make_loose_files(sort_dir, args.loose)
+        rename_files(sort_dir)
+
+        def sort(fs: SimulatedLatency, _: None) -> int:
+            files = TreeScan(sort_dir, WORK_TREE_DEPTH, scandir=fs.scandir).files(sort_dir)
+            sort_media(files)
+            return len(files)
+
+        results["sort_media"] = measure(args.rounds, latency, sort, CLASSIFIER.cache_clear)
+    return results
+
+
+def _bench_move(
+    args: argparse.Namespace, selected: list[str], root: Path, dest_root: Path
+) -> dict[str, dict[str, Any]]:
+    """Time moving sparse videos into dest_root, moving them back outside the timing."""
+    if "move_file" not in selected:
+        return {}
+    size = args.media_size_mib * 2**20
+    sources = make_media_files(root, args.move_files, size)
+    dest_dir = dest_root / "moved"
+    dest_dir.mkdir()
+
+    def move(fs: SimulatedLatency, _: None) -> int:
+        with cross_device() if args.force_copy else nullcontext():
+            for src in sources:
+                move_file(src, dest_dir / src.name)
+        return len(sources)
+
+    def move_back(_: None) -> None:
+        for src in sources:
+            shutil.move(dest_dir / src.name, src)
+
+    result = measure(args.rounds, args.latency_ms / 1000, move, teardown=move_back)
+    result["bytes"] = size * len(sources)
+    return {"move_file": result}
+
+
+def _bench_shows_map(
+    args: argparse.Namespace, selected: list[str], root: Path, dest_root: Path
+) -> dict[str, dict[str, Any]]:
+    """Time full make_shows_map() scans without an index, then incremental ones with it."""
+    latency = args.latency_ms / 1000
+    show_folders = args.libraries * args.networks * args.shows
+    results = {}
+
+    def clear_shows_map() -> None:
+        shows_map._index_path().unlink(missing_ok=True)
+        shows_map.shows_map_path().unlink(missing_ok=True)
+
+    def scan_shows(fs: SimulatedLatency, _: None) -> int:
+        shows_map.make_shows_map(args.workers, scandir=fs.scandir)
+        return show_folders
+
+    if "make_shows_map" in selected:
+        results["make_shows_map"] = measure(args.rounds, latency, scan_shows, clear_shows_map)
+    if "make_shows_map_incremental" in selected:
+        if not shows_map._index_path().exists():
+            shows_map.make_shows_map(args.workers)
+        results["make_shows_map_incremental"] = measure(args.rounds, latency, scan_shows)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+#
+# benchmarks/synthetic.py
+#
+# Builds synthetic media trees for the benchmarks: a transmission download
+# directory of release folders and loose files, show libraries of network and
+# show folders, and sparse media files to move. Media files are created sparse
+# with truncate(), so a tree of thousands of multi-GiB files takes no disk space
+# until something copies it.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import os
+import random
+from pathlib import Path
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# Entries per release folder: the folder, its video, .nfo, sample, Subs/ and Subs/eng.srt
+ENTRIES_PER_FOLDER = 6
+
+# One release folder in this many is still downloading
+DOWNLOADING_EVERY = 20
+
+# One release folder in this many has already had its video extracted
+LOOSE_EVERY = 10
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Words, quality tags and release groups release names are made of
+_WORDS = [
+    "the",
+    "office",
+    "us",
+    "wire",
+    "planet",
+    "earth",
+    "ii",
+    "marvel's",
+    "agents",
+    "of",
+    "s.h.i.e.l.d",
+    "doctor",
+    "who",
+    "mr.",
+    "robot",
+    "it's",
+    "always",
+    "sunny",
+    "bbc",
+    "pbs",
+    "nova",
+    "frontline",
+    "what",
+    "we",
+    "do",
+    "in",
+    "shadows",
+    "the-expanse",
+    "law",
+    "&",
+    "order",
+    "svu",
+    "grey's",
+    "anatomy",
+    "who?",
+    "wow!",
+    "and",
+    "so,",
+    "on",
+]
+_TAGS = [
+    "720p",
+    "1080p",
+    "2160p",
+    "WEB-DL",
+    "WEBRip",
+    "BluRay",
+    "x264",
+    "x265",
+    "HDR",
+    "DV",
+    "DDP5.1",
+    "AAC",
+]
+_GROUPS = ["NTb", "FLUX", "CAKES", "SPARKS", "GECKOS", "RARBG", "TEPES"]
+
+# --------------------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------------------
+
+
+def make_download_tree(root: Path, entries: int, media_size: int = 0, seed: int = 1) -> dict[str, int]:
+    """Fill root with release folders and loose files, about entries in total.
+
+    Every release folder holds an .nfo, a sample, and a Subs folder with a
+    subtitle. One folder in DOWNLOADING_EVERY still has a .part file next to its
+    video. One folder in LOOSE_EVERY has already been extracted: its video sits
+    at the top of root, every other time with a .txt, and the folder is left
+    for cleanup. The rest hold their video, ready to extract.
+
+    Args:
+        root: Existing, empty download directory
+        entries: Files and folders to create
+        media_size: Apparent size of each video in bytes, allocated sparse
+        seed: Seed for the release names
+
+    Returns:
+        dict[str, int]: Counts of entries, folders, extracted folders, loose files and video bytes
+    """
+    folders = max(1, entries // ENTRIES_PER_FOLDER)
+    created = {"entries": 0, "folders": folders, "extracted": 0, "loose_files": 0, "media_bytes": 0}
+
+    for index, name in enumerate(release_names(folders, seed)):
+        folder = root / name
+        subs = folder / "Subs"
+        subs.mkdir(parents=True)
+        make_file(folder / f"{name}.nfo")
+        make_file(folder / "sample.mkv")
+        make_file(subs / "eng.srt")
+        created["entries"] += ENTRIES_PER_FOLDER - 1
+        created["media_bytes"] += media_size
+
+        if index % LOOSE_EVERY == 0:
+            make_file(root / f"{name}.mkv", media_size)
+            created["extracted"] += 1
+            created["loose_files"] += 1
+            if index % (2 * LOOSE_EVERY) == 0:
+                make_file(root / f"{name}.txt")
+                created["loose_files"] += 1
+                created["entries"] += 1
+        elif index % DOWNLOADING_EVERY == DOWNLOADING_EVERY - 1:
+            make_file(folder / f"{name}.mkv", media_size)
+            make_file(folder / f"{name}.mkv.part")
+            created["entries"] += 1
+        else:
+            make_file(folder / f"{name}.mkv", media_size)
+        created["entries"] += 1
+    return created
+
+
+def make_file(path: Path, size: int = 0) -> None:
+    """Create a file of the given apparent size without writing any data."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if size:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def make_loose_files(root: Path, count: int, seed: int = 2) -> int:
+    """Create count release-named videos and deletable files at the top of root.
+
+    Returns:
+        int: Number of files created
+    """
+    for index, name in enumerate(release_names(count, seed)):
+        suffix = ".nfo" if index % 10 == 9 else ".mkv"
+        make_file(root / f"{name}{suffix}")
+    return count
+
+
+def make_media_files(root: Path, count: int, size: int) -> list[Path]:
+    """Create count sparse videos of size bytes in root.
+
+    Returns:
+        list[Path]: The files created
+    """
+    paths = []
+    for index in range(count):
+        path = root / f"bench_move_{index:05}.mkv"
+        make_file(path, size)
+        paths.append(path)
+    return paths
+
+
+def make_names(count: int, seed: int = 1) -> list[str]:
+    """Generate scene-style show and movie release names, two shows per movie."""
+    rng = random.Random(seed)  # noqa: S311 - seeded for a reproducible corpus, not for security
+    names = []
+    for index in range(count):
+        title = [rng.choice(_WORDS) for _ in range(rng.randint(1, 5))]
+        sep = rng.choice([".", ".", ".", " ", "_"])
+        tags = ".".join(rng.sample(_TAGS, rng.randint(1, 4)))
+        if index % 3:
+            episode = f"S{rng.randint(1, 30):02}E{rng.randint(1, 24):02}"
+            names.append(f"{sep.join(title)}{sep}{episode}.{tags}-{rng.choice(_GROUPS)}")
+        elif sep == " ":
+            names.append(f"{' '.join(title)} ({rng.randint(1950, 2025)}) {tags}")
+        else:
+            names.append(f"{sep.join(title)}{sep}{rng.randint(1950, 2025)}.{tags}-{rng.choice(_GROUPS)}")
+    return names
+
+
+def make_show_libraries(root: Path, libraries: int, networks: int, shows: int) -> dict[str, Path]:
+    """Create show libraries of network folders holding empty show folders.
+
+    Returns:
+        dict[str, Path]: Library names mapped to their paths, like CONFIG.shows
+    """
+    library_paths = {}
+    for lib in range(libraries):
+        lib_path = root / f"library_{lib}"
+        for net in range(networks):
+            for show in range(shows):
+                (lib_path / f"Network {net:04}" / f"Show {lib}-{net}-{show}").mkdir(parents=True)
+        library_paths[f"Library {lib}"] = lib_path
+    return library_paths
+
+
+def release_names(count: int, seed: int = 1) -> list[str]:
+    """Scene-style release names, made unique with a letters-only group suffix.
+
+    Digits would be read as years or episode numbers, so the suffix has none.
+    """
+    return [f"{name}{_letters(index)}" for index, name in enumerate(make_names(count, seed))]
+
+
+def _letters(index: int) -> str:
+    """index written in base 26 with the letters a-z."""
+    text = ""
+    while True:
+        index, digit = divmod(index, len(_LETTERS))
+        text = _LETTERS[digit] + text
+        if not index:
+            return text
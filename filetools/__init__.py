@@ -1,8 +1,26 @@
-from pathlib import Path
+from typing import TYPE_CHECKING
 
-from filetools.settings import AppConfig
+if TYPE_CHECKING:
+    from filetools.settings import AppConfig
 
-# Global settings instance (loaded once)
-PROJECT_ROOT = Path(__file__).parent.parent
-SETTINGS_PATH = Path(PROJECT_ROOT, "settings.json")
-CONFIG = AppConfig(SETTINGS_PATH)
+
+# Global settings instance (loaded once, on first access of filetools.CONFIG)
+def __getattr__(name: str) -> "AppConfig | str":
+    """Load CONFIG and __version__ the first time they are used instead of at import.
+
+    Reading settings.json and looking up the installed version (which scans
+    site-packages) is then only paid for by code that needs them.
+    """
+    if name == "CONFIG":
+        from filetools.settings import AppConfig
+
+        # The file FILETOOLS_SETTINGS names, or settings.json in the project root
+        value = AppConfig()
+    elif name == "__version__":
+        from filetools.settings import load_version
+
+        value = load_version()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
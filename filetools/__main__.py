@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+#
+# __main__.py
+#
+# `python -m filetools` runs the same CLI as the installed `filetools` script.
+#
+
+from filetools.cli import main
+
+main()
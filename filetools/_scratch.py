@@ -17,7 +17,8 @@ import pathspec
 
 from filetools.logger import setup_logger
 from filetools.questions import ask_bool
-from filetools.utils import dir_scan, make_shows_map
+from filetools.shows_map import make_shows_map
+from filetools.utils import dir_scan
 
 import os
 import shutil
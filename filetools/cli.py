@@ -11,25 +11,58 @@
 import logging
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import click
 
-from filetools import CONFIG, naming_files
-from filetools.logger import setup_logger
-from filetools.moving_files import (
-    clean_empty_dirs,
-    extract_from_src,
-    move_movie_files,
-    move_show_files,
-)
-from filetools.utils import dir_scan, make_shows_map, sort_media
+# filetools runs from post-download hooks many times a day, so settings, colorlog
+# and the move machinery are imported by the commands that use them rather than
+# here; --version and --help load none of them.
+if TYPE_CHECKING:
+    from filetools.utils import TreeScan
+
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class _DefaultGroup(click.Group):
+    """Command group that runs its default command when no command name is given.
+
+    `filetools -e -rn -m` stays the one-shot run it always was, and `filetools
+    watch` starts the watch daemon. Use `filetools ./watch` to process a
+    directory that is literally named "watch".
+    """
+
+    default_command = "run"
+
+    def parse_args(self: "_DefaultGroup", ctx: click.Context, args: list[str]) -> list[str]:
+        """Put the default command in front of arguments that don't start with a command or group option."""
+        group_options = {opt for param in self.get_params(ctx) for opt in param.opts}
+        if not args or (args[0] not in self.commands and args[0] not in group_options):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
 
 
 # --------------------------------------------------------------------------------
 # Main
 # --------------------------------------------------------------------------------
-@click.command()
+@click.group(cls=_DefaultGroup, invoke_without_command=True)
+@click.option("--version", is_flag=True, help="Show the version of the filetools package")
+def main(version: bool) -> None:
+    """Extract, rename and move downloaded media into the libraries.
+
+    Without a command, the arguments are passed to `filetools run`.
+    """
+    if version:
+        from filetools import __version__
+
+        click.echo(f"filetools version: {__version__}")
+        sys.exit(0)
+
+
+@main.command("run")
 @click.argument("path", required=False, type=click.Path(exists=True, file_okay=False, dir_okay=True))
 @click.option(
     "-e",
@@ -51,22 +84,96 @@ from filetools.utils import dir_scan, make_shows_map, sort_media
     is_flag=True,
     help="Run in debug mode: Log actions without renaming or moving files",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of files to move in parallel (limited per destination device)",
+)
+@click.option(
+    "-y",
+    "--yes",
+    "assume_yes",
+    is_flag=True,
+    help=(
+        "Answer yes to moves and deleting directories; new shows no rule covers are "
+        "written to pending.json"
+    ),
+)
+@click.option(
+    "--batch",
+    is_flag=True,
+    help="Never prompt; decisions the rules file can't make are written to pending.json",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    help="Checksum cross-device copies and only remove the source if they match",
+)
+@click.option(
+    "--pipeline",
+    is_flag=True,
+    help="Extract, rename and move each file as soon as it is ready instead of step by step",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume moves left unfinished by an interrupted run before other operations",
+)
+@click.option(
+    "--undo-renames",
+    is_flag=True,
+    help="Give the files renamed by the last rename run their old names back",
+)
+@click.option(
+    "--plan",
+    "plan_format",
+    type=click.Choice(["json", "jsonl"]),
+    help="Write what the selected steps would do to stdout as a JSON or JSONL plan, changing nothing",
+)
+@click.option(
+    "--apply",
+    "apply_path",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    help="Carry out a plan written by --plan instead of scanning the working directory",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(file_okay=True, dir_okay=False),
+    help="Write run metrics to this file for the node_exporter textfile collector",
+)
+@click.option(
+    "--log-json",
+    type=click.Path(file_okay=True, dir_okay=False),
+    help="Also append every log record to this file as JSON lines",
+)
 @click.option(
     "-v",
     "--verbose",
     count=True,
     help="Increase verbosity level (use -v, -vv, or -vvv)",
 )
-@click.option("--version", is_flag=True, help="Show the version of the filetools package")
-def cli(
+def run(
     path: str | None,
     extract_files: bool,
     rename_files: bool,
     move_files: bool,
     delete_empty_dirs: bool,
     debug: bool,
+    jobs: int,
+    assume_yes: bool,
+    batch: bool,
+    verify: bool,
+    pipeline: bool,
+    resume: bool,
+    undo_renames: bool,
+    plan_format: str | None,
+    apply_path: str | None,
+    metrics_file: str | None,
+    log_json: str | None,
     verbose: int,
-    version: bool,
 ) -> None:
     """Process media files with various operations like extraction, renaming, and moving.
 
@@ -77,71 +184,370 @@ def cli(
         move_files: If True, move renamed files to appropriate locations.
         delete_empty_dirs: If True, remove empty directories after processing.
         debug: If True, run in simulation mode without making actual changes.
+        jobs: Number of files to move in parallel.
+        assume_yes: If True, answer yes to all confirmations.
+        batch: If True, never prompt and queue undecided questions in the pending report.
+        verify: If True, checksum cross-device copies before removing the source.
+        pipeline: If True, stream each file through extract, rename and move.
+        resume: If True, finish interrupted moves recorded in the move journal first.
+        undo_renames: If True, revert the last rename batch from its undo manifest first.
+        plan_format: If set, write the selected steps' operations as a "json" or "jsonl" plan and exit.
+        apply_path: If set, carry out this plan file instead of the selected steps.
+        metrics_file: If set, write the run's metrics to this Prometheus textfile.
+        log_json: If set, also write the log to this file as JSON lines.
         verbose: Logging verbosity level (0=INFO, 1=DEBUG, 2+=NOTSET).
 
     Returns:
         None
     """
-    # Show version information
-    if version:
-        click.echo(f"filetools version: {CONFIG.version}")
-        sys.exit(0)
+    _load_config()
+    from filetools import naming_files
+    from filetools.moving_files import clean_empty_dirs, resume_moves
+    from filetools.planner import apply_plan, build_plan, write_plan
+    from filetools.rules import configure as configure_decisions
 
-    # Set the logging level based on the verbosity
-    if verbose == 1:
-        log_level = logging.DEBUG
-    elif verbose >= 2:
-        log_level = logging.NOTSET
+    log = _setup_logging(verbose, log_json)
+
+    if plan_format and apply_path:
+        log.error("--plan and --apply can't be used together")
+        sys.exit(1)
+
+    # Planning never prompts; undecided questions are listed in the plan instead
+    decider = configure_decisions(
+        assume_yes=assume_yes and not plan_format, batch=batch or bool(plan_format)
+    )
+
+    work_dir = _work_dir(log, path)
+    log.info("Path to work on: %s", work_dir)
+
+    if plan_format:
+        plan = build_plan(work_dir, extract_files, rename_files, move_files, delete_empty_dirs)
+        write_plan(plan, sys.stdout, plan_format)
+        _report_metrics(log, metrics_file)
+        return
+
+    if resume:
+        log.info("")
+        log.info("------------------------------ Resume Interrupted Moves -----------------------------")
+        log.info("")
+        resume_moves(debug, jobs, verify)
+        log.info("\n")
+
+    if undo_renames:
+        log.info("")
+        log.info("------------------------------------ Undo Renames -----------------------------------")
+        log.info("")
+        naming_files.undo_renames(debug=debug)
+        log.info("\n")
+
+    if apply_path:
+        log.info("")
+        log.info(
+            "------------------------------------- Apply Plan -------------------------------------"
+        )
+        log.info("")
+        apply_plan(Path(apply_path), debug, jobs, verify)
+        log.info("\n")
+        tree = None
     else:
-        log_level = logging.INFO
+        tree = _run_steps(
+            log, work_dir, debug, jobs, verify, pipeline, extract_files, rename_files, move_files
+        )
 
-    log = setup_logger(name="filetools", level=log_level)
-    log.debug("Python version: %s", sys.version)
+    if delete_empty_dirs and not apply_path:
+        log.info("")
+        log.info("--------------------------------- Delete Empty Dirs ---------------------------------")
+        log.info("")
+        clean_empty_dirs(work_dir, debug, tree)
+        log.info("\n")
+
+    if not debug:
+        decider.write_pending_report()
+
+    _report_metrics(log, metrics_file)
 
-    # make/Update show_map
-    make_shows_map()
+
+@main.command()
+@click.argument("path", required=False, type=click.Path(exists=True, file_okay=False, dir_okay=True))
+@click.option("-rn", "--rename-files", is_flag=True, help="Rename files to standardized formats")
+@click.option("-m", "--move-files", is_flag=True, help="Moves renamed files to the filesystem")
+@click.option(
+    "-d",
+    "--delete-empty-dirs",
+    is_flag=True,
+    help="Delete processed download folders that don't hold a specified video file",
+)
+@click.option(
+    "-dbg",
+    "--debug",
+    is_flag=True,
+    help="Run in debug mode: Log actions without renaming or moving files",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of files to move in parallel (limited per destination device)",
+)
+@click.option(
+    "-y",
+    "--yes",
+    "assume_yes",
+    is_flag=True,
+    help=(
+        "Answer yes to moves and deleting directories; new shows no rule covers are "
+        "written to pending.json"
+    ),
+)
+@click.option(
+    "--batch",
+    is_flag=True,
+    help="Never prompt; decisions the rules file can't make are written to pending.json",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    help="Checksum cross-device copies and only remove the source if they match",
+)
+@click.option(
+    "--settle",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Seconds a download must be quiet before it is processed [default: watch.settle_seconds]",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(file_okay=True, dir_okay=False),
+    help="Write run metrics to this file for the node_exporter textfile collector",
+)
+@click.option(
+    "--log-json",
+    type=click.Path(file_okay=True, dir_okay=False),
+    help="Also append every log record to this file as JSON lines",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    count=True,
+    help="Increase verbosity level (use -v, -vv, or -vvv)",
+)
+def watch(
+    path: str | None,
+    rename_files: bool,
+    move_files: bool,
+    delete_empty_dirs: bool,
+    debug: bool,
+    jobs: int,
+    assume_yes: bool,
+    batch: bool,
+    verify: bool,
+    settle: float | None,
+    metrics_file: str | None,
+    log_json: str | None,
+    verbose: int,
+) -> None:
+    """Watch the download directory and process downloads as they finish.
+
+    Uses Linux inotify. Files are extracted from every download folder that
+    settles; renaming, moving and cleanup are applied to that folder only.
+    Everything already in the directory is processed once at start-up.
+
+    Args:
+        path: Directory to watch. Defaults to paths.default_source if not specified.
+        rename_files: If True, rename extracted files to standardized formats.
+        move_files: If True, move renamed files to appropriate locations.
+        delete_empty_dirs: If True, remove processed folders left without videos.
+        debug: If True, run in simulation mode without making actual changes.
+        jobs: Number of files to move in parallel.
+        assume_yes: If True, answer yes to all confirmations.
+        batch: If True, never prompt and queue undecided questions in the pending report.
+        verify: If True, checksum cross-device copies before removing the source.
+        settle: Seconds without changes before a download is processed.
+        metrics_file: If set, write the run's metrics to this Prometheus textfile.
+        log_json: If set, also write the log to this file as JSON lines.
+        verbose: Logging verbosity level (0=INFO, 1=DEBUG, 2+=NOTSET).
+    """
+    _load_config()
+    from filetools import CONFIG
+    from filetools.moving_files import clean_folders
+    from filetools.pipeline import run_pipeline
+    from filetools.rules import configure as configure_decisions
+    from filetools.watcher import DownloadWatcher
+
+    log = _setup_logging(verbose, log_json)
+    decider = configure_decisions(assume_yes=assume_yes, batch=batch)
+
+    work_dir = Path(path) if path else Path(CONFIG.default_source)
+    if not work_dir.is_dir():
+        log.error("Working directory does not exist: %s", work_dir)
+        sys.exit(1)
+
+    def process(paths: list[Path]) -> list[Path]:
+        log.info("Processing %s finished downloads: %s", len(paths), ", ".join(p.name for p in paths))
+        pipeline = run_pipeline(
+            work_dir, debug, jobs, verify, True, rename_files, move_files, paths=paths
+        )
+        if delete_empty_dirs:
+            clean_folders([p for p in paths if p.is_dir()], debug)
+        if not debug:
+            decider.write_pending_report()
+        if metrics_file:
+            _report_metrics(log, metrics_file, summary=False)
+        return pipeline.produced
 
     try:
-        work_dir = Path(path) if path else Path(CONFIG.default_source)
-        if not work_dir.exists():
-            log.error(f"Working directory does not exist: {work_dir}")
-            sys.exit(1)
-    except Exception as e:
-        log.error(f"Error setting working directory: {e}")
+        with DownloadWatcher(work_dir, settle) as watcher:
+            watcher.mark_all()
+            watcher.run(process)
+    except OSError as e:
+        log.error("Unable to watch %s: %s", work_dir, e)
         sys.exit(1)
-    log.info("Path to work on: %s", work_dir)
+    except KeyboardInterrupt:
+        log.info("Stopped watching %s", work_dir)
+        _report_metrics(log, metrics_file)
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _load_config() -> None:
+    """Load the settings before anything else uses them, exiting if they are invalid."""
+    from filetools.settings import SettingsError
+
+    try:
+        from filetools import CONFIG  # noqa: F401
+    except SettingsError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
+def _report_metrics(log: logging.Logger, metrics_file: str | None, summary: bool = True) -> None:
+    """Log the run's metrics and write them to the Prometheus textfile if one was given.
+
+    Args:
+        log: Logger for the summary
+        metrics_file: Textfile for node_exporter, None to skip writing one
+        summary: If False, only write the textfile
+    """
+    from filetools.metrics import METRICS
+    from filetools.utils import CLASSIFIER
+
+    cache = CLASSIFIER.cache_info()
+    METRICS.cache_totals("filename_classifier", cache.hits, cache.misses)
+
+    if summary:
+        log.info("")
+        log.info("------------------------------------ Run Summary ------------------------------------")
+        log.info("")
+        for line in METRICS.summary():
+            log.info("%s", line)
+
+    if metrics_file:
+        try:
+            METRICS.write_textfile(metrics_file)
+        except OSError as e:
+            log.error("Unable to write metrics to %s: %s", metrics_file, e)
+
+
+def _run_steps(
+    log: logging.Logger,
+    work_dir: Path,
+    debug: bool,
+    jobs: int,
+    verify: bool,
+    pipeline: bool,
+    extract_files: bool,
+    rename_files: bool,
+    move_files: bool,
+) -> "TreeScan | None":
+    """Extract, rename and move, streamed through the pipeline or one step after another.
+
+    Returns:
+        TreeScan | None: Snapshot of the working directory the steps kept up to
+                         date, None if cleanup has to scan it again
+    """
+    from filetools.moving_files import extract_from_src, move_movie_files, move_show_files
+    from filetools.naming_files import rename_files as rename_step
+    from filetools.pipeline import run_pipeline
+    from filetools.utils import WORK_TREE_DEPTH, TreeScan, sort_media
+
+    if pipeline and (extract_files or rename_files or move_files):
+        log.info("")
+        log.info("------------------------------ Extract, Rename and Move -----------------------------")
+        log.info("")
+        run_pipeline(work_dir, debug, jobs, verify, extract_files, rename_files, move_files)
+        log.info("\n")
+        # Cleanup needs to see the tree as the pipeline left it
+        return None
+
+    # One scan of the working directory, kept up to date by every step below
+    tree = TreeScan(work_dir, WORK_TREE_DEPTH)
 
     if extract_files:
         log.info("")
         log.info("---------------------------------- Extract Files -----------------------------------")
         log.info("")
-        extract_from_src(work_dir, debug)
+        extract_from_src(work_dir, debug, tree)
         log.info("\n")
 
     if rename_files:
         log.info("")
         log.info("----------------------------------- Rename Files ------------------------------------")
         log.info("")
-        naming_files.rename_files(work_dir, debug)
+        rename_step(work_dir, debug, tree)
         log.info("\n")
 
     if move_files:
         log.info("")
         log.info("------------------------------ Move Files To Libraries ------------------------------")
         log.info("")
-        movies, shows = sort_media(dir_scan(work_dir, True))
-        move_movie_files(movies, work_dir, debug)
-        move_show_files(shows, work_dir, debug)
+        movies, shows = sort_media(tree.files(work_dir))
+        move_movie_files(movies, work_dir, debug, jobs, verify)
+        move_show_files(shows, work_dir, debug, jobs, verify)
         log.info("\n")
 
-    if delete_empty_dirs:
-        log.info("")
-        log.info("--------------------------------- Delete Empty Dirs ---------------------------------")
-        log.info("")
-        clean_empty_dirs(work_dir, debug)
-        log.info("\n")
+    return tree
+
 
+def _setup_logging(verbose: int, log_json: str | None = None) -> logging.Logger:
+    """Set up the filetools logger for the given verbosity (0=INFO, 1=DEBUG, 2+=NOTSET).
 
-def main() -> None:
-    """Entry point for the filetools CLI application."""
-    cli()
+    With log_json, every record is also appended to that file as a JSON line.
+    """
+    # Set the logging level based on the verbosity
+    if verbose == 1:
+        log_level = logging.DEBUG
+    elif verbose >= 2:
+        log_level = logging.NOTSET
+    else:
+        log_level = logging.INFO
+
+    from filetools.logger import setup_logger
+
+    log = setup_logger(name="filetools", level=log_level, json_path=log_json)
+    log.debug("Python version: %s", sys.version)
+    return log
+
+
+def _work_dir(log: logging.Logger, path: str | None) -> Path:
+    """Return the directory to work on, exiting if it doesn't exist.
+
+    Args:
+        log: Logger for the error
+        path: Directory given on the command line, paths.default_source if None
+    """
+    from filetools import CONFIG
+
+    try:
+        work_dir = Path(path) if path else Path(CONFIG.default_source)
+        if not work_dir.exists():
+            log.error("Working directory does not exist: %s", work_dir)
+            sys.exit(1)
+    except Exception as e:
+        log.error("Error setting working directory: %s", e)
+        sys.exit(1)
+    return work_dir
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+#
+# folder_state.py
+#
+# Persistent record of download folders that were already processed, so folders
+# that finished days ago are skipped without listing them again, and of folder
+# sizes, so downloads without a .part marker are only extracted once their files
+# have stopped changing.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from filetools import CONFIG
+from filetools.metrics import METRICS
+from filetools.utils import ScanEntry
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+FOLDER_STATE_FILE = "folder_state.json"
+FOLDER_STATE_VERSION = 1
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class FolderState:
+    """Processed and settling download folders, keyed by folder path.
+
+    A processed folder is stored with the (inode, mtime, size) of the folder
+    itself. Adding, removing or renaming anything inside a folder changes its
+    mtime, so a folder whose key still matches has nothing new in it and can be
+    skipped with a single stat() that scandir() of the parent already cached.
+
+    Folders without a downloading indicator are only ready once their files have
+    not grown and have not been written to for CONFIG.stable_seconds, for
+    clients that write straight to the final file names.
+
+    Args:
+        path: State file location, defaults to folder_state.json next to shows_map.ini
+        stable_seconds: Quiet time before a folder counts as complete, CONFIG.stable_seconds if None
+        clock: Wall clock comparable with file mtimes, replaceable in tests
+    """
+
+    def __init__(
+        self: "FolderState",
+        path: Path | None = None,
+        stable_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path) if path else folder_state_path()
+        self.stable_seconds = CONFIG.stable_seconds if stable_seconds is None else stable_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._folders: dict[str, dict[str, Any]] = self._load()
+        self._changed = False
+
+    def is_stable(self: "FolderState", dir_obj: ScanEntry, file_objs: list[ScanEntry]) -> bool:
+        """True if the folder's files haven't changed for stable_seconds.
+
+        Both the newest file mtime and the last time the folder's total size
+        changed must be at least stable_seconds old. A folder seen for the first
+        time is assumed to have had its current size since its newest mtime.
+
+        Args:
+            dir_obj: The download folder
+            file_objs: Files directly inside the folder
+        """
+        if self.stable_seconds <= 0:
+            return True
+
+        now = self._clock()
+        total_size = 0
+        newest = 0.0
+        for file_obj in file_objs:
+            try:
+                st = file_obj.stat()
+            except OSError:
+                return False
+            total_size += st.st_size
+            newest = max(newest, st.st_mtime)
+
+        with self._lock:
+            record = self._folders.setdefault(dir_obj.path, {})
+            if record.get("size") != total_size:
+                record["size_since"] = now if "size" in record else newest
+                record["size"] = total_size
+                record.pop("key", None)
+                self._changed = True
+            quiet = min(now - newest, now - record["size_since"])
+        if quiet < self.stable_seconds:
+            log.debug("Folder changed %.0f seconds ago, waiting: %s", quiet, dir_obj.path)
+            return False
+        return True
+
+    def is_unchanged(self: "FolderState", dir_obj: ScanEntry) -> bool:
+        """True if the folder was processed and nothing in it changed since."""
+        with self._lock:
+            key = self._folders.get(dir_obj.path, {}).get("key")
+        try:
+            unchanged = key is not None and key == _folder_key(dir_obj.stat())
+        except OSError:
+            unchanged = False
+        METRICS.cache("folder_state", unchanged)
+        return unchanged
+
+    def mark_done(self: "FolderState", folder: str | Path) -> None:
+        """Record a folder as processed in its current state."""
+        try:
+            key = _folder_key(os.stat(folder))
+        except OSError:
+            return
+        with self._lock:
+            self._folders[str(folder)] = {"key": key}
+            self._changed = True
+
+    def retain(self: "FolderState", folders: Iterable[str | Path]) -> None:
+        """Forget every folder not in folders, e.g. ones that were deleted."""
+        keep = {str(folder) for folder in folders}
+        with self._lock:
+            gone = [path for path in self._folders if path not in keep]
+            for path in gone:
+                del self._folders[path]
+            self._changed = self._changed or bool(gone)
+
+    def save(self: "FolderState") -> None:
+        """Write the state file if anything changed."""
+        with self._lock:
+            if not self._changed:
+                return
+            data = {"version": FOLDER_STATE_VERSION, "folders": self._folders}
+            tmp_path = self.path.with_suffix(".tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+                self._changed = False
+            except OSError as e:
+                log.warning("Unable to save folder state '%s': %s", self.path, e)
+
+    def _load(self: "FolderState") -> dict[str, dict[str, Any]]:
+        """Read the state file, starting over if it is missing or from another version."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("Unable to load folder state '%s': %s", self.path, e)
+            return {}
+        if data.get("version") != FOLDER_STATE_VERSION:
+            return {}
+        return data.get("folders", {})
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def folder_state_path() -> Path:
+    """Return the default folder state location next to shows_map.ini.
+
+    Returns:
+        Path: folder_state.json in the same directory as the settings file
+    """
+    return Path(CONFIG.settings_path).parent.joinpath(FOLDER_STATE_FILE)
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _folder_key(st: os.stat_result) -> list[int]:
+    """Identity of a folder's contents: (inode, mtime_ns, size)."""
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+#
+# journal.py
+#
+# Append-only journal of cross-device copies, so a bulk move that is interrupted
+# can be resumed without restarting copies from zero. Renames on one filesystem
+# are atomic and need no record.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import fcntl
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from filetools import CONFIG
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+MOVE_JOURNAL_FILE = "move_journal.jsonl"
+
+# Journal entry states
+PLANNED = "planned"
+COPYING = "copying"
+DONE = "done"
+FAILED = "failed"
+DISCARDED = "discarded"
+
+# States that need no further work
+_FINISHED = {DONE, DISCARDED}
+
+# States of a copy that was started and can be continued
+_RESUMABLE = {COPYING, FAILED}
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class JournalEntry:
+    """State of a single journaled copy.
+
+    Attributes:
+        src: Source file path
+        dest: Destination file path
+        size: Source size in bytes when the copy started
+        copied: Bytes known to be safely written to the destination
+        state: One of planned, copying, done, failed or discarded
+    """
+
+    src: str
+    dest: str
+    size: int
+    copied: int = 0
+    state: str = PLANNED
+
+
+class MoveJournal:
+    """Crash-safe record of the cross-device copies of a run.
+
+    Each state change is appended to a JSON Lines file and flushed to disk. The
+    latest record per source path wins when the journal is read back, so an
+    interrupted run leaves behind exactly the entries that still need work.
+
+    Several processes (a hook and a watch, say) can share the journal. Appends
+    hold a shared flock() on a lock file next to it and compaction an exclusive
+    one, so a compaction never drops records another process is still writing.
+
+    Args:
+        path: Journal file location, defaults to move_journal.jsonl next to shows_map.ini
+    """
+
+    def __init__(self: "MoveJournal", path: Path | None = None) -> None:
+        self.path = Path(path) if path else journal_path()
+        self._lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self._lock = threading.Lock()
+        self._entries: dict[str, JournalEntry] = self._read()
+
+    def complete(self: "MoveJournal", src: Path) -> None:
+        """Mark a move as finished."""
+        self._update(src, state=DONE)
+
+    def compact(self: "MoveJournal") -> None:
+        """Drop finished entries, removing the journal file once nothing is left.
+
+        The journal is read back from disk under the exclusive lock, so entries
+        other processes appended since this one opened it are kept.
+        """
+        if not self.path.exists():
+            self._entries = {}
+            return
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            entries = {k: e for k, e in self._read().items() if e.state not in _FINISHED}
+            self._entries = entries
+            if not entries:
+                self.path.unlink(missing_ok=True)
+                return
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    for entry in entries.values():
+                        f.write(json.dumps(asdict(entry)) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+    def discard(self: "MoveJournal", src: Path) -> None:
+        """Give up on a move that can no longer be completed."""
+        self._update(src, state=DISCARDED)
+
+    def failed(self: "MoveJournal", src: Path) -> None:
+        """Mark a move as failed; its partial copy is kept for a later resume."""
+        self._update(src, state=FAILED)
+
+    def pending(self: "MoveJournal") -> list[JournalEntry]:
+        """Return the moves that have not completed yet.
+
+        Returns:
+            list[JournalEntry]: Unfinished entries in the order they were started
+        """
+        with self._lock:
+            return [entry for entry in self._entries.values() if entry.state not in _FINISHED]
+
+    def progress(self: "MoveJournal", src: Path, copied: int) -> None:
+        """Record that the first copied bytes of a move are safely on disk."""
+        self._update(src, state=COPYING, copied=copied)
+
+    def resume_offset(self: "MoveJournal", src: Path, dest: Path) -> int:
+        """Return the offset a partial copy can safely continue from.
+
+        The offset is the journaled progress, capped at the destination's current
+        size. It is 0 when the source changed size since it was journaled or when
+        nothing is journaled for this move.
+
+        Args:
+            src: Source file path
+            dest: Destination file path
+
+        Returns:
+            int: Byte offset to resume the copy from
+        """
+        with self._lock:
+            entry = self._entries.get(str(src))
+        if not entry or entry.dest != str(dest) or entry.state in _FINISHED:
+            return 0
+        try:
+            if os.stat(src).st_size != entry.size:
+                return 0
+            return min(entry.copied, os.stat(dest).st_size)
+        except OSError:
+            return 0
+
+    def resumable(self: "MoveJournal", src: Path, dest: Path) -> bool:
+        """True if a copy from src to dest was started, got somewhere and didn't finish.
+
+        Only then is an existing destination this journal's own partial copy
+        rather than a file that must not be overwritten.
+        """
+        with self._lock:
+            entry = self._entries.get(str(src))
+        return bool(entry and entry.dest == str(dest) and entry.state in _RESUMABLE and entry.copied > 0)
+
+    def start(self: "MoveJournal", src: Path, dest: Path, size: int) -> None:
+        """Record a cross-device copy that is about to begin.
+
+        A journaled copy of the same source to the same destination and size
+        keeps its progress, so it can be continued.
+
+        Args:
+            src: Source file path
+            dest: Destination file path
+            size: Source size in bytes
+        """
+        with self._lock:
+            entry = self._entries.get(str(src))
+            if entry and entry.dest == str(dest) and entry.size == size and entry.state not in _FINISHED:
+                return
+            entry = JournalEntry(str(src), str(dest), size, state=COPYING)
+            self._entries[entry.src] = entry
+            self._append([entry])
+
+    def _append(self: "MoveJournal", entries: list[JournalEntry]) -> None:
+        """Append records to the journal file and flush them to disk."""
+        if not entries:
+            return
+        with self._file_lock(fcntl.LOCK_SH), open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(asdict(entry)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextmanager
+    def _file_lock(self: "MoveJournal", operation: int) -> Iterator[None]:
+        """Hold a flock() on the lock file, shared for appends and exclusive for compaction."""
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read(self: "MoveJournal") -> dict[str, JournalEntry]:
+        """Fold the journal file into the latest entry per source path."""
+        entries: dict[str, JournalEntry] = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = JournalEntry(**json.loads(line))
+                    except (json.JSONDecodeError, TypeError):
+                        # A torn final line from a crash mid-write
+                        log.debug("Ignoring malformed journal line: %r", line)
+                        continue
+                    entries[entry.src] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _update(self: "MoveJournal", src: Path, **changes: int | str) -> None:
+        """Apply changes to a journaled entry and append the new record."""
+        with self._lock:
+            entry = self._entries.get(str(src))
+            if entry is None:
+                return
+            for key, value in changes.items():
+                setattr(entry, key, value)
+            self._append([entry])
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def journal_path() -> Path:
+    """Return the default journal location next to shows_map.ini.
+
+    Returns:
+        Path: move_journal.jsonl in the same directory as the settings file
+    """
+    return Path(CONFIG.settings_path).parent.joinpath(MOVE_JOURNAL_FILE)
@@ -1,5 +1,8 @@
+import json
 import logging
-from typing import Any, Optional
+import time
+from pathlib import Path
+from typing import Any, Optional, TextIO
 
 import colorlog
 
@@ -8,6 +11,9 @@ QUESTION = 25
 
 logging.addLevelName(QUESTION, "QUESTION")
 
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
 
 def question(
     self: logging.Logger, message: str, *args: tuple[Any, ...], **kwargs: dict[str, Any]
@@ -20,26 +26,85 @@ def question(
 logging.Logger.question = question  # Add to logger class
 
 
-def setup_logger(name: str | None = None, level: int = logging.INFO) -> logging.Logger:
+class LevelDispatchHandler(logging.StreamHandler):
+    """Console handler that picks the formatter by the record's level.
+
+    Replaces a pair of handlers with complementary filters, so each record is
+    checked once with a dict lookup instead of running through two filters.
+
+    Args:
+        formatters: Formatter per log level
+        default: Formatter for levels not in formatters
+        stream: Stream to write to, stderr if None
+    """
+
+    def __init__(
+        self: "LevelDispatchHandler",
+        formatters: dict[int, logging.Formatter],
+        default: logging.Formatter,
+        stream: TextIO | None = None,
+    ) -> None:
+        super().__init__(stream)
+        self._formatters = formatters
+        self._default = default
+
+    def format(self: "LevelDispatchHandler", record: logging.LogRecord) -> str:
+        return self._formatters.get(record.levelno, self._default).format(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line for machine parsing.
+
+    Each line holds the time, level, logger and message, plus every field
+    passed with extra={...}, e.g. log.info("Moved %s", src, extra={"event": "move"}).
+    """
+
+    def format(self: "JsonLinesFormatter", record: logging.LogRecord) -> str:
+        data = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def setup_logger(
+    name: str | None = None, level: int = logging.INFO, json_path: Path | None = None
+) -> logging.Logger:
     """Configure and return a logger with colored output formatting.
 
-    Sets up a logger with two handlers:
-    1. Info/Question handler: Uses "|| " prefix without level name
-    2. Standard handler: Uses "|| " prefix with level name for other log levels
+    Sets up a single console handler that formats by level:
+    1. Info/Question: "|| " prefix without level name
+    2. Other levels: "|| " prefix with level name
 
     Args:
         name: The name of the logger. Defaults to "filetools" if None
         level: The logging level to set. Defaults to logging.INFO
+        json_path: If set, also append every record to this file as JSON lines
 
     Returns:
         logging.Logger: Configured logger instance with colored formatting
     """
     # Use a consistent logger name
     logger = colorlog.getLogger(name) if name else logging.getLogger("filetools")
+    logger.setLevel(level)
 
-    # Prevent duplicate handlers across different modules
-    if logger.hasHandlers():
-        logger.setLevel(level)
+    if json_path is not None:
+        json_path = Path(json_path).resolve()
+        if not any(getattr(h, "baseFilename", None) == str(json_path) for h in logger.handlers):
+            json_handler = logging.FileHandler(json_path, encoding="utf-8")
+            json_handler.setFormatter(JsonLinesFormatter())
+            logger.addHandler(json_handler)
+
+    # Prevent duplicate console handlers across different modules
+    if any(isinstance(h, LevelDispatchHandler) for h in logger.handlers):
         return logger
 
     # Define formatter with "|| " prefix for INFO & QUESTION (no level name)
@@ -70,19 +135,11 @@ def setup_logger(name: str | None = None, level: int = logging.INFO) -> logging.
         style="%",
     )
 
-    # Create separate handlers for INFO/QUESTION and other levels
-    info_question_handler = logging.StreamHandler()
-    info_question_handler.setFormatter(info_question_formatter)
-    info_question_handler.addFilter(lambda record: record.levelno in (logging.INFO, QUESTION))
-
-    standard_handler = logging.StreamHandler()
-    standard_handler.setFormatter(standard_formatter)
-    standard_handler.addFilter(lambda record: record.levelno not in (logging.INFO, QUESTION))
-
-    # Attach handlers to the logger
-    logger.addHandler(info_question_handler)
-    logger.addHandler(standard_handler)
-
-    logger.setLevel(level)
+    logger.addHandler(
+        LevelDispatchHandler(
+            {logging.INFO: info_question_formatter, QUESTION: info_question_formatter},
+            standard_formatter,
+        )
+    )
 
     return logger
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+#
+# metrics.py
+#
+# Timers and counters for a single run: where the time went per phase, how many
+# files and bytes each phase handled, transfer rates per destination device,
+# time spent waiting on prompts and cache hit rates. Reported as a summary at
+# the end of a run and, optionally, as a Prometheus textfile-collector file for
+# node_exporter.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import functools
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import ParamSpec, TypeVar
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# Phases in the order they are reported, and the counter holding each one's files
+PHASES = {
+    "shows_map": None,
+    "dir_scan": None,
+    "parse_filename": None,
+    "extract": "files_extracted",
+    "rename": "files_renamed",
+    "move": "files_moved",
+    "cleanup": "dirs_deleted",
+}
+
+# Timer for time spent waiting on the user rather than working
+PROMPT = "prompt"
+
+_PROMETHEUS_PREFIX = "filetools"
+
+# Parameters and return type of a function wrapped by Metrics.timed()
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class Metrics:
+    """Thread-safe timers and counters, collected from the start of a run.
+
+    Timers add up the time spent in each call, so phases that run on several
+    threads at once (parallel moves, the pipeline stages) report busy time,
+    which can be more than the run's wall time.
+    """
+
+    def __init__(self: "Metrics") -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self: "Metrics") -> None:
+        """Forget everything collected and restart the run clock."""
+        with self._lock:
+            self.started = time.perf_counter()
+            # Name -> [calls, seconds]
+            self.timers: dict[str, list[float]] = {}
+            self.counters: dict[str, int] = {}
+            # Device label -> [files, bytes, seconds]
+            self.devices: dict[str, list[float]] = {}
+            # Cache name -> [hits, misses]
+            self.caches: dict[str, list[int]] = {}
+
+    def add_time(self: "Metrics", name: str, seconds: float) -> None:
+        """Add one call of seconds to a timer."""
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+
+    def cache(self: "Metrics", name: str, hit: bool) -> None:
+        """Record a single cache lookup."""
+        with self._lock:
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def cache_totals(self: "Metrics", name: str, hits: int, misses: int) -> None:
+        """Set the totals of a cache that keeps its own counts, e.g. an lru_cache."""
+        with self._lock:
+            self.caches[name] = [hits, misses]
+
+    def count(self: "Metrics", name: str, value: int = 1) -> None:
+        """Add value to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self: "Metrics", name: str) -> Iterator[None]:
+        """Time the body of a with block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self: "Metrics", name: str) -> Callable[[Callable[_P, _R]], Callable[_P, _R]]:
+        """Decorator timing every call of a function."""
+
+        def decorate(func: Callable[_P, _R]) -> Callable[_P, _R]:
+            @functools.wraps(func)
+            def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_time(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorate
+
+    def transfer(self: "Metrics", device: str, size: int, seconds: float) -> None:
+        """Record a file of size bytes written to device in seconds."""
+        with self._lock:
+            totals = self.devices.setdefault(device, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += seconds
+
+    def summary(self: "Metrics") -> list[str]:
+        """Lines describing the run so far, for the end-of-run log."""
+        elapsed, timers, counters, devices, caches = self._snapshot()
+
+        prompts, waited = timers.pop(PROMPT, (0, 0.0))
+        lines = [
+            (
+                f"Run took {elapsed:.1f} seconds: {elapsed - waited:.1f} working, "
+                f"{waited:.1f} waiting on {int(prompts)} prompts"
+            )
+        ]
+        for name in [*PHASES, *sorted(set(timers) - set(PHASES))]:
+            if name not in timers:
+                continue
+            calls, seconds = timers[name]
+            line = f"{name:<15} {int(calls):>7} calls {seconds:9.3f} s"
+            counter = PHASES.get(name)
+            if counter and counters.get(counter):
+                line += f"  {_rate(counters[counter], seconds)} {counter.split('_')[0]}/s"
+            lines.append(line)
+        if counters:
+            lines.append(", ".join(f"{name}: {value}" for name, value in sorted(counters.items())))
+        for device, (files, size, seconds) in sorted(devices.items()):
+            lines.append(
+                f"Device {device}: {int(files)} files, {size / 2**30:.2f} GiB in {seconds:.1f} s "
+                f"({size / seconds / 2**20 if seconds else 0.0:.1f} MiB/s)"
+            )
+        for cache, (hits, misses) in sorted(caches.items()):
+            lookups = hits + misses
+            if lookups:
+                lines.append(f"Cache {cache}: {hits / lookups:.0%} hits ({hits}/{lookups})")
+        return lines
+
+    def write_textfile(self: "Metrics", path: str | Path) -> None:
+        """Write the metrics in Prometheus text format for node_exporter's textfile collector.
+
+        The file is written next to path and renamed into place, so the
+        collector never reads a partial file.
+
+        Raises:
+            OSError: If the file can't be written
+        """
+        elapsed, timers, counters, devices, caches = self._snapshot()
+
+        waited = timers.pop(PROMPT, (0, 0.0))[1]
+        samples: list[tuple[str, str, list[tuple[dict[str, str], float]]]] = [
+            ("run_seconds", "Wall time of the run", [({}, elapsed)]),
+            ("work_seconds", "Wall time not spent waiting on prompts", [({}, elapsed - waited)]),
+            ("prompt_wait_seconds", "Time spent waiting on prompts", [({}, waited)]),
+            (
+                "phase_seconds",
+                "Time spent in each phase",
+                [({"phase": name}, seconds) for name, (_, seconds) in sorted(timers.items())],
+            ),
+            (
+                "phase_calls",
+                "Calls of each phase",
+                [({"phase": name}, calls) for name, (calls, _) in sorted(timers.items())],
+            ),
+            *(
+                (name, f"Run total of {name.replace('_', ' ')}", [({}, value)])
+                for name, value in sorted(counters.items())
+            ),
+            (
+                "device_files",
+                "Files written per destination device",
+                [({"device": name}, files) for name, (files, _, _) in sorted(devices.items())],
+            ),
+            (
+                "device_bytes",
+                "Bytes written per destination device",
+                [({"device": name}, size) for name, (_, size, _) in sorted(devices.items())],
+            ),
+            (
+                "device_seconds",
+                "Time spent writing per destination device",
+                [({"device": name}, seconds) for name, (_, _, seconds) in sorted(devices.items())],
+            ),
+            (
+                "cache_hits",
+                "Cache lookups answered from the cache",
+                [({"cache": name}, hits) for name, (hits, _) in sorted(caches.items())],
+            ),
+            (
+                "cache_misses",
+                "Cache lookups that had to do the work",
+                [({"cache": name}, misses) for name, (_, misses) in sorted(caches.items())],
+            ),
+            ("last_run_timestamp_seconds", "Unix time the metrics were written", [({}, time.time())]),
+        ]
+
+        lines = []
+        for name, help_text, values in samples:
+            if not values:
+                continue
+            metric = f"{_PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in values:
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                series = f"{metric}{{{label_text}}}" if label_text else metric
+                lines.append(f"{series} {_format_value(value)}")
+
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _snapshot(self: "Metrics") -> tuple[float, dict, dict, dict, dict]:
+        """Copy of (elapsed, timers, counters, devices, caches) taken under the lock."""
+        with self._lock:
+            return (
+                time.perf_counter() - self.started,
+                {name: list(values) for name, values in self.timers.items()},
+                dict(self.counters),
+                {name: list(values) for name, values in self.devices.items()},
+                {name: list(values) for name, values in self.caches.items()},
+            )
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+# Metrics of the current process, shared by every module
+METRICS = Metrics()
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Sample value for the text format, without exponents or float noise."""
+    return str(int(value)) if float(value).is_integer() else repr(round(value, 6))
+
+
+def _rate(count: int, seconds: float) -> str:
+    """count per second, formatted for the summary."""
+    return f"{count / seconds:.1f}" if seconds else "-"
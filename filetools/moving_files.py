@@ -7,15 +7,36 @@
 # Imports
 # --------------------------------------------------------------------------------
 import errno
+import hashlib
 import logging
 import os
 import shutil
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from os import DirEntry
 from pathlib import Path
 
 from filetools import CONFIG
-from filetools.questions import ask_bool, ask_multichoice, ask_text_input
-from filetools.utils import dir_scan, get_show_map, make_shows_map, parse_filename
+from filetools.folder_state import FolderState
+from filetools.journal import MoveJournal
+from filetools.metrics import METRICS
+from filetools.questions import ask_multichoice, ask_text_input
+from filetools.rules import get_decider
+from filetools.shows_map import get_show_map
+from filetools.utils import (
+    CLASSIFIER,
+    FILE_DOWNLOADING,
+    FILE_VALID,
+    MATCHER,
+    WORK_TREE_DEPTH,
+    ScanEntry,
+    TreeScan,
+    parse_filenames,
+    walk_tree,
+)
 
 log = logging.getLogger("filetools")
 
@@ -23,86 +44,476 @@ log = logging.getLogger("filetools")
 # Globals
 # --------------------------------------------------------------------------------
 
+# Bytes requested per copy_file_range()/sendfile() call
+COPY_CHUNK_SIZE = 64 * 2**20
+
+# Bytes copied between fsync + journal checkpoints of a cross-device move
+CHECKPOINT_BYTES = 2**30
+
+# Buffer size and digest length used by verified copies
+VERIFY_CHUNK_SIZE = 8 * 2**20
+VERIFY_DIGEST_SIZE = 32
+
+# errno values meaning copy_file_range() can't be used for this pair of files
+_COPY_RANGE_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class DeviceLimiter:
+    """Limit the number of concurrent moves per destination device.
+
+    Args:
+        per_device: Maximum concurrent moves onto one device (st_dev)
+    """
+
+    def __init__(self: "DeviceLimiter", per_device: int) -> None:
+        self.per_device = max(1, per_device)
+        self._lock = threading.Lock()
+        self._semaphores: dict[int, threading.Semaphore] = {}
+
+    def slot(self: "DeviceLimiter", device: int) -> threading.Semaphore:
+        """Return the semaphore guarding a destination device.
+
+        Args:
+            device: st_dev of the destination directory
+
+        Returns:
+            threading.Semaphore: Semaphore to hold while moving onto that device
+        """
+        with self._lock:
+            if device not in self._semaphores:
+                self._semaphores[device] = threading.Semaphore(self.per_device)
+            return self._semaphores[device]
+
+
+@dataclass(slots=True)
+class FolderRemoval:
+    """Contents of a download folder in the order they can be deleted.
+
+    Attributes:
+        path: The download folder
+        size: Bytes freed by deleting it
+        files: Files and symlinks to unlink
+        dirs: Directories to rmdir, deepest first and ending with the folder itself
+    """
+
+    path: Path
+    size: int = 0
+    files: list[str] = field(default_factory=list)
+    dirs: list[str] = field(default_factory=list)
+
+
 # --------------------------------------------------------------------------------
 # Public Functions
 # --------------------------------------------------------------------------------
 
 
-def clean_empty_dirs(working_directory: Path, debug: bool = False) -> None:
+def build_movie_destination(movie_path: Path) -> Path | None:
+    """Builds the destination path for a movie file within a selected movie library.
+
+    Args:
+        movie_name (str): The name of the movie file.
+
+    Returns:
+        Path | None: The destination path for the movie file within the selected library,
+                     or None if no valid library is selected or found.
+    """
+    log.debug("Processing movie: %s", movie_path)
+    library_path = _choose_library(CONFIG.movies, "Select a movie library:", str(movie_path))
+    filename_without_extension = movie_path.stem
+    cleaned_filename = filename_without_extension.replace("-4K", "").replace("-hdr", "")
+    log.debug("Using library: %s", library_path)
+    if not library_path:
+        log.warning("No valid movie library selected or found.")
+        return None
+
+    destination = library_path / cleaned_filename / movie_path.name
+    log.debug("Destination: %s", destination)
+    return Path(destination)
+
+
+def build_show_destination(show_path: Path, new_shows: dict[str, Path] | None = None) -> Path | None:
+    """Constructs the destination path for a given show name.
+
+    This function attempts to parse the season and episode information from the
+    provided show name. If successful, it constructs a destination path based on
+    a predefined mapping of shows. If the show is not found in the mapping, it
+    prompts the user to provide a new show path.
+
+    Args:
+        show_name (str): The name of the show, including season and episode information.
+        new_shows (dict[str, Path]): When planning, shows a rule would add, by show name;
+            new shows are recorded here instead of being created.
+
+    Returns:
+        Path | None: The constructed destination path for the show, or None if the
+        season/episode information could not be parsed.
+    """
+    log.info("Processing show: %s", show_path)
+    info = CLASSIFIER.classify(show_path.name)
+    show_name, season_episode = info.show_name, info.season_episode
+    log.debug("Show name: %s | Season/Episode: %s", show_name, season_episode)
+    if not season_episode:
+        log.warning("Could not parse season/episode from %s", show_name)
+        return None
+
+    base_show_name = show_name.split(season_episode)[0].rstrip("_").lstrip("_")
+    season_name = info.season_name
+
+    log.debug("Base show name: %s | Season name: %s", base_show_name, season_name)
+
+    matched_path = get_show_map().resolve(base_show_name)
+    if matched_path is None and new_shows:
+        matched_path = new_shows.get(base_show_name)
+    if matched_path is None:
+        return _prompt_for_new_show(base_show_name, season_name, show_path.name, new_shows)
+
+    destination = matched_path / season_name / show_path.name
+    log.debug("destination: %s", destination)
+    return destination
+
+
+@METRICS.timed("cleanup")
+def clean_empty_dirs(working_directory: Path, debug: bool = False, tree: TreeScan | None = None) -> None:
     """Delete empty directories within the specified root directory.
 
     Args:
         working_directory: The root directory to search for empty directories
         debug: If True, run in simulation mode without making actual changes
+        tree: Snapshot of working_directory shared with earlier steps; scanned if None
 
     Raises:
         OSError: If deletion of a directory fails
     """
-    dirs_to_delete = _get_empty_dirs(working_directory)
-
-    if dirs_to_delete:
-        log.info("Empty directories found:")
-        for dir_to_delete in dirs_to_delete:
-            log.info(f"{dir_to_delete}")
-
-        if ask_bool("Delete directories?"):
-            for d in dirs_to_delete:
-                if not debug:
-                    try:
-                        log.info(f"Deleting directory: {d}")
-                        shutil.rmtree(d)
-                    except OSError as e:
-                        log.error(f"Error deleting {d}: {e.strerror}")
-                else:
-                    log.info(f"[Debug] Deleting directory: {d}")
-    else:
+    working_directory = Path(working_directory)
+    tree = tree or TreeScan(working_directory, WORK_TREE_DEPTH)
+    delete_dirs(get_empty_dirs(working_directory, tree), debug, tree)
+
+
+@METRICS.timed("cleanup")
+def clean_folders(folders: list[Path], debug: bool = False) -> None:
+    """Delete the given download folders if nothing in them is worth keeping.
+
+    Unlike clean_empty_dirs() only the listed folders are looked at.
+
+    Args:
+        folders: Download folders to check
+        debug: If True, run in simulation mode without making actual changes
+    """
+    removals = [_plan_folder_removal(str(folder)) for folder in folders if Path(folder).is_dir()]
+    delete_dirs([removal for removal in removals if removal], debug)
+
+
+def delete_dirs(
+    removals: list["FolderRemoval"], debug: bool = False, tree: TreeScan | None = None
+) -> None:
+    """List the directories with their sizes, ask for confirmation and delete them.
+
+    Each directory is emptied leaf-first from the entries found when it was
+    planned, with unlink() and rmdir() instead of walking it again with
+    shutil.rmtree(). Anything that appeared since then makes rmdir() fail, so a
+    new download is never deleted along with the old folder.
+
+    Args:
+        removals: Directories to delete, from _plan_folder_removal()
+        debug: If True, run in simulation mode without making actual changes
+        tree: Snapshot to remove the deleted directories from, if any
+    """
+    if not removals:
         log.info("No directories to delete")
+        return
 
+    log.info("Empty directories found:")
+    for removal in removals:
+        log.info("%s (%s)", removal.path, format_size(removal.size))
+    total = format_size(sum(r.size for r in removals))
+    log.info("Reclaimable: %s in %s directories", total, len(removals))
 
-def extract_from_src(working_directory: Path, debug: bool = False) -> None:
+    if not get_decider().confirm("delete_dirs", "Delete directories?", [str(r.path) for r in removals]):
+        return
+    for removal in removals:
+        if debug:
+            log.info("[Debug] Deleting directory: %s", removal.path)
+            continue
+        log.info("Deleting directory: %s", removal.path, extra={"event": "rmdir", "src": removal.path})
+        _remove_folder(removal)
+        if tree:
+            tree.remove(removal.path)
+
+
+@METRICS.timed("extract")
+def extract_from_src(working_directory: Path, debug: bool = False, tree: TreeScan | None = None) -> None:
     """Extract files from source directory to their new locations.
 
     Args:
         working_directory: The root directory containing files to extract
         debug: If True, run in simulation mode without making actual changes
+        tree: Snapshot of working_directory shared with later steps; scanned if None
     """
     try:
         working_directory = Path(working_directory)
         if not working_directory.is_dir():
-            log.error(f"Invalid working directory: {working_directory}")
+            log.error("Invalid working directory: %s", working_directory)
             return
 
-        files_to_extract = _get_files_to_extract(working_directory)
+        tree = tree or TreeScan(working_directory, WORK_TREE_DEPTH)
+        state = FolderState()
+        files_to_extract = get_files_to_extract(working_directory, tree, state)
         if not files_to_extract:
             log.info("No files found to extract")
-            return
 
+        failed_folders = set()
         for src, dest in files_to_extract.items():
             try:
                 if debug:
-                    log.info(f"[Debug] Would extract: {src} -> {dest}")
+                    log.info("[Debug] Would extract: %s -> %s", src, dest)
                 else:
-                    log.info(f"Extracting: {src} -> {dest}")
+                    log.info(
+                        "Extracting: %s -> %s",
+                        src,
+                        dest,
+                        extra={"event": "extract", "src": src, "dest": dest},
+                    )
                     dest.parent.mkdir(parents=True, exist_ok=True)
-                    _move_file(src, dest)
+                    move_file(src, dest)
+                    tree.move(src, dest)
+                    METRICS.count("files_extracted")
             except Exception as e:
-                log.error(f"Failed to extract {src} to {dest}: {e}")
+                log.error("Failed to extract %s to %s: %s", src, dest, e)
+                failed_folders.add(src.parent)
                 continue
 
+        if not debug:
+            for folder in {src.parent for src in files_to_extract} - failed_folders:
+                state.mark_done(folder)
+            state.save()
+
     except Exception as e:
-        log.error(f"Extraction process failed: {e}")
+        log.error("Extraction process failed: %s", e)
         log.debug("Error details:", exc_info=True)
 
     log.info("File extraction process completed")
 
 
-def move_movie_files(movies: list[Path], working_directory: Path, debug: bool = False) -> None:
+def format_size(size: int) -> str:
+    """Format a byte count for the log, e.g. "1.4 GiB"."""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KiB", "MiB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GiB"
+
+
+def get_empty_dirs(working_directory: Path, tree: TreeScan) -> list["FolderRemoval"]:
+    """Find the download folders that hold nothing worth keeping.
+
+    Args:
+        working_directory (Path): The root directory to scan for empty directories.
+        tree (TreeScan): Snapshot of the working directory.
+
+    Returns:
+        list[FolderRemoval]: Folders that can be deleted, with their contents and size
+    """
+    removals = []
+    for dir_obj in tree.dirs(working_directory):
+        if dir_obj.is_symlink():
+            continue
+        removal = _plan_folder_removal(dir_obj.path, tree)
+        if removal:
+            removals.append(removal)
+    return removals
+
+
+def get_files_to_extract(
+    working_directory: Path, tree: TreeScan, state: FolderState | None = None
+) -> dict[Path, Path]:
+    """Scans the given root directory and identifies files to be extracted.
+
+    This function recursively scans the root directory and its subdirectories,
+    identifying files that are ready to be extracted. It skips directories
+    that should not be processed and handles files that are still downloading.
+    Folders the state records as processed and unchanged are skipped without
+    being listed.
+
+    Args:
+        working_directory (Path): The root directory to scan for files to extract.
+        tree (TreeScan): Snapshot of the working directory.
+        state (FolderState): Processed-folder state, or None to examine every folder.
+
+    Returns:
+        dict: A dictionary where the keys are the original file paths and the
+              values are the new paths for the files to be extracted.
+
+    Raises:
+        Exception: If an error occurs during the directory scanning or file processing.
+    """
+    files_to_extract = {}
+
+    try:
+        working_directory = Path(working_directory)
+        folders = tree.dirs(working_directory)
+        for dir_obj in folders:
+            if state and state.is_unchanged(dir_obj):
+                log.debug("Skipping unchanged folder: %s", dir_obj.path)
+                continue
+            files_to_extract.update(
+                get_folder_files_to_extract(dir_obj, tree.files(dir_obj.path), working_directory, state)
+            )
+        if state:
+            state.retain(dir_obj.path for dir_obj in folders)
+
+    except Exception as e:
+        log.error("An error occurred while getting files to extract: %s", e)
+        log.debug("Error details:", exc_info=True)
+
+    return files_to_extract
+
+
+def get_folder_files_to_extract(
+    dir_obj: ScanEntry,
+    file_objs: list[ScanEntry],
+    working_directory: Path,
+    state: FolderState | None = None,
+) -> dict[Path, Path]:
+    """Identify the files to extract from a single download folder.
+
+    Args:
+        dir_obj: The download folder
+        file_objs: Files directly inside the folder
+        working_directory: Directory the files are extracted into
+        state: Processed-folder state; folders still being written to are left
+               alone and folders with nothing to extract are recorded as processed
+
+    Returns:
+        dict: Original file paths mapped to their extracted paths; empty if the
+              folder is skipped or still downloading
+    """
+    if _should_skip_directory(dir_obj):
+        return {}
+
+    tmpdict = {}
+    try:
+        for file_obj in file_objs:
+            try:
+                log.debug("Processing file: %s", file_obj.name)
+                new_path, still_downloading = _process_file(file_obj, working_directory)
+                log.debug("File %s processed: Is downloading? %s", file_obj.name, still_downloading)
+                if still_downloading:
+                    return {}
+                if new_path:
+                    log.debug("\tAdding file to extraction list: %s -> %s", file_obj.path, new_path)
+                    tmpdict[Path(file_obj.path)] = Path(new_path)
+            except Exception as e:
+                log.error("Error processing file %s: %s", file_obj.name, e)
+                continue
+    except Exception as e:
+        log.error("Error scanning directory %s: %s", dir_obj.path, e)
+        return {}
+
+    if state:
+        if not state.is_stable(dir_obj, file_objs):
+            log.info("Folder is still being written to, skipping: %s", dir_obj.name)
+            return {}
+        if not tmpdict:
+            state.mark_done(dir_obj.path)
+
+    return tmpdict
+
+
+def move_file(src: Path, dest: Path, journal: MoveJournal | None = None, verify: bool = False) -> float:
+    """Move a file reliably across filesystems and return elapsed time in seconds.
+
+    Attempts multiple methods in order of preference:
+    1. os.rename() (fastest, same filesystem)
+    2. copy_file_range()/sendfile() loop (in-kernel, allows server-side copy or reflink)
+    3. shutil.copyfile() + unlink() (fallback)
+
+    The source is only unlinked once the destination holds exactly as many bytes
+    as the source and has been flushed to disk.
+
+    With verify, cross-device copies go through a userspace chunked copy that
+    hashes the data as it streams through. The destination is then read back
+    from disk rather than the page cache and the source is only unlinked if both
+    digests match. There is no unverified fallback in this mode.
+
+    With a journal, cross-device copies are recorded as they start, checkpoint
+    their progress every CHECKPOINT_BYTES and continue a partial destination
+    from the last checkpoint. A failed journaled copy keeps its partial
+    destination for a later resume. Renames are not journaled.
+
+    Args:
+        src: Source file path
+        dest: Destination file path
+        journal: Move journal to record progress and completion in
+        verify: If True, checksum the copy before removing the source
+
+    Returns:
+        float: Time taken to perform the move in seconds
+
+    Raises:
+        OSError: If all move attempts fail, the copy is incomplete or verification fails
+    """
+    start = time.perf_counter()
+
+    try:
+        os.rename(src, dest)
+        log.debug("Moved %s -> %s using os.rename", src, dest)
+        if journal:
+            # A resumed copy whose source and destination are now on one filesystem
+            journal.complete(src)
+        return time.perf_counter() - start
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            log.error("Failed to move %s -> %s: %s", src, dest, e)
+            raise
+
+    size = os.stat(src).st_size
+    if journal:
+        journal.start(src, dest, size)
+    method = "verified copy" if verify else "copy_file_range()/sendfile()"
+    try:
+        _copy_file(src, dest, size, journal, verify)
+    except OSError as e:
+        log.error("Failed to move %s -> %s using %s: %s", src, dest, method, e)
+        if verify:
+            _abandon_copy(src, dest, journal)
+            raise
+        method = "shutil.copyfile()"
+        try:
+            shutil.copyfile(src, dest)
+            _check_copied(src, dest, size, os.stat(dest).st_size)
+        except OSError as e:
+            log.error("Failed to move %s -> %s using %s: %s", src, dest, method, e)
+            _abandon_copy(src, dest, journal)
+            raise
+
+    os.unlink(src)
+    if journal:
+        journal.complete(src)
+    log.debug("Moved %s -> %s using %s + unlink()", src, dest, method)
+    return time.perf_counter() - start
+
+
+def move_movie_files(
+    movies: list[Path],
+    working_directory: Path,
+    debug: bool = False,
+    jobs: int = 1,
+    verify: bool = False,
+) -> None:
     """Move movie files to their respective destination directories.
 
     Args:
         movies: List of movie file paths to be moved
         working_directory: Directory where movie files are currently located
         debug: If True, run in simulation mode without making actual changes
+        jobs: Number of files to move concurrently
+        verify: If True, checksum cross-device copies before removing the source
 
     Raises:
         FileNotFoundError: If any movie files don't exist in working directory
@@ -120,405 +531,652 @@ def move_movie_files(movies: list[Path], working_directory: Path, debug: bool =
                 src = working_directory / movie.name
 
                 if not src.exists():
-                    log.error(f"Source file not found: {src}")
+                    log.error("Source file not found: %s", src)
                     continue
 
-                dest = _build_movie_destination(movie)
+                dest = build_movie_destination(movie)
                 if dest:
                     files_to_move[src] = dest
 
             except Exception as e:
-                log.error(f"Error processing movie {movie}: {e}")
+                log.error("Error processing movie %s: %s", movie, e)
                 continue
 
         if not files_to_move:
             log.warning("No valid movies to move")
             return
 
-        _perform_moves(files_to_move, "movies", debug)
+        perform_moves(files_to_move, "movies", debug, jobs, verify=verify)
 
     except Exception as e:
-        log.error(f"Failed to move movie files: {e}")
+        log.error("Failed to move movie files: %s", e)
         log.debug("Error details:", exc_info=True)
         raise
 
 
-def move_show_files(shows: list[Path], working_directory: Path, debug: bool = False) -> None:
+def move_one(
+    src: Path,
+    dest: Path,
+    debug: bool,
+    limiter: "DeviceLimiter",
+    journal: MoveJournal | None,
+    verify: bool = False,
+) -> int:
+    """Move a single planned file, holding a slot on the destination device.
+
+    Args:
+        src: Source file path
+        dest: Destination file path
+        debug: If True, run in simulation mode without making actual changes
+        limiter: Per-device concurrency limiter shared by all workers
+        journal: Move journal shared by all workers, None in debug mode
+        verify: If True, checksum cross-device copies before removing the source
+
+    Returns:
+        int: Number of bytes moved, 0 if the file was skipped or failed
+    """
+    log.debug("Creating directory: %s", dest.parent)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists() and not (journal and journal.resumable(src, dest)):
+        log.info("File already exists: %s, skipping...", dest)
+        return 0
+
+    try:
+        if debug:
+            log.info("[Debug] Moving: %s -> %s", src, dest)
+            return 0
+
+        size = src.stat().st_size
+        device = os.stat(dest.parent).st_dev
+        with limiter.slot(device):
+            log.info("Moving: %s -> %s", src, dest)
+            elapsed = move_file(src, dest, journal, verify)
+        METRICS.count("files_moved")
+        METRICS.count("bytes_moved", size)
+        METRICS.transfer(_device_label(device), size, elapsed)
+        log.info(
+            "Moved in %.3f seconds",
+            elapsed,
+            extra={"event": "move", "src": src, "dest": dest, "bytes": size, "seconds": elapsed},
+        )
+        return size
+    except Exception as e:
+        log.error("Failed to move %s to %s: %s", src, dest, e)
+        return 0
+
+
+def move_show_files(
+    shows: list[Path],
+    working_directory: Path,
+    debug: bool = False,
+    jobs: int = 1,
+    verify: bool = False,
+) -> None:
     """Moves show files to their respective destination directories.
 
     Args:
         shows (List[Path]): A list of show file paths to be moved.
         working_directory (Path): The directory where the show files are currently located.
+        debug (bool): If True, run in simulation mode without making actual changes.
+        jobs (int): Number of files to move concurrently.
+        verify (bool): If True, checksum cross-device copies before removing the source.
 
     The function processes each show file path, determines its destination path,
     creates any necessary directories, and then moves the files to their new locations.
     """
     files_to_move = {}
     rejected_shows = set()
+    parsed_names = parse_filenames(show.name for show in shows)
 
     for show in shows:
         src = working_directory.joinpath(show)
-        show_name, _ = parse_filename(show.name)
+        show_name, _ = parsed_names[show.name]
 
         # Skip if user already declined to add this show
         if show_name in rejected_shows:
-            log.info(f"Skipping {show.name} (previously rejected show: {show_name})")
+            log.info("Skipping %s (previously rejected show: %s)", show.name, show_name)
             continue
 
-        dest = _build_show_destination(show)
+        dest = build_show_destination(show)
 
         if dest:
             files_to_move[src] = dest
         elif show_name:
             rejected_shows.add(show_name)
 
-    _perform_moves(files_to_move, "shows", debug)
+    cache = CLASSIFIER.cache_info()
+    log.debug("Filename cache after resolving shows: hits=%s, misses=%s", cache.hits, cache.misses)
 
+    perform_moves(files_to_move, "shows", debug, jobs, verify=verify)
 
-# --------------------------------------------------------------------------------
-# Private Functions
-# --------------------------------------------------------------------------------
 
+@METRICS.timed("move")
+def perform_moves(
+    files_to_move: dict[Path, Path],
+    media_type: str,
+    debug: bool = False,
+    jobs: int = 1,
+    journal: MoveJournal | None = None,
+    verify: bool = False,
+) -> None:
+    """Move files from source to destination paths.
 
-def _build_movie_destination(movie_path: Path) -> Path | None:
-    """Builds the destination path for a movie file within a selected movie library.
+    With jobs > 1 the moves run on a thread pool. Moves onto the same destination
+    device are still limited to CONFIG.max_moves_per_device at a time so parallel
+    streams only overlap across different disks or arrays.
 
-    Args:
-        movie_name (str): The name of the movie file.
+    Cross-device copies are recorded in the move journal as they start, so an
+    interrupted copy can be continued with resume_moves().
 
-    Returns:
-        Path | None: The destination path for the movie file within the selected library,
-                     or None if no valid library is selected or found.
+    Args:
+        files_to_move: Dictionary mapping source paths to destination paths
+        media_type: Type of media being moved (e.g., "movies", "shows")
+        debug: If True, run in simulation mode without making actual changes
+        jobs: Number of files to move concurrently
+        journal: Move journal to record the moves in, opened if not supplied
+        verify: If True, checksum cross-device copies before removing the source
     """
-    log.debug(f"Processing movie: {movie_path}")
-    library_path = _choose_library(CONFIG.movies, "Select a movie library:")
-    filename_without_extension = movie_path.stem
-    cleaned_filename = filename_without_extension.replace("-4K", "").replace("-hdr", "")
-    log.debug(f"Using library: {library_path}")
-    if not library_path:
-        log.warning("No valid movie library selected or found.")
-        return None
+    if not files_to_move:
+        return
 
-    destination = library_path / cleaned_filename / movie_path.name
-    log.debug(f"Destination: {destination}")
-    return Path(destination)
+    log.info("\nThe following %s will be moved:", media_type)
+    for _, dest in files_to_move.items():
+        log.info("%s", dest)
 
+    question = f"Do you want to move these {media_type}?"
+    subject = [f"{src} -> {dest}" for src, dest in files_to_move.items()]
+    if not get_decider().confirm("move", question, subject):
+        return
 
-def _build_show_destination(show_path: Path) -> Path | None:
-    """Constructs the destination path for a given show name.
+    journal = None if debug else journal or MoveJournal()
 
-    This function attempts to parse the season and episode information from the
-    provided show name. If successful, it constructs a destination path based on
-    a predefined mapping of shows. If the show is not found in the mapping, it
-    prompts the user to provide a new show path.
+    limiter = DeviceLimiter(CONFIG.max_moves_per_device)
+    start = time.perf_counter()
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="move") as pool:
+            futures = [
+                pool.submit(move_one, src, dest, debug, limiter, journal, verify)
+                for src, dest in files_to_move.items()
+            ]
+            moved = [future.result() for future in futures]
+    else:
+        moved = [
+            move_one(src, dest, debug, limiter, journal, verify) for src, dest in files_to_move.items()
+        ]
+    elapsed = time.perf_counter() - start
 
-    Args:
-        show_name (str): The name of the show, including season and episode information.
+    if journal:
+        journal.compact()
 
-    Returns:
-        Path | None: The constructed destination path for the show, or None if the
-        season/episode information could not be parsed.
+    total_bytes = sum(moved)
+    if total_bytes:
+        rate = total_bytes / elapsed / 2**20 if elapsed else 0.0
+        log.info(
+            "Moved %s %s (%.2f GiB) in %.1f seconds (%.1f MiB/s)",
+            sum(1 for size in moved if size),
+            media_type,
+            total_bytes / 2**30,
+            elapsed,
+            rate,
+        )
+
+
+def resume_moves(debug: bool = False, jobs: int = 1, verify: bool = False) -> None:
+    """Continue the moves left unfinished by an interrupted run.
+
+    Reads the move journal, skips completed entries and continues partial
+    cross-device copies from their last checkpoint instead of from zero.
+
+    Args:
+        debug: If True, run in simulation mode without making actual changes
+        jobs: Number of files to move concurrently
+        verify: If True, checksum cross-device copies before removing the source
     """
-    log.info(f"Processing show: {show_path}")
-    show_name, season_episode = parse_filename(show_path.name)
-    log.debug(f"Show name: {show_name} | Season/Episode: {season_episode}")
-    if not season_episode:
-        log.warning(f"Could not parse season/episode from {show_name}")
-        return None
+    journal = MoveJournal()
+    files_to_move = {}
+    for entry in journal.pending():
+        src, dest = Path(entry.src), Path(entry.dest)
+        if src.exists():
+            files_to_move[src] = dest
+        elif dest.exists() and dest.stat().st_size == entry.size:
+            # Interrupted after the source was unlinked but before it was journaled
+            log.info("Already moved: %s", dest)
+            journal.complete(src)
+        else:
+            log.warning("Cannot resume %s -> %s: source no longer exists", src, dest)
+            journal.discard(src)
 
-    base_show_name = show_name.split(season_episode)[0].rstrip("_").lstrip("_")
-    season_name = _split_season_episode(season_episode)[0].replace("s", "season_")
-    if season_name == "season_00":
-        season_name = "specials"
+    if not files_to_move:
+        log.info("No interrupted moves to resume")
+        if not debug:
+            journal.compact()
+        return
 
-    log.debug(f"Base show name: {base_show_name} | Season name: {season_name}")
+    perform_moves(files_to_move, "interrupted moves", debug, jobs, journal, verify)
 
-    try:
-        show_map = get_show_map()
-        matched_path = Path(show_map["Shows"][base_show_name])
-        destination = matched_path / season_name / show_path.name
-        log.debug(f"destination: {destination}")
-        return destination
 
-    except KeyError:
-        return _prompt_for_new_show(base_show_name, season_name, show_path.name)
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
 
 
-def _choose_library(library_dict: dict[str, str], prompt: str) -> Path | None:
+def _choose_library(library_dict: dict[str, str], prompt: str, subject: str) -> Path | None:
     """Selects a library from a dictionary of library names and their corresponding paths.
 
+    The default movie library from the rules file is used when it is set; otherwise
+    the user is asked, or in an unattended run the choice is queued as pending.
+
     Args:
         library_dict (dict[str, str]): A dictionary where keys are library names and values are their paths.
         prompt (str): A prompt message to display when asking the user to choose a library.
+        subject (str): The file the library is chosen for, recorded if the choice is deferred.
 
     Returns:
-        Path | None: The path of the selected library as a Path object, or None if the dictionary is empty.
+        Path | None: The path of the selected library as a Path object, or None if the dictionary
+        is empty or the choice was deferred.
     """
     if not library_dict:
         return None
 
-    library_names = list(library_dict.keys())
-    if len(library_names) > 1:
-        choice = ask_multichoice(library_names, prompt)
-        return Path(library_dict[choice])
-    return Path(library_dict[library_names[0]])
+    decider = get_decider()
+    default_library = decider.rules.default_movie_library
+    if default_library in library_dict:
+        return Path(library_dict[default_library])
 
+    choice = decider.choose("movie_library", prompt, list(library_dict.keys()), subject)
+    return Path(library_dict[choice]) if choice else None
 
-def _get_empty_dirs(working_directory: Path) -> list[Path]:
-    """Identify empty directories within a given root directory.
 
-    This function scans the specified root directory and identifies directories
-    that can be considered empty based on the absence of certain file types.
-    A directory is considered empty if it does not contain any files with
-    extensions listed in DO_NOT_DELETE or any video files that are not samples
-    or trailers.
+def _device_label(device: int) -> str:
+    """Name a destination device for the metrics by the libraries stored on it.
 
     Args:
-        working_directory (Path): The root directory to scan for empty directories.
+        device: st_dev of the destination directory
 
     Returns:
-        list: A list of Path objects representing directories that can be deleted.
+        str: Library names joined with "+", or "major:minor" if no library is on it
     """
-    dirs_to_delete = []
-    for dir_obj in dir_scan(working_directory):
-        delete = True
-        for file_obj in dir_scan(dir_obj.path, True):
-            _, file_ext = os.path.splitext(file_obj.name)
-            if file_ext in CONFIG.downloading_indicators:
-                delete = False
-                break
-            if any(x in file_ext for x in CONFIG.valid_extensions):
-                if "sample" in file_obj.name.lower() or "trailer" in file_obj.name.lower():
-                    continue
-                delete = False
-        if delete:
-            dirs_to_delete.append(working_directory.joinpath(dir_obj.name))
-    return dirs_to_delete
+    names = [
+        name
+        for libraries in (CONFIG.shows, CONFIG.movies, CONFIG.music)
+        for name, path in libraries.items()
+        if CONFIG.library_devices.get(path) == device
+    ]
+    return "+".join(sorted(set(names))) or f"{os.major(device)}:{os.minor(device)}"
 
 
-def _get_files_to_extract(working_directory: Path) -> dict[Path, Path]:
-    """Scans the given root directory and identifies files to be extracted.
+def _abandon_copy(src: Path, dest: Path, journal: MoveJournal | None) -> None:
+    """Clean up after a cross-device copy that could not be completed.
+
+    A journaled partial copy is kept so it can be resumed. Without a journal the
+    partial destination is removed, so later runs don't treat it as already moved.
+    """
+    if journal:
+        journal.failed(src)
+    elif os.path.exists(src):
+        dest.unlink(missing_ok=True)
 
-    This function recursively scans the root directory and its subdirectories,
-    identifying files that are ready to be extracted. It skips directories
-    that should not be processed and handles files that are still downloading.
+
+def _check_copied(src: Path, dest: Path, size: int, copied: int) -> None:
+    """Make sure a cross-device copy is complete before the source is removed.
 
     Args:
-        working_directory (Path): The root directory to scan for files to extract.
+        src: Source file path
+        dest: Destination file path
+        size: Source size in bytes when the copy started
+        copied: Bytes reported as copied
 
-    Returns:
-        dict: A dictionary where the keys are the original file paths and the
-              values are the new paths for the files to be extracted.
+    Raises:
+        OSError: If the copy is short or the destination size does not match
+    """
+    dest_size = os.stat(dest).st_size
+    if copied != size or dest_size != size:
+        raise OSError(
+            errno.EIO,
+            f"Incomplete copy: {copied} of {size} bytes copied, destination has {dest_size} bytes",
+            str(dest),
+        )
+
+
+def _copy_file(
+    src: Path, dest: Path, size: int, journal: MoveJournal | None = None, verify: bool = False
+) -> None:
+    """Copy src to dest for a cross-device move, continuing a journaled partial copy.
+
+    Args:
+        src: Source file path
+        dest: Destination file path
+        size: Source size in bytes
+        journal: Move journal to checkpoint progress in
+        verify: If True, hash the data while copying and check the copy read back from disk
 
     Raises:
-        Exception: If an error occurs during the directory scanning or file processing.
+        OSError: If the copy fails, is incomplete or doesn't match the source
     """
-    files_to_extract = {}
+    offset = journal.resume_offset(src, dest) if journal else 0
+    with open(src, "rb") as fsrc, open(dest, "r+b" if offset else "wb") as fdst:
+        if offset:
+            log.info("Resuming copy of %s at %.2f GiB", src, offset / 2**30)
+            fdst.truncate(offset)
+
+        def checkpoint(copied: int) -> None:
+            os.fsync(fdst.fileno())
+            journal.progress(src, copied)
+
+        if verify:
+            copied, src_digest = _copy_file_verified(
+                fsrc.fileno(), fdst.fileno(), size, offset, checkpoint if journal else None
+            )
+        else:
+            copied = _copy_file_data(
+                fsrc.fileno(), fdst.fileno(), size, offset, checkpoint if journal else None
+            )
+        os.fsync(fdst.fileno())
+    _check_copied(src, dest, size, copied)
+    if verify:
+        _verify_copy(dest, size, src_digest)
+
+
+def _copy_file_verified(
+    src_fd: int,
+    dest_fd: int,
+    size: int,
+    offset: int = 0,
+    checkpoint: Callable[[int], None] | None = None,
+) -> tuple[int, bytes]:
+    """Copy a file's data through a userspace buffer while hashing it.
+
+    Each VERIFY_CHUNK_SIZE chunk is read once into a reused buffer, fed to the
+    hash and written out, so checksumming the source costs no extra reads. When
+    resuming at an offset, the already copied prefix of the source is hashed
+    first so the digest always covers the whole file.
 
-    try:
-        working_directory = Path(working_directory)
-        for dir_obj in dir_scan(working_directory):
-            if _should_skip_directory(dir_obj):
-                continue
+    Args:
+        src_fd: Source file descriptor opened for reading
+        dest_fd: Destination file descriptor opened for writing
+        size: Number of bytes the source is expected to hold
+        offset: Byte offset to start copying from, in both files
+        checkpoint: Called with the offset reached after every CHECKPOINT_BYTES copied
 
-            tmpdict = {}
-            still_downloading = False
+    Returns:
+        tuple[int, bytes]: Offset reached and the digest of the source data
+    """
+    digest = hashlib.blake2b(digest_size=VERIFY_DIGEST_SIZE)
+    buffer = bytearray(VERIFY_CHUNK_SIZE)
+    view = memoryview(buffer)
+
+    position = 0
+    while position < offset:
+        read = os.preadv(src_fd, [view[: min(VERIFY_CHUNK_SIZE, offset - position)]], position)
+        if read == 0:
+            break
+        digest.update(view[:read])
+        position += read
+
+    copied = offset
+    next_checkpoint = offset + CHECKPOINT_BYTES
+    while copied < size:
+        read = os.preadv(src_fd, [view[: min(VERIFY_CHUNK_SIZE, size - copied)]], copied)
+        if read == 0:
+            break
+        digest.update(view[:read])
+
+        written = 0
+        while written < read:
+            written += os.pwrite(dest_fd, view[written:read], copied + written)
+        copied += read
+
+        if checkpoint and copied >= next_checkpoint:
+            checkpoint(copied)
+            next_checkpoint = copied + CHECKPOINT_BYTES
+
+    return copied, digest.digest()
+
+
+def _copy_file_data(
+    src_fd: int,
+    dest_fd: int,
+    size: int,
+    offset: int = 0,
+    checkpoint: Callable[[int], None] | None = None,
+) -> int:
+    """Copy a file's data between descriptors in bounded chunks until done.
+
+    Prefers os.copy_file_range(), which lets NFS 4.2 and btrfs/XFS copy server-side
+    or by reflink, and falls back to os.sendfile() when the kernel or filesystem
+    does not support it. Each call copies at most COPY_CHUNK_SIZE bytes, so files
+    larger than the ~2 GiB per-call kernel limit are copied completely.
+
+    Args:
+        src_fd: Source file descriptor opened for reading
+        dest_fd: Destination file descriptor opened for writing
+        size: Number of bytes the source is expected to hold
+        offset: Byte offset to start copying from, in both files
+        checkpoint: Called with the offset reached after every CHECKPOINT_BYTES copied
+
+    Returns:
+        int: Offset reached, which equals size unless the source was truncated
 
+    Raises:
+        OSError: If the kernel reports an error other than an unsupported copy method
+    """
+    copied = offset
+    next_checkpoint = offset + CHECKPOINT_BYTES
+    use_copy_range = hasattr(os, "copy_file_range")
+    os.lseek(dest_fd, copied, os.SEEK_SET)
+
+    while copied < size:
+        count = min(COPY_CHUNK_SIZE, size - copied)
+        if use_copy_range:
             try:
-                for file_obj in dir_scan(dir_obj.path, True):
-                    try:
-                        log.debug(f"Processing file: {file_obj.name}")
-                        new_path, still_downloading = _process_file(file_obj, working_directory)
-                        log.debug(f"File {file_obj.name} processed: Is downloading? {still_downloading}")
-                        if still_downloading:
-                            break
-                        if new_path:
-                            log.debug(f"\tAdding file to extraction list: {file_obj.path} -> {new_path}")
-                            tmpdict[Path(file_obj.path)] = Path(new_path)
-                    except Exception as e:
-                        log.error(f"Error processing file {file_obj.name}: {e}")
-                        continue
-
-                if not still_downloading:
-                    files_to_extract.update(tmpdict)
-            except Exception as e:
-                log.error(f"Error scanning directory {dir_obj.path}: {e}")
+                sent = os.copy_file_range(src_fd, dest_fd, count, copied, copied)
+            except OSError as e:
+                if e.errno not in _COPY_RANGE_UNSUPPORTED:
+                    raise
+                log.debug("copy_file_range() unavailable (%s), using sendfile()", e.strerror)
+                use_copy_range = False
+                os.lseek(dest_fd, copied, os.SEEK_SET)
                 continue
+        else:
+            sent = os.sendfile(dest_fd, src_fd, copied, count)
 
-    except Exception as e:
-        log.error(f"An error occurred while getting files to extract: {e}")
-        log.debug("Error details:", exc_info=True)
+        if sent == 0:
+            # Source ended early; the caller's size check reports the short copy
+            break
+        copied += sent
 
-    return files_to_extract
+        if checkpoint and copied >= next_checkpoint:
+            checkpoint(copied)
+            next_checkpoint = copied + CHECKPOINT_BYTES
 
+    return copied
 
-def _move_file(src: Path, dest: Path) -> float:
-    """Move a file reliably across filesystems and return elapsed time in seconds.
 
-    Attempts multiple methods in order of preference:
-    1. os.rename() (fastest, same filesystem)
-    2. sendfile() (zero-copy, Linux-only)
-    3. shutil.copyfile() + unlink() (fallback)
+def _verify_copy(dest: Path, size: int, expected: bytes) -> None:
+    """Hash a copied file as read back from disk and compare it with the source digest.
+
+    The destination's cached pages are dropped with posix_fadvise(DONTNEED) before
+    and while it is read, so the check reads what the filesystem stored rather
+    than what is still in the page cache, and doesn't evict other cached data.
 
     Args:
-        src: Source file path
         dest: Destination file path
-
-    Returns:
-        float: Time taken to perform the move in seconds
+        size: Expected size in bytes
+        expected: Digest of the source data
 
     Raises:
-        OSError: If all move attempts fail
+        OSError: If the digests differ; the corrupt destination is removed first
     """
-    import time
-
-    start = time.perf_counter()
+    digest = hashlib.blake2b(digest_size=VERIFY_DIGEST_SIZE)
+    buffer = bytearray(VERIFY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    can_advise = hasattr(os, "posix_fadvise")
 
+    fd = os.open(dest, os.O_RDONLY)
     try:
-        os.rename(src, dest)
-        log.debug(f"Moved {src} -> {dest} using os.rename")
-        return time.perf_counter() - start
-    except OSError as e:
-        if e.errno != errno.EXDEV:
-            log.error(f"Failed to move {src} -> {dest}: {e}")
-            raise
+        if can_advise:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        position = 0
+        while position < size:
+            read = os.preadv(fd, [view[: min(VERIFY_CHUNK_SIZE, size - position)]], position)
+            if read == 0:
+                break
+            digest.update(view[:read])
+            if can_advise:
+                os.posix_fadvise(fd, position, read, os.POSIX_FADV_DONTNEED)
+            position += read
+    finally:
+        os.close(fd)
 
-    try:
-        with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
-            os.sendfile(fdst.fileno(), fsrc.fileno(), 0, os.stat(src).st_size)
-        os.unlink(src)
-        log.debug(f"Moved {src} -> {dest} using sendfile()")
-        return time.perf_counter() - start
-    except OSError as e:
-        log.error(f"Failed to move {src} -> {dest} using sendfile(): {e}")
+    if digest.digest() != expected:
+        dest.unlink(missing_ok=True)
+        raise OSError(errno.EIO, "Checksum mismatch after copy, destination removed", str(dest))
+    log.debug("Verified %s: blake2b %s", dest, expected.hex())
 
-    try:
-        shutil.copyfile(src, dest)
-        os.unlink(src)
-        log.debug(f"Moved {src} -> {dest} using shutil.copyfile() + unlink()")
-        return time.perf_counter() - start
-    except OSError as e:
-        log.error(f"Failed to move {src} -> {dest} using shutil.copyfile() + unlink(): {e}")
-        raise
 
+def _plan_folder_removal(folder: str, tree: TreeScan | None = None) -> "FolderRemoval | None":
+    """Decide in one post-order walk whether a download folder can be deleted.
 
-def _perform_moves(files_to_move: dict[Path, Path], media_type: str, debug: bool = False) -> None:
-    """Move files from source to destination paths.
+    The folder can go if nothing anywhere below it is a video worth keeping or
+    still downloading, so a Subs/ or Sample/ subfolder doesn't keep it alive and
+    a Season 1/ subfolder holding episodes isn't deleted with it. The walk
+    stops at the first file worth keeping. Levels the snapshot covers are read
+    from it; deeper levels are listed once each.
 
     Args:
-        files_to_move: Dictionary mapping source paths to destination paths
-        media_type: Type of media being moved (e.g., "movies", "shows")
-        debug: If True, run in simulation mode without making actual changes
-    """
-    if not files_to_move:
-        return
+        folder: Download folder to check
+        tree: Snapshot of the working directory, if any
 
-    log.info(f"\nThe following {media_type} will be moved:")
-    for _, dest in files_to_move.items():
-        log.info(f"{dest}")
-
-    if ask_bool(f"Do you want to move these {media_type}?"):
-        for src, dest in files_to_move.items():
-            log.debug(f"Creating directory: {dest.parent}")
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            if dest.exists():
-                log.info(f"File already exists: {dest}, skipping...")
-            else:
+    Returns:
+        FolderRemoval | None: What to delete and the bytes it frees, None if the folder is kept
+    """
+    keep = (FILE_DOWNLOADING, FILE_VALID)
+    removal = FolderRemoval(Path(folder))
+    pending = [(folder, False)]
+    while pending:
+        path, children_done = pending.pop()
+        if children_done:
+            removal.dirs.append(path)
+            continue
+        pending.append((path, True))
+
+        if tree is not None and tree.covers(path):
+            entries = tree.dirs(path) + tree.files(path)
+        else:
+            entries = list(walk_tree(path, 1))
+        for entry in entries:
+            symlink = entry.is_symlink()
+            if entry.is_dir() and not symlink:
+                pending.append((entry.path, False))
+                continue
+            if MATCHER.match(entry.name) in keep:
+                return None
+            removal.files.append(entry.path)
+            if not symlink:
                 try:
-                    if not debug:
-                        log.info(f"Moving: {src} -> {dest}")
-                        elapsed = _move_file(src, dest)
-                        log.info(f"Moved in {elapsed:.3f} seconds")
-                    else:
-                        log.info(f"[Debug] Moving: {src} -> {dest}")
-                except Exception as e:
-                    log.error(f"Failed to move {src} to {dest}: {e}")
+                    removal.size += entry.stat().st_size
+                except OSError:
+                    pass
+    return removal
 
 
-def _process_file(file_obj: DirEntry, working_directory: Path) -> tuple[Path | None, bool]:
+def _process_file(file_obj: ScanEntry, working_directory: Path) -> tuple[Path | None, bool]:
     """Process a single file to determine if it should be extracted."""
     filename = file_obj.name
 
     try:
-        if any(ind in filename for ind in CONFIG.downloading_indicators):
-            log.debug(f"\tFile {filename} is still downloading.")
+        kind = MATCHER.match(filename)
+        if kind == FILE_DOWNLOADING:
+            log.debug("\tFile %s is still downloading.", filename)
             return None, True
 
-        _, ext = os.path.splitext(filename)
-
-        if ext not in CONFIG.valid_extensions:
-            log.debug(f"\tFile {filename} does not match valid extensions.")
-            return None, False
-
-        if ext in CONFIG.excluded_extensions:
-            log.debug(f"\tFile {filename} is excluded from processing.")
+        if kind != FILE_VALID:
+            log.debug("\tFile %s is %s, not extracting.", filename, kind)
             return None, False
 
-        if any(keyword in filename.lower() for keyword in CONFIG.ignore_keywords):
-            log.debug(f"\tFile {filename} matches ignore keywords.")
-            return None, False
-
-        log.debug(f"\tFile {filename} is valid for processing.")
+        log.debug("\tFile %s is valid for processing.", filename)
         return working_directory / filename, False
 
     except AttributeError as e:
-        log.error(f"Invalid file object for {filename}: {e}")
+        log.error("Invalid file object for %s: %s", filename, e)
         return None, False
     except Exception as e:
-        log.error(f"Error processing file {filename}: {e}")
+        log.error("Error processing file %s: %s", filename, e)
         return None, False
 
 
-def _prompt_for_new_show(show_name: str, season_name: str, filename: str) -> Path | None:
+def _prompt_for_new_show(
+    show_name: str, season_name: str, filename: str, new_shows: dict[str, Path] | None = None
+) -> Path | None:
     """If the show isn't in shows_map.ini, asks user whether to add it.
     Prompts for library type (Television/Documentaries), network, etc.
     Returns the newly created path or None if user declines.
-    """
-    log.warning(f"Show '{show_name}' does not exist.")
-    if not ask_bool(f"Do you want to add '{show_name}'?"):
-        return None
 
-    choice = ask_multichoice(["Television", "Documentaries"])
+    A show rule from the rules file that matches the show name decides the
+    library and network without asking. In an unattended run (--yes or --batch)
+    a show no rule covers is queued in the pending report and its file skipped.
+    If new_shows is given the show folder is recorded there instead of being
+    created and added to the show map.
+    """
+    log.warning("Show '%s' does not exist.", show_name)
+    decider = get_decider()
     show_libraries = CONFIG.shows
+
+    rule = decider.rules.match_show(show_name)
+    if rule:
+        choice, show_network = rule
+        log.info("Adding '%s' to %s/%s by rule", show_name, choice, show_network)
+    else:
+        question = f"Do you want to add '{show_name}'?"
+        if decider.unattended:
+            decider.defer("add_show", show_name, question, file=filename, season=season_name)
+            return None
+        if not decider.confirm("add_show", question, show_name):
+            return None
+
+        choice = ask_multichoice(["Television", "Documentaries"])
+        show_network = ask_text_input("Please enter the network the show is on (e.g., 'HBO', 'BBC'):")
+
     if choice in show_libraries:
         base_library_path = Path(show_libraries[choice])
     else:
-        log.warning(f"{choice} not found in SHOW_LIBRARIES, defaulting to /media/Television.")
+        log.warning("%s not found in SHOW_LIBRARIES, defaulting to /media/Television.", choice)
         base_library_path = Path("/media/Television")
 
-    show_network = ask_text_input("Please enter the network the show is on (e.g., 'HBO', 'BBC'):")
-
-    new_show_dir = base_library_path.joinpath(show_network, show_name, season_name)
-    log.info(f"Making new show directory: {new_show_dir}")
+    show_dir = base_library_path.joinpath(show_network, show_name)
+    new_show_dir = show_dir.joinpath(season_name)
+    if new_shows is not None:
+        new_shows[show_name] = show_dir
+        return new_show_dir.joinpath(filename)
+    log.info("Making new show directory: %s", new_show_dir)
     os.makedirs(new_show_dir, exist_ok=True)
 
-    make_shows_map()
+    get_show_map().add(show_name, show_dir)
 
     return new_show_dir.joinpath(filename)
 
 
-def _split_season_episode(season_episode: str) -> tuple[str, str]:
-    """Splits a season and episode string into separate components.
-
-    Args:
-        season_episode (list): A list containing a single string in the format "SxxExx",
-                               where "Sxx" represents the season and "Exx" represents the episode.
-
-    Returns:
-        tuple: A tuple containing the season as a string and the episode as a string.
-    """
-    season_episode = season_episode.lstrip("_").rstrip("_")
-    split = season_episode.split("e")
-    season = split[0]
-    episode = f"e{split[1]}"
-    return season, episode
+def _remove_folder(removal: "FolderRemoval") -> None:
+    """Unlink the planned files of a folder, then rmdir its directories deepest first."""
+    try:
+        for file_path in removal.files:
+            try:
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
+        for dir_path in removal.dirs:
+            os.rmdir(dir_path)
+        METRICS.count("dirs_deleted")
+    except OSError as e:
+        log.error("Error deleting %s: %s (%s)", removal.path, e.strerror, e.filename)
 
 
-def _should_skip_directory(dir_obj: DirEntry) -> bool:
+def _should_skip_directory(dir_obj: ScanEntry) -> bool:
     """Determines whether a directory should be skipped based on its name.
 
     Args:
-        dir_obj (DirEntry): A DirEntry object representing a directory to check.
+        dir_obj (ScanEntry): Entry representing a directory to check.
 
     Returns:
         bool: True if the directory's name is "_in-progress", indicating it should be skipped; False otherwise.
@@ -1,12 +1,27 @@
+import json
 import logging
 import os
 import re
+import time
 import traceback
+from collections import defaultdict
+from collections.abc import Collection
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Union
 
 from filetools import CONFIG
-from filetools.utils import dir_scan, parse_filename
+from filetools.metrics import METRICS
+from filetools.utils import (
+    CLASSIFIER,
+    FILE_DELETABLE,
+    FILE_VALID,
+    MATCHER,
+    WORK_TREE_DEPTH,
+    FilenameInfo,
+    ScanEntry,
+    TreeScan,
+)
 
 log = logging.getLogger("filetools")
 
@@ -14,35 +29,278 @@ log = logging.getLogger("filetools")
 # Globals
 # --------------------------------------------------------------------------------
 
+# Already renamed show: show_name_s01e01[_[flags]].ext
+SHOW_NAME_PATTERN = re.compile(
+    r"""^
+    ([a-z0-9]+          # First word
+    (?:_[a-z0-9]+)*)    # Additional words, each preceded by single underscore
+    _                   # Single underscore before season/episode
+    s\d{2,4}e\d{2}      # Season and starting episode
+    (?:-e\d{2})?        # Optional ending episode (multi-episode support)
+    (?:_\[[\w_]+\])?    # Optional quality flags with leading underscore
+    \.[a-z0-9]+         # File extension
+    $""",
+    re.VERBOSE,
+)
+
+# Already renamed movie: movie_name_(2023).ext
+MOVIE_NAME_PATTERN = re.compile(
+    r"""^
+    ([a-z0-9]+
+    (?:_[a-z0-9]+)*)    # Additional words, each preceded by single underscore
+    _\(\d{4}\)          # Year in parentheses with underscore before
+    \.[a-z0-9]+         # File extension
+    $""",
+    re.VERBOSE,
+)
+
+# Undo manifest of the last batch of renames, next to the settings file
+RENAME_MANIFEST_FILE = "rename_undo.json"
+
+# Name a chained rename's source is parked under while its target is freed up
+_RENAME_TMP_NAME = ".{name}.rename-tmp"
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class RenamePlan:
+    """Every rename, deletion and skip for one directory, computed before anything changes.
+
+    Attributes:
+        renames: Source paths mapped to their new paths
+        deletes: Files to delete
+        unchanged: Files that already have their standard name
+        collisions: Target paths claimed by more than one file, or by a file that
+                    already exists and isn't renamed away, mapped to the files
+                    that wanted them; none of these are renamed
+    """
+
+    renames: dict[Path, Path] = field(default_factory=dict)
+    deletes: list[Path] = field(default_factory=list)
+    unchanged: list[Path] = field(default_factory=list)
+    collisions: dict[Path, list[Path]] = field(default_factory=dict)
+
+
 # --------------------------------------------------------------------------------
 # Public Functions
 # --------------------------------------------------------------------------------
 
 
-def rename_files(target_dir: Path, debug: bool = False) -> None:
+def apply_renames(
+    plan: RenamePlan, debug: bool = False, earlier: dict[Path, Path] | None = None
+) -> dict[Path, Path]:
+    """Delete and rename the files of a plan.
+
+    The undo manifest is written before the first rename, so even an interrupted
+    batch can be reverted with undo_renames().
+
+    Args:
+        plan: Plan from plan_renames()
+        debug: If True, log the renames without making them
+        earlier: Renames already made in the same batch, kept in the undo manifest
+
+    Returns:
+        dict[Path, Path]: Renames that were made, source to new path
+    """
+    for path in plan.deletes:
+        log.info("Deleting.....%s", path.name, extra={"event": "delete", "src": path})
+        try:
+            os.remove(path)
+            METRICS.count("files_deleted")
+        except OSError as e:
+            log.error("Failed to delete %s: %s", path.name, e)
+
+    if not plan.renames:
+        return {}
+    if debug:
+        for src, dest in plan.renames.items():
+            log.info("[Debug] Renaming.....%s -> %s", src.name, dest.name)
+        return {}
+
+    _write_rename_manifest({**earlier, **plan.renames} if earlier else plan.renames)
+    done = _apply_rename_batch(plan.renames)
+    if len(done) < len(plan.renames):
+        # Undo must not touch a file that took a refused target's place
+        _write_rename_manifest({**earlier, **done} if earlier else done)
+    METRICS.count("files_renamed", len(done))
+    return done
+
+
+def plan_renames(
+    file_objs: list[ScanEntry] | list[os.DirEntry], others: Collection[Path] = ()
+) -> RenamePlan:
+    """Work out the new name of every file in a directory in one pass.
+
+    All targets are computed in memory first. Targets wanted by more than one
+    file, and targets taken by a file that stays where it is, are collisions:
+    those files keep their names and a warning is logged, instead of whichever
+    file happens to be renamed first winning.
+
+    Args:
+        file_objs: All files directly inside one directory
+        others: Paths of further files in the directory that are not renamed
+
+    Returns:
+        RenamePlan: What apply_renames() will do
+    """
+    plan = RenamePlan()
+    wanted: dict[Path, list[Path]] = defaultdict(list)
+
+    for file_obj in file_objs:
+        path = Path(file_obj.path)
+        kind = MATCHER.match(file_obj.name)
+        if kind == FILE_DELETABLE:
+            plan.deletes.append(path)
+            continue
+        if kind != FILE_VALID:
+            continue
+
+        try:
+            new_name = _target_name(file_obj.name)
+        except Exception as e:
+            log.error("Failed to rename %s: %s\n%s", file_obj.name, e, traceback.format_exc())
+            continue
+        if new_name is None or new_name == file_obj.name:
+            log.info("Skipping.....%s (already properly formatted)", file_obj.name)
+            plan.unchanged.append(path)
+            continue
+        wanted[path.with_name(new_name)].append(path)
+
+    listed = {Path(file_obj.path) for file_obj in file_objs}
+    present = (listed | set(others) if others else listed) - set(plan.deletes)
+    blocked, staying = _blocked_targets(wanted, present)
+
+    for dest, sources in wanted.items():
+        if dest in blocked:
+            plan.collisions[dest] = sources
+            names = ", ".join(src.name for src in sources)
+            reason = "already exists" if dest in staying else "is wanted by several files"
+            log.warning("Not renaming %s: %s %s", names, dest.name, reason)
+            continue
+        plan.renames[sources[0]] = dest
+
+    return plan
+
+
+def rename_manifest_path() -> Path:
+    """Return the location of the undo manifest of the last rename batch.
+
+    Returns:
+        Path: rename_undo.json in the same directory as the settings file
+    """
+    return Path(CONFIG.settings_path).parent.joinpath(RENAME_MANIFEST_FILE)
+
+
+@METRICS.timed("rename")
+def rename_files(target_dir: Path, debug: bool = False, tree: TreeScan | None = None) -> None:
     """Scan and rename files in target directory using standardized naming conventions.
 
     Args:
         target_dir: Directory containing files to be renamed
         debug: If True, run in simulation mode without making actual changes
+        tree: Snapshot of target_dir shared with the other steps; scanned if None
 
     Raises:
         OSError: If file operations fail
     """
-    for file_obj in dir_scan(target_dir, get_files=True):
-        # Update to use correct config attribute
-        if _should_delete(file_obj.name):
-            log.info(f"Deleting.....{file_obj.name}")
-            os.remove(file_obj.path)
-            continue
+    tree = tree or TreeScan(target_dir, WORK_TREE_DEPTH)
+    plan = plan_renames(tree.files(target_dir))
+    renamed = apply_renames(plan, debug)
+
+    # Drop every old name first, a chained rename's target is another file's old name
+    for path in [*plan.deletes, *renamed]:
+        tree.remove(path)
+    for src, dest in renamed.items():
+        tree.move(src, dest)
+    if renamed:
+        log.info("Renamed %s files, undo with --undo-renames", len(renamed))
+
+
+def sanitize_show_name(show_name: str) -> str:
+    """Clean up show name by removing unwanted words and special characters.
+
+    Args:
+        show_name: Original show name
+
+    Returns:
+        str: Sanitized show name in lowercase with single underscores only
+    """
+    log.debug("\tshow_name: %s", show_name)
+    sanitized_filename = show_name
+    # First remove unwanted words, most names contain none of them
+    for word in CONFIG.name_cleanup_flags:
+        if word in sanitized_filename:
+            sanitized_filename = sanitized_filename.replace(word, "")
+
+    log.debug("\tsanitized_filename: %s", sanitized_filename)
+
+    # Leading dots and spaces become underscores below and are stripped with them
+    sanitized_filename = (
+        sanitized_filename.lstrip()
+        .replace(" ", "_")
+        .replace(".", "_")
+        .replace("-", "_")
+        .replace("'", "")
+        .replace(",", "")
+        .replace("!", "")
+        .replace("?", "")
+    )
+
+    # Collapse runs of underscores, then trim them from both ends
+    while "__" in sanitized_filename:
+        sanitized_filename = sanitized_filename.replace("__", "_")
+    sanitized_filename = sanitized_filename.strip("_")
+
+    return sanitized_filename.lower()
 
-        # Update to use correct config attributes
-        file_ext = os.path.splitext(file_obj.name)[1]
-        if file_ext in CONFIG.valid_extensions and file_ext not in CONFIG.excluded_extensions:
-            try:
-                _rename(file_obj, debug)
-            except Exception as e:
-                log.error(f"Failed to rename {file_obj.name}: {e}\n{traceback.format_exc()}")
+
+def undo_renames(manifest: Path | None = None, debug: bool = False) -> dict[Path, Path]:
+    """Give the files of the last rename batch their old names back.
+
+    Files that were never renamed, because the batch was interrupted or a
+    rename failed, are left alone. The manifest is removed once every file is
+    back.
+
+    Args:
+        manifest: Undo manifest to replay, defaults to rename_manifest_path()
+        debug: If True, log the renames without making them
+
+    Returns:
+        dict[Path, Path]: Renames that were made, current name to old name
+    """
+    manifest = manifest or rename_manifest_path()
+    try:
+        with open(manifest) as f:
+            renames = json.load(f)["renames"]
+    except FileNotFoundError:
+        log.info("No renames to undo")
+        return {}
+    except (OSError, KeyError, json.JSONDecodeError) as e:
+        log.error("Unable to read rename manifest '%s': %s", manifest, e)
+        return {}
+
+    reverts: dict[Path, Path] = {}
+    for entry in renames:
+        src, dest = Path(entry["src"]), Path(entry["dest"])
+        tmp = _rename_tmp_path(src)
+        # An interrupted chained rename can leave the file under its temporary name
+        current = dest if dest.exists() else tmp if tmp.exists() else None
+        if current is not None and current != src:
+            reverts[current] = src
+
+    log.info("Undoing %s of %s renames from %s", len(reverts), len(renames), manifest)
+    if debug:
+        for current, old in reverts.items():
+            log.info("[Debug] Renaming.....%s -> %s", current.name, old.name)
+        return {}
+
+    done = _apply_rename_batch(reverts)
+    if len(done) == len(reverts):
+        manifest.unlink(missing_ok=True)
+    return done
 
 
 # --------------------------------------------------------------------------------
@@ -50,6 +308,62 @@ def rename_files(target_dir: Path, debug: bool = False) -> None:
 # --------------------------------------------------------------------------------
 
 
+def _apply_rename_batch(renames: dict[Path, Path]) -> dict[Path, Path]:
+    """Rename files whose targets are all free once the batch is done.
+
+    A target may be the current name of another file in the batch (a chain
+    like a -> b, b -> c, or a swap). Those sources are parked under a temporary
+    name first, so every target is free by the time it is renamed into.
+
+    Args:
+        renames: Source paths mapped to their new paths
+
+    Returns:
+        dict[Path, Path]: Renames that succeeded
+    """
+    parked = _park_chained_sources(renames)
+    done: dict[Path, Path] = {}
+
+    for src, dest in renames.items():
+        if dest not in renames and _rename_logged(src, src, dest):
+            done[src] = dest
+
+    for tmp, src in parked.items():
+        dest = renames[src]
+        if _rename_logged(src, tmp, dest):
+            done[src] = dest
+            continue
+        try:
+            os.rename(tmp, src)
+        except OSError:
+            log.error("%s was left behind as %s", src.name, tmp.name)
+
+    return done
+
+
+def _blocked_targets(wanted: dict[Path, list[Path]], present: set[Path]) -> tuple[set[Path], set[Path]]:
+    """Find the targets of a rename batch that can't be renamed into.
+
+    A target is blocked if several files want it, or if the file holding it
+    stays; blocking one target can keep its own holder in place, so repeat.
+
+    Args:
+        wanted: Targets mapped to the files that want them
+        present: Files in the directory once the deletions are done
+
+    Returns:
+        tuple[set[Path], set[Path]]: The blocked targets, and the present files that stay
+    """
+    blocked = {dest for dest, sources in wanted.items() if len(sources) > 1}
+    while True:
+        leaving = {sources[0] for dest, sources in wanted.items() if dest not in blocked}
+        staying = present - leaving
+        newly_blocked = {dest for dest in wanted if dest not in blocked and dest in staying}
+        if not newly_blocked:
+            return blocked, staying
+        blocked |= newly_blocked
+
+
 def _format_tv_show_name(
     sanitized_episode_name: str, season_episode: str, flags_name: str, file_ext: str
 ) -> str:
@@ -64,66 +378,40 @@ def _format_tv_show_name(
     Returns:
         str: Formatted filename in the pattern: show_name_s01e01[flags].ext
     """
-    log.debug(f"\tsanitized_episode_name: {sanitized_episode_name}")
-    log.debug(f"\tseason_episode: {season_episode}")
-    log.debug(f"\tflags_name: {flags_name}")
-    log.debug(f"\tfile_ext: {file_ext}")
+    log.debug("\tsanitized_episode_name: %s", sanitized_episode_name)
+    log.debug("\tseason_episode: %s", season_episode)
+    log.debug("\tflags_name: %s", flags_name)
+    log.debug("\tfile_ext: %s", file_ext)
     return f"{sanitized_episode_name}_{season_episode}{flags_name}{file_ext}".lower()
 
 
-def _format_movie_name(filename_wo_ext: str, file_ext: str) -> str:
+def _format_movie_name(filename_wo_ext: str, file_ext: str, info: FilenameInfo | None = None) -> str:
     """Format movie filename with year and quality flags.
 
     Args:
         filename_wo_ext: Movie name without extension
         file_ext: File extension including dot
+        info: Classifier result for filename_wo_ext, computed if not supplied
 
     Returns:
         str: Formatted filename in the pattern: movie_name(year)-4K-hdr.ext
     """
-    fk, hdr = "", ""
-    if "2160p" in filename_wo_ext:
-        fk = "-4K"
-    if any(hdr_tag in filename_wo_ext for hdr_tag in ["hdr", "hdr10plus"]):
-        hdr = "-hdr"
-
-    if "." in filename_wo_ext:
-        filename_wo_ext = "_".join(filename_wo_ext.split(".")).lower()
-    filename_wo_ext = filename_wo_ext.replace(" (", "_").replace(" ", "_").replace("'", "").lower()
-    year = _get_year(filename_wo_ext)
+    info = info or CLASSIFIER.classify(filename_wo_ext)
+    fk = "-4K" if info.uhd else ""
+    hdr = "-hdr" if info.hdr else ""
+
+    filename_wo_ext = (
+        filename_wo_ext.replace(".", "_").replace(" (", "_").replace(" ", "_").replace("'", "").lower()
+    )
+    year = info.year
     if year:
         filename_wo_ext_split = filename_wo_ext.split(year)[0]
         return f"{filename_wo_ext_split}({year}){fk}{hdr}{file_ext}"
 
-    log.warning(f"Failed to rename {filename_wo_ext}: No valid year found.")
+    log.warning("Failed to rename %s: No valid year found.", filename_wo_ext)
     return filename_wo_ext + file_ext
 
 
-def _get_year(target_string: str) -> str | None:
-    """Extract the most recent 4-digit year from a string.
-
-    Args:
-        target_string: String to search for year
-
-    Returns:
-        str | None: Most recent valid year between year_min and year_max, or None if not found
-    """
-    year_min = CONFIG.year_min
-    year_max = CONFIG.year_max
-    try:
-        matches = re.findall(r"[0-9]{4}", target_string)
-    except FileNotFoundError:
-        log.warning("NO YEAR MATCHES")
-        return None
-
-    filtered_matches = [m for m in matches if year_min <= int(m) <= year_max]
-
-    if not filtered_matches:
-        return None
-
-    return filtered_matches[-1]
-
-
 def _is_properly_formatted(file_name: str) -> bool:
     """Check if filename matches movie or TV show naming conventions and contains no illegal words.
 
@@ -152,123 +440,61 @@ def _is_properly_formatted(file_name: str) -> bool:
     if any(word.lower() in file_lower for word in CONFIG.name_cleanup_flags):
         return False
 
-    show_pattern = re.compile(
-        r"""^
-        ([a-z0-9]+          # First word
-        (?:_[a-z0-9]+)*)    # Additional words, each preceded by single underscore
-        _                   # Single underscore before season/episode
-        s\d{2,4}e\d{2}      # Season and starting episode
-        (?:-e\d{2})?        # Optional ending episode (multi-episode support)
-        (?:_\[[\w_]+\])?    # Optional quality flags with leading underscore
-        \.[a-z0-9]+         # File extension
-        $""",
-        re.VERBOSE,
-    )
-
-    movie_pattern = re.compile(
-        r"""^
-        ([a-z0-9]+
-        (?:_[a-z0-9]+)*)    # Additional words, each preceded by single underscore
-        _\(\d{4}\)          # Year in parentheses with underscore before
-        \.[a-z0-9]+         # File extension
-        $""",
-        re.VERBOSE,
-    )
-
-    return bool(movie_pattern.match(file_name) or show_pattern.match(file_name))
+    return bool(MOVIE_NAME_PATTERN.match(file_name) or SHOW_NAME_PATTERN.match(file_name))
 
 
-def _rename(file_obj: os.DirEntry | Path, debug: bool = False) -> None:
-    """Rename a file using standardized naming conventions.
-
-    Args:
-        file_obj: File object to rename
-        debug: If True, run in simulation mode without making actual changes
+def _park_chained_sources(renames: dict[Path, Path]) -> dict[Path, Path]:
+    """Move the sources whose new name is another source's old name out of the way.
 
-    Raises:
-        OSError: If rename operation fails
+    Returns:
+        dict[Path, Path]: Temporary paths mapped to the sources parked there
     """
-    new_name = ""
-    flags = []
-    file_obj_name = file_obj.name.lower()
-
-    if _is_properly_formatted(file_obj.name):
-        log.info(f"Skipping.....{file_obj.name} (already properly formatted)")
-        return
-
-    if "2160p" in file_obj_name:
-        flags.append("4K")
-    if any(hdr_tag in file_obj_name for hdr_tag in ["hdr", "hdr10", "hdr10plus"]):
-        flags.append("hdr")
-    flags_name = f"_[{'_'.join(flags)}]" if flags else ""
-
-    file_path = Path(file_obj.path).parent
-    filename_wo_ext, file_ext = os.path.splitext(file_obj_name)
-    show_name, season_episode = parse_filename(filename_wo_ext)
-
-    if show_name and season_episode:
-        sanitized_show_name = _sanitize_show_name(
-            show_name,
-        )
-        sanitized_season_episode = _sanitize_season_episode(season_episode)
-        new_name = _format_tv_show_name(
-            sanitized_show_name, sanitized_season_episode, flags_name, file_ext
-        )
-    else:
-        new_name = _format_movie_name(filename_wo_ext, file_ext)
+    parked: dict[Path, Path] = {}
+    for src, dest in renames.items():
+        if dest not in renames:
+            continue
+        tmp = _rename_tmp_path(src)
+        try:
+            os.rename(src, tmp)
+            parked[tmp] = src
+        except OSError as e:
+            log.error("Failed to rename %s: %s", src.name, e)
+    return parked
 
-    new_name_path = file_path / new_name
-    if not new_name_path.exists():
-        if not debug:
-            log.info(f"Renaming.....{file_obj.name} -> {new_name}")
-            os.rename(file_obj.path, new_name_path)
-        else:
-            log.info(f"[Debug] Renaming.....{file_obj.name} -> {new_name}")
 
+def _rename_logged(src: Path, current: Path, dest: Path) -> bool:
+    """Rename one file of a batch, logging it under its original name.
 
-def _sanitize_show_name(show_name: str) -> str:
-    """Clean up show name by removing unwanted words and special characters.
+    Refuses if dest exists: os.rename() would replace it, and a file can
+    appear at dest between planning the batch and applying it.
 
     Args:
-        show_name: Original show name
+        src: Name the file had before the batch
+        current: Where the file is now, src or its temporary name
+        dest: New path
 
     Returns:
-        str: Sanitized show name in lowercase with single underscores only
+        bool: True if the file was renamed
     """
-    log.debug(f"\tshow_name: {show_name}")
-    sanitized_filename = show_name
-    name_cleanup_flags = CONFIG.name_cleanup_flags
-    # First remove unwanted words
-    for word in name_cleanup_flags:
-        sanitized_filename = sanitized_filename.replace(word, "")
-
-    log.debug(f"\tsanitized_filename: {sanitized_filename}")
-
-    # Initial cleanup
-    sanitized_filename = sanitized_filename.lstrip().lstrip(".").rstrip(".")
-
-    # Initial character replacements
-    sanitized_filename = (
-        sanitized_filename.replace(" ", "_")
-        .replace(".", "_")
-        .replace("'", "")
-        .replace(",", "")
-        .replace("!", "")
-        .replace("?", "")
-        .replace("-", "_")
-        .replace("_-_", "_")
+    log.info(
+        "Renaming.....%s -> %s",
+        src.name,
+        dest.name,
+        extra={"event": "rename", "src": src, "dest": dest},
     )
+    try:
+        if os.path.lexists(dest):
+            raise FileExistsError(f"{dest.name} already exists")
+        os.rename(current, dest)
+    except OSError as e:
+        log.error("Failed to rename %s: %s", src.name, e)
+        return False
+    return True
 
-    # Keep cleaning up until no more changes are made
-    prev_name = ""
-    while prev_name != sanitized_filename:
-        prev_name = sanitized_filename
-        # Remove consecutive underscores
-        sanitized_filename = sanitized_filename.replace("__", "_")
-        # Remove any trailing/leading underscores
-        sanitized_filename = sanitized_filename.strip("_")
 
-    return sanitized_filename.lower()
+def _rename_tmp_path(src: Path) -> Path:
+    """Temporary name a chained rename's source is parked under."""
+    return src.with_name(_RENAME_TMP_NAME.format(name=src.name))
 
 
 def _sanitize_season_episode(season_episode: str) -> str:
@@ -283,14 +509,52 @@ def _sanitize_season_episode(season_episode: str) -> str:
     return season_episode.lower().replace(".", "").replace(" ", "").replace("_", "")
 
 
-def _should_delete(file_name: str) -> bool:
-    """Check if file matches exactly any filename in the deletion list.
+def _target_name(file_name: str) -> str | None:
+    """Work out the standardized name of a file.
 
     Args:
-        file_name: Name of file to check
+        file_name: Current name of the file
 
     Returns:
-        bool: True if file matches any name or extension in deletable_extensions
+        str | None: New file name, or None if the file is already properly formatted
     """
-    _, ext = os.path.splitext(file_name)
-    return file_name in CONFIG.deletable_extensions or ext in CONFIG.deletable_extensions
+    if _is_properly_formatted(file_name):
+        return None
+
+    flags = []
+    filename_wo_ext, file_ext = os.path.splitext(file_name.lower())
+    info = CLASSIFIER.classify(filename_wo_ext)
+
+    if info.uhd:
+        flags.append("4K")
+    if info.hdr:
+        flags.append("hdr")
+    flags_name = f"_[{'_'.join(flags)}]" if flags else ""
+
+    if info.show_name and info.season_episode:
+        sanitized_show_name = sanitize_show_name(
+            info.show_name,
+        )
+        sanitized_season_episode = _sanitize_season_episode(info.season_episode)
+        new_name = _format_tv_show_name(
+            sanitized_show_name, sanitized_season_episode, flags_name, file_ext
+        )
+    else:
+        new_name = _format_movie_name(filename_wo_ext, file_ext, info)
+    return new_name
+
+
+def _write_rename_manifest(renames: dict[Path, Path]) -> None:
+    """Write the undo manifest for a batch, replacing the previous one."""
+    manifest = rename_manifest_path()
+    data = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "renames": [{"src": str(src), "dest": str(dest)} for src, dest in renames.items()],
+    }
+    tmp_path = manifest.with_suffix(".tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, manifest)
+    except OSError as e:
+        log.warning("Unable to write rename manifest '%s': %s", manifest, e)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+#
+# pipeline.py
+#
+# Streaming mode: every file flows through extract -> rename -> classify -> move
+# as soon as it is ready, instead of each step finishing for the whole directory
+# before the next one starts. Stages run on their own threads and hand files
+# over through bounded queues, so memory use stays flat however large the
+# download directory is.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from filetools import CONFIG
+from filetools.folder_state import FolderState
+from filetools.journal import MoveJournal
+from filetools.metrics import METRICS
+from filetools.moving_files import (
+    DeviceLimiter,
+    build_movie_destination,
+    build_show_destination,
+    get_folder_files_to_extract,
+    move_file,
+    move_one,
+)
+from filetools.naming_files import apply_renames, plan_renames
+from filetools.rules import get_decider
+from filetools.utils import CLASSIFIER, ScanEntry, sort_media_file, walk_tree
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# Files waiting between two stages before the upstream stage blocks
+PIPELINE_QUEUE_SIZE = 16
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class Pipeline:
+    """Run extract, rename and move per file with bounded queues between stages.
+
+    The download directory is walked lazily. Each file found is extracted,
+    renamed, classified as a movie or show and moved to its library without
+    waiting for the rest of the directory, so the first episode lands in the
+    library while later ones are still being extracted.
+
+    The classify stage is the only one that prompts. Moves are confirmed once up
+    front; library choices and new shows are still asked per file unless the
+    rules file or --batch decide them.
+
+    Args:
+        working_directory: Download directory to process
+        debug: If True, run in simulation mode without making actual changes
+        jobs: Number of files to move concurrently
+        verify: If True, checksum cross-device copies before removing the source
+        extract: Extract files from download folders
+        rename: Rename files to the standard format
+        move: Move files to their libraries
+        paths: Download folders or files to process instead of the whole directory
+        queue_size: Files buffered between two stages
+    """
+
+    def __init__(
+        self: "Pipeline",
+        working_directory: Path,
+        debug: bool = False,
+        jobs: int = 1,
+        verify: bool = False,
+        extract: bool = True,
+        rename: bool = True,
+        move: bool = True,
+        paths: list[Path] | None = None,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ) -> None:
+        self.working_directory = Path(working_directory)
+        self.debug = debug
+        self.jobs = max(1, jobs)
+        self.verify = verify
+        self.extract = extract
+        self.rename = rename
+        self.move = move
+        self.paths = [Path(path) for path in paths] if paths is not None else None
+        self.queue_size = queue_size
+
+        # Files the pipeline created in the working directory by extracting or renaming
+        self.produced: list[Path] = []
+
+        self.counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._rejected_shows: set[str] = set()
+        self._journal: MoveJournal | None = None
+        self._state = FolderState()
+        # Download folders with files planned for extraction, and those where one failed
+        self._folders: list[Path] = []
+        self._failed_folders: set[Path] = set()
+        self._limiter = DeviceLimiter(CONFIG.max_moves_per_device)
+        # Files in the working directory, and the renames made so far; rename stage only
+        self._names: set[Path] = set()
+        self._renamed: dict[Path, Path] = {}
+        self._start = 0.0
+        self._first_move: float | None = None
+
+    def run(self: "Pipeline") -> None:
+        """Process the working directory and wait for every stage to finish."""
+        if self.move:
+            question = f"Move files from {self.working_directory} to the libraries as they are ready?"
+            if not get_decider().confirm("move", question, str(self.working_directory)):
+                self.move = False
+        if self.move and not self.debug:
+            self._journal = MoveJournal()
+        if self.rename:
+            self._names = {Path(e.path) for e in walk_tree(self.working_directory, 1) if e.is_file()}
+
+        stages: list[tuple[str, Callable[[Any], Any], int]] = [("extract", self._extract_one, 1)]
+        if self.rename:
+            stages.append(("rename", self._rename_one, 1))
+        if self.move:
+            stages.append(("classify", self._classify_one, 1))
+            stages.append(("move", self._move_to_library, self.jobs))
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        threads = self._start_stages(stages, queues)
+
+        self._start = time.perf_counter()
+        for item in self._source():
+            queues[0].put(item)
+        queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+
+        self._finish()
+
+    def _classify_one(self: "Pipeline", path: Path) -> tuple[Path, Path] | None:
+        """Decide whether a file is a movie or a show and build its destination."""
+        media_type = sort_media_file(path.name, path)
+        if media_type == "shows":
+            show_name = CLASSIFIER.classify(path.name).show_name
+            if show_name in self._rejected_shows:
+                log.info("Skipping %s (previously rejected show: %s)", path.name, show_name)
+                return None
+            dest = build_show_destination(path)
+            if dest is None and show_name:
+                self._rejected_shows.add(show_name)
+        elif media_type == "movies":
+            dest = build_movie_destination(path)
+        else:
+            return None
+
+        if dest is None:
+            return None
+        return path, dest
+
+    def _count(self: "Pipeline", key: str) -> None:
+        """Increment one of the per-stage counters."""
+        with self._lock:
+            self.counts[key] += 1
+
+    def _extract_one(self: "Pipeline", item: tuple[Path, Path]) -> Path:
+        """Move a file out of its download folder; files already at the top pass through."""
+        src, dest = item
+        if src == dest:
+            return src
+        if self.debug:
+            log.info("[Debug] Would extract: %s -> %s", src, dest)
+            return src
+        log.info("Extracting: %s -> %s", src, dest, extra={"event": "extract", "src": src, "dest": dest})
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with METRICS.timer("extract"):
+                move_file(src, dest)
+        except Exception:
+            with self._lock:
+                self._failed_folders.add(src.parent)
+            raise
+        with self._lock:
+            self.counts["extracted"] += 1
+            self.produced.append(dest)
+        METRICS.count("files_extracted")
+        return dest
+
+    def _finish(self: "Pipeline") -> None:
+        """Compact the journal, record the processed folders and log the summary."""
+        if self._journal:
+            self._journal.compact()
+        if not self.debug:
+            for folder in self._folders:
+                if folder not in self._failed_folders:
+                    self._state.mark_done(folder)
+            self._state.save()
+        if self._renamed:
+            log.info("Renamed %s files, undo with --undo-renames", len(self._renamed))
+        self._log_summary(time.perf_counter() - self._start)
+
+    def _folder_items(
+        self: "Pipeline", dir_obj: ScanEntry, skip_unchanged: bool = True
+    ) -> Iterator[tuple[Path, Path]]:
+        """List one download folder and yield its files ready to be extracted.
+
+        Folders the state records as processed and unchanged are not listed,
+        unless skip_unchanged is False.
+        """
+        if skip_unchanged and self._state.is_unchanged(dir_obj):
+            log.debug("Skipping unchanged folder: %s", dir_obj.path)
+            return
+        file_objs = [entry for entry in walk_tree(dir_obj.path, 1) if entry.is_file()]
+        items = get_folder_files_to_extract(dir_obj, file_objs, self.working_directory, self._state)
+        if items:
+            self._folders.append(Path(dir_obj.path))
+        yield from items.items()
+
+    def _log_summary(self: "Pipeline", elapsed: float) -> None:
+        """Log what each stage did and how soon the first file was moved."""
+        counts = self.counts
+        log.info(
+            "Pipeline finished in %.1f seconds: "
+            "%s extracted, %s renamed, %s moved (%.2f GiB), %s failed",
+            elapsed,
+            counts["extracted"],
+            counts["renamed"],
+            counts["moved"],
+            counts["bytes"] / 2**30,
+            counts["failed"],
+        )
+        if self._first_move is not None:
+            log.info("First file reached its library after %.1f seconds", self._first_move)
+
+    def _move_to_library(self: "Pipeline", item: tuple[Path, Path]) -> None:
+        """Move a classified file to its library."""
+        src, dest = item
+        with METRICS.timer("move"):
+            moved = move_one(src, dest, self.debug, self._limiter, self._journal, self.verify)
+        if moved:
+            with self._lock:
+                if self._first_move is None:
+                    self._first_move = time.perf_counter() - self._start
+                self.counts["moved"] += 1
+                self.counts["bytes"] += moved
+
+    def _rename_one(self: "Pipeline", path: Path) -> Path | None:
+        """Rename a file to the standard format, or delete it if it is deletable.
+
+        Each file is planned with plan_renames() against the names known to be in
+        its directory, so a target that is taken is reported as a collision and
+        the file keeps its name. Every rename of the run goes into one undo manifest.
+        """
+        self._names.add(path)
+        plan = plan_renames([ScanEntry(path.name, str(path.parent), 1, False)], self._names)
+        with METRICS.timer("rename"):
+            renamed = apply_renames(plan, self.debug, self._renamed)
+        if plan.deletes:
+            self._names.discard(path)
+            return None
+        new_path = renamed.get(path)
+        if new_path is None:
+            return path
+
+        self._renamed[path] = new_path
+        self._names.discard(path)
+        self._names.add(new_path)
+        with self._lock:
+            self.counts["renamed"] += 1
+            self.produced.append(new_path)
+        return new_path
+
+    def _source(self: "Pipeline") -> Iterator[tuple[Path, Path]]:
+        """Walk the working directory and yield (file, extracted path) pairs.
+
+        Files already at the top of the working directory are yielded with their
+        own path. Download folders are listed one at a time after that.
+        """
+        if self.paths is not None:
+            yield from self._source_paths()
+            return
+
+        folders = []
+        for entry in walk_tree(self.working_directory, 1):
+            if entry.is_file():
+                yield Path(entry.path), Path(entry.path)
+            elif self.extract:
+                folders.append(entry)
+
+        for dir_obj in folders:
+            yield from self._folder_items(dir_obj)
+        if self.extract:
+            self._state.retain(dir_obj.path for dir_obj in folders)
+
+    def _source_paths(self: "Pipeline") -> Iterator[tuple[Path, Path]]:
+        """Yield (file, extracted path) pairs for the explicitly given paths only.
+
+        The caller already knows these changed, so processed folders are listed again.
+        """
+        root = str(self.working_directory)
+        for path in self.paths:
+            if path.is_file():
+                yield path, path
+            elif path.is_dir() and self.extract:
+                yield from self._folder_items(ScanEntry(path.name, root, 1, True), False)
+
+    def _start_stages(
+        self: "Pipeline", stages: list[tuple[str, Callable[[Any], Any], int]], queues: list[queue.Queue]
+    ) -> list[threading.Thread]:
+        """Start the worker threads of every stage, each reading from its own queue."""
+        threads = []
+        for index, (name, func, workers) in enumerate(stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            downstream = stages[index + 1][2] if outbox else 0
+            remaining = [workers]
+            for worker in range(workers):
+                thread = threading.Thread(
+                    target=self._stage,
+                    args=(name, func, inbox, outbox, remaining, downstream),
+                    name=f"pipeline-{name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+        return threads
+
+    def _stage(
+        self: "Pipeline",
+        name: str,
+        func: Callable[[Any], Any],
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        remaining: list[int],
+        downstream: int,
+    ) -> None:
+        """Worker loop of one stage.
+
+        Items for which func returns None are dropped. The last worker of a stage
+        to finish passes one end marker to each worker of the next stage.
+        """
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            try:
+                result = func(item)
+            except Exception as e:
+                log.error("Pipeline %s stage failed for %s: %s", name, item, e)
+                log.debug("Error details:", exc_info=True)
+                self._count("failed")
+                continue
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+        with self._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def run_pipeline(
+    working_directory: Path,
+    debug: bool = False,
+    jobs: int = 1,
+    verify: bool = False,
+    extract: bool = True,
+    rename: bool = True,
+    move: bool = True,
+    paths: list[Path] | None = None,
+) -> "Pipeline":
+    """Stream the working directory through extract, rename and move.
+
+    Args:
+        working_directory: Download directory to process
+        debug: If True, run in simulation mode without making actual changes
+        jobs: Number of files to move concurrently
+        verify: If True, checksum cross-device copies before removing the source
+        extract: Extract files from download folders
+        rename: Rename files to the standard format
+        move: Move files to their libraries
+        paths: Download folders or files to process instead of the whole directory
+
+    Returns:
+        Pipeline: The finished pipeline, with its counts and produced paths
+    """
+    pipeline = Pipeline(working_directory, debug, jobs, verify, extract, rename, move, paths)
+    pipeline.run()
+    return pipeline
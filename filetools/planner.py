@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+#
+# planner.py
+#
+# Dry runs that other tools can read. build_plan() runs the extract, rename, sort,
+# move and cleanup decisions against a snapshot of the download directory without
+# touching anything and returns every filesystem operation they would make.
+# apply_plan() later carries out a saved plan without scanning the directory
+# again, so the expensive planning can run off-peak and the cheap apply whenever.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from itertools import groupby
+from pathlib import Path
+from typing import Any, TextIO
+
+from filetools import CONFIG
+from filetools.folder_state import FolderState
+from filetools.metrics import METRICS
+from filetools.moving_files import (
+    FolderRemoval,
+    build_movie_destination,
+    build_show_destination,
+    delete_dirs,
+    format_size,
+    get_empty_dirs,
+    get_files_to_extract,
+    move_file,
+    perform_moves,
+)
+from filetools.naming_files import RenamePlan, apply_renames, plan_renames
+from filetools.rules import get_decider
+from filetools.shows_map import get_show_map
+from filetools.utils import (
+    CLASSIFIER,
+    FILE_DELETABLE,
+    FILE_VALID,
+    MATCHER,
+    WORK_TREE_DEPTH,
+    TreeScan,
+)
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+PLAN_VERSION = 1
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class PlannedOperation:
+    """One filesystem operation of a plan.
+
+    Attributes:
+        step: Step that planned it: extract, rename, move or cleanup
+        operation: extract, rename, delete, add_show, move or rmdir
+        src: File or folder acted on; None for add_show
+        dest: Where src ends up, or the new show folder for add_show; None for delete and rmdir
+        bytes: Size of the file, or of everything below the folder for rmdir
+        device: st_dev of the filesystem dest is on, or src for delete and rmdir
+        files: For rmdir, files and symlinks to unlink before the folders
+        dirs: For rmdir, folders to remove, deepest first and ending with src
+    """
+
+    step: str
+    operation: str
+    src: str | None
+    dest: str | None
+    bytes: int = 0
+    device: int | None = None
+    files: list[str] = field(default_factory=list)
+    dirs: list[str] = field(default_factory=list)
+
+    def to_dict(self: "PlannedOperation") -> dict[str, Any]:
+        """Return the operation as a JSON object, leaving out empty folder contents."""
+        data = asdict(self)
+        if self.operation != "rmdir":
+            del data["files"], data["dirs"]
+        return data
+
+
+@dataclass(slots=True)
+class Plan:
+    """Operations planned for a download directory, in the order they apply.
+
+    Attributes:
+        working_directory: Download directory the plan was made for
+        created: Local time the plan was made
+        operations: Planned operations
+        pending: Decisions the rules could not make; their files are left out of the plan
+        version: Plan format version
+    """
+
+    working_directory: str
+    created: str = field(default_factory=lambda: time.strftime("%Y-%m-%dT%H:%M:%S"))
+    operations: list[PlannedOperation] = field(default_factory=list)
+    pending: list[dict[str, Any]] = field(default_factory=list)
+    version: int = PLAN_VERSION
+
+    def header(self: "Plan") -> dict[str, Any]:
+        """Everything but the operations, as a JSON object."""
+        return {
+            "version": self.version,
+            "created": self.created,
+            "working_directory": self.working_directory,
+            "pending": self.pending,
+        }
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def apply_plan(plan_path: Path, debug: bool = False, jobs: int = 1, verify: bool = False) -> None:
+    """Carry out a plan written by build_plan() without scanning the directory again.
+
+    Operations run step by step in plan order. File operations whose source is
+    gone or has changed size since the plan was made are skipped, and so are
+    those whose destination has been taken in the meantime. Moves are
+    confirmed and journaled like a normal run, and folders are deleted from the
+    contents recorded in the plan, so anything added since keeps them alive.
+
+    Args:
+        plan_path: JSON or JSONL plan file
+        debug: If True, run in simulation mode without making actual changes
+        jobs: Number of files to move concurrently
+        verify: If True, checksum cross-device copies before removing the source
+    """
+    plan = load_plan(plan_path)
+    if plan is None:
+        return
+    log.info(
+        "Applying %s operations planned %s for %s",
+        len(plan.operations),
+        plan.created,
+        plan.working_directory,
+    )
+    if plan.pending:
+        log.warning("Skipping the files of %s decisions pending in the plan", len(plan.pending))
+
+    for step, ops in groupby(plan.operations, key=lambda op: op.step):
+        ops = list(ops)
+        if step == "cleanup":
+            removals = [
+                FolderRemoval(Path(op.src), op.bytes, op.files, op.dirs)
+                for op in ops
+                if op.operation == "rmdir" and os.path.isdir(op.src)
+            ]
+            with METRICS.timer("cleanup"):
+                delete_dirs(removals, debug)
+            continue
+
+        ops = _still_applicable(ops)
+        for op in ops:
+            if op.operation == "add_show":
+                _add_show(Path(op.dest), debug)
+            elif op.operation == "delete":
+                _delete_file(Path(op.src), debug)
+            elif op.operation == "extract":
+                _extract_file(Path(op.src), Path(op.dest), debug)
+
+        renames = {Path(op.src): Path(op.dest) for op in ops if op.operation == "rename"}
+        if renames:
+            with METRICS.timer("rename"):
+                apply_renames(RenamePlan(renames=renames), debug)
+        moves = {Path(op.src): Path(op.dest) for op in ops if op.operation == "move"}
+        perform_moves(moves, "planned files", debug, jobs, verify=verify)
+
+
+def build_plan(
+    working_directory: Path,
+    extract: bool = True,
+    rename: bool = True,
+    move: bool = True,
+    cleanup: bool = True,
+) -> Plan:
+    """Work out what a run with the given steps would do, without doing any of it.
+
+    Each step reads the same snapshot of the working directory and records its
+    changes in it, so later steps plan against the tree as the earlier ones
+    would leave it. Nothing is prompted for: choices the rules can't make are
+    returned as pending and their files left out. New shows a rule adds are
+    planned as add_show operations instead of being created.
+
+    Args:
+        working_directory: Download directory to plan for
+        extract: Plan extracting files from download folders
+        rename: Plan renaming files to the standard format
+        move: Plan moving files to their libraries
+        cleanup: Plan deleting download folders with nothing worth keeping
+
+    Returns:
+        Plan: Planned operations in the order apply_plan() runs them
+    """
+    working_directory = Path(working_directory)
+    plan = Plan(str(working_directory))
+    tree = TreeScan(working_directory, WORK_TREE_DEPTH)
+    add = _operation_adder(plan)
+
+    if extract:
+        # The state is only read here; it is saved when the plan is applied by a normal run
+        for src, dest in get_files_to_extract(working_directory, tree, FolderState()).items():
+            add("extract", "extract", src, dest)
+            tree.move(src, dest)
+    if rename:
+        _plan_renames(working_directory, tree, add)
+    if move:
+        _plan_moves(working_directory, tree, add, plan)
+    if cleanup:
+        _plan_cleanup(working_directory, tree, plan)
+
+    plan.pending = list(get_decider().pending)
+    _log_plan(plan)
+    return plan
+
+
+def load_plan(plan_path: Path) -> Plan | None:
+    """Read a plan written by write_plan() in either format.
+
+    Args:
+        plan_path: JSON or JSONL plan file
+
+    Returns:
+        Plan | None: The plan, or None if it can't be read or is from another version
+    """
+    try:
+        with open(plan_path) as f:
+            text = f.read()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            lines = [json.loads(line) for line in text.splitlines() if line.strip()]
+            data = {**lines[0], "operations": lines[1:]} if lines else {}
+    except (OSError, json.JSONDecodeError) as e:
+        log.error("Unable to load plan '%s': %s", plan_path, e)
+        return None
+
+    if data.get("version") != PLAN_VERSION:
+        log.error("Unsupported plan version in '%s': %s", plan_path, data.get("version"))
+        return None
+    return Plan(
+        working_directory=data.get("working_directory", ""),
+        created=data.get("created", ""),
+        operations=[PlannedOperation(**op) for op in data.get("operations", [])],
+        pending=data.get("pending", []),
+    )
+
+
+def write_plan(plan: Plan, stream: TextIO, fmt: str = "json") -> None:
+    """Write a plan as one JSON document, or as JSON lines with the header first.
+
+    Args:
+        plan: Plan from build_plan()
+        stream: Where to write it, e.g. sys.stdout
+        fmt: "json" or "jsonl"
+    """
+    if fmt == "jsonl":
+        stream.write(json.dumps(plan.header()) + "\n")
+        for op in plan.operations:
+            stream.write(json.dumps(op.to_dict()) + "\n")
+    else:
+        data = {**plan.header(), "operations": [op.to_dict() for op in plan.operations]}
+        json.dump(data, stream, indent=2)
+        stream.write("\n")
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _add_show(show_dir: Path, debug: bool) -> None:
+    """Add a show planned by a rule to the show map."""
+    if debug:
+        log.info("[Debug] Would add show: %s", show_dir)
+        return
+    log.info("Making new show directory: %s", show_dir)
+    show_dir.mkdir(parents=True, exist_ok=True)
+    get_show_map().add(show_dir.name, show_dir)
+
+
+def _delete_file(path: Path, debug: bool) -> None:
+    """Delete a planned deletable file."""
+    if debug:
+        log.info("[Debug] Would delete: %s", path)
+        return
+    log.info("Deleting: %s", path, extra={"event": "delete", "src": path})
+    try:
+        path.unlink()
+        METRICS.count("files_deleted")
+    except OSError as e:
+        log.warning("Failed to delete %s: %s", path, e)
+
+
+def _dest_free(op: PlannedOperation, renamed: set[str]) -> bool:
+    """True if nothing exists at the destination of a file operation, or it is renamed away."""
+    if op.dest is None or op.dest in renamed or not os.path.lexists(op.dest):
+        return True
+    log.warning("Skipping %s of %s: %s already exists", op.operation, op.src, op.dest)
+    return False
+
+
+def _device(path: Path) -> int | None:
+    """st_dev of the closest existing directory at or above path.
+
+    Library folders are looked up in CONFIG.library_devices, so a plan moving
+    thousands of files into new show folders doesn't stat each library again.
+    """
+    library_devices = CONFIG.library_devices
+    for candidate in (path, *path.parents):
+        if library_devices.get(candidate) is not None:
+            return library_devices[candidate]
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return None
+
+
+@METRICS.timed("extract")
+def _extract_file(src: Path, dest: Path, debug: bool) -> None:
+    """Move a planned file out of its download folder."""
+    if debug:
+        log.info("[Debug] Would extract: %s -> %s", src, dest)
+        return
+    log.info("Extracting: %s -> %s", src, dest, extra={"event": "extract", "src": src, "dest": dest})
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        move_file(src, dest)
+        METRICS.count("files_extracted")
+    except Exception as e:
+        log.error("Failed to extract %s to %s: %s", src, dest, e)
+
+
+def _file_size(path: Path) -> int:
+    """Size of a file, 0 if it can't be read."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def _log_plan(plan: Plan) -> None:
+    """Log how many operations of each kind were planned and the bytes they touch."""
+    counts: dict[str, int] = {}
+    for op in plan.operations:
+        counts[op.operation] = counts.get(op.operation, 0) + 1
+    moved = sum(op.bytes for op in plan.operations if op.operation == "move")
+    freed = sum(op.bytes for op in plan.operations if op.operation in ("delete", "rmdir"))
+    summary = ", ".join(f"{count} {operation}" for operation, count in counts.items()) or "nothing to do"
+    log.info("Planned %s; %s to move, %s to delete", summary, format_size(moved), format_size(freed))
+
+
+def _operation_adder(plan: Plan) -> Callable[..., None]:
+    """Return add(step, operation, src, dest=None), which appends a file operation to plan.
+
+    A file's size is carried over to its planned path, which doesn't exist yet
+    when a later step plans the next operation on it.
+    """
+    sizes: dict[str, int] = {}
+
+    def add(step: str, operation: str, src: Path, dest: Path | None = None) -> None:
+        size = sizes.pop(str(src), None)
+        if size is None:
+            size = _file_size(src)
+        if dest is not None and operation != "move":
+            sizes[str(dest)] = size
+        device = _device(dest if dest is not None else src)
+        plan.operations.append(
+            PlannedOperation(step, operation, str(src), str(dest) if dest else None, size, device)
+        )
+
+    return add
+
+
+def _plan_cleanup(working_directory: Path, tree: TreeScan, plan: Plan) -> None:
+    """Plan deleting the download folders with nothing worth keeping."""
+    for removal in get_empty_dirs(working_directory, tree):
+        plan.operations.append(
+            PlannedOperation(
+                "cleanup",
+                "rmdir",
+                str(removal.path),
+                None,
+                removal.size,
+                _device(removal.path),
+                removal.files,
+                removal.dirs,
+            )
+        )
+
+
+def _plan_moves(working_directory: Path, tree: TreeScan, add: Callable[..., None], plan: Plan) -> None:
+    """Plan deleting, sorting and moving the files at the top of the working directory.
+
+    Mirrors sort_media(), move_movie_files() and move_show_files(): movies are
+    planned before shows, a show that couldn't be placed isn't asked about again
+    and files whose destination already exists are left alone.
+    """
+    movies, shows = _sort_for_moves(working_directory, tree, add)
+
+    moves: list[tuple[Path, Path]] = []
+    for movie in movies:
+        dest = build_movie_destination(movie)
+        if dest:
+            moves.append((movie, dest))
+
+    new_shows: dict[str, Path] = {}
+    moves.extend(_show_moves(shows, new_shows))
+
+    for show_dir in new_shows.values():
+        plan.operations.append(
+            PlannedOperation("move", "add_show", None, str(show_dir), 0, _device(show_dir))
+        )
+    for src, dest in moves:
+        if dest.exists():
+            log.info("File already exists: %s, skipping...", dest)
+            continue
+        add("move", "move", src, dest)
+        tree.remove(src)
+
+
+def _plan_renames(working_directory: Path, tree: TreeScan, add: Callable[..., None]) -> None:
+    """Plan renaming and deleting the files at the top of the working directory."""
+    renames = plan_renames(tree.files(working_directory))
+    for path in renames.deletes:
+        add("rename", "delete", path)
+    for src, dest in renames.renames.items():
+        add("rename", "rename", src, dest)
+    for path in [*renames.deletes, *renames.renames]:
+        tree.remove(path)
+    for src, dest in renames.renames.items():
+        tree.move(src, dest)
+
+
+def _show_moves(shows: list[Path], new_shows: dict[str, Path]) -> list[tuple[Path, Path]]:
+    """Build the destinations of show files; a show that couldn't be placed isn't asked about again."""
+    moves = []
+    rejected_shows = set()
+    for show in shows:
+        show_name = CLASSIFIER.classify(show.name).show_name
+        if show_name in rejected_shows:
+            log.info("Skipping %s (previously rejected show: %s)", show.name, show_name)
+            continue
+        dest = build_show_destination(show, new_shows)
+        if dest:
+            moves.append((show, dest))
+        elif show_name:
+            rejected_shows.add(show_name)
+    return moves
+
+
+def _sort_for_moves(
+    working_directory: Path, tree: TreeScan, add: Callable[..., None]
+) -> tuple[list[Path], list[Path]]:
+    """Plan deleting deletable videos and split the rest into movies and shows."""
+    movies, shows = [], []
+    for file_obj in tree.files(working_directory):
+        path = Path(file_obj.path)
+        kind = MATCHER.match_for_sort(file_obj.name)
+        if kind == FILE_DELETABLE:
+            add("move", "delete", path)
+            tree.remove(path)
+        elif kind == FILE_VALID:
+            (shows if CLASSIFIER.classify(file_obj.name).is_tv else movies).append(path)
+    return movies, shows
+
+
+def _still_applicable(ops: list[PlannedOperation]) -> list[PlannedOperation]:
+    """Drop the file operations of a step that the disk no longer agrees with.
+
+    A file operation is dropped if its source is gone or has changed size, or
+    if something now exists at its destination. A rename into the current name
+    of another file renamed in the same step is kept: apply_renames() moves
+    that file out of the way first.
+    """
+    renamed = {op.src for op in ops if op.operation == "rename"}
+    return [
+        op for op in ops if op.operation == "add_show" or (_unchanged(op) and _dest_free(op, renamed))
+    ]
+
+
+def _unchanged(op: PlannedOperation) -> bool:
+    """True if the source of a file operation is still there with its planned size."""
+    try:
+        size = os.stat(op.src).st_size
+    except OSError:
+        log.warning("Skipping %s of %s: it no longer exists", op.operation, op.src)
+        return False
+    if size != op.bytes:
+        log.warning("Skipping %s of %s: its size changed since the plan was made", op.operation, op.src)
+        return False
+    return True
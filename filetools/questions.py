@@ -2,6 +2,8 @@ import logging
 import re
 from typing import Optional
 
+from filetools.metrics import METRICS, PROMPT
+
 log = logging.getLogger("filetools")
 
 
@@ -27,7 +29,7 @@ class QuestionError(Exception):
         super().__init__(message)
         self.question = question
         self.details = details
-        log.error(f"QuestionError: {message} | Question: {question} | Details: {details}")
+        log.error("QuestionError: %s | Question: %s | Details: %s", message, question, details)
 
     def __str__(self: "QuestionError") -> str:
         return f"QuestionError: {self.args[0]} | Question: {self.question} | Details: {self.details}"
@@ -53,7 +55,8 @@ def ask_bool(question: str, default_value: bool | None = None) -> bool | None:
 
     while True:
         log.question(prompt)  # Logs the prompt in QUESTION (green)
-        user_input = input("|| ").strip().lower()  # Keeps "|| " formatting
+        with METRICS.timer(PROMPT):
+            user_input = input("|| ").strip().lower()  # Keeps "|| " formatting
 
         if user_input in {"y", "yes"}:
             return True
@@ -62,7 +65,7 @@ def ask_bool(question: str, default_value: bool | None = None) -> bool | None:
         if user_input == "" and default_value is not None:
             return default_value
 
-        log.warning(f"Invalid input: {user_input}. Expected 'y' or 'n'.")
+        log.warning("Invalid input: %s. Expected 'y' or 'n'.", user_input)
 
 
 def ask_multichoice(choices: list[str]) -> str:
@@ -91,19 +94,20 @@ def ask_multichoice(choices: list[str]) -> str:
 
     choice_dict: dict = {str(i + 1): choice for i, choice in enumerate(choices)}
 
-    log.question(f"Choose an option ({', '.join(choice_dict.keys())}):")
+    log.question("Choose an option (%s):", ", ".join(choice_dict.keys()))
     for key, value in choice_dict.items():
-        log.info(f"{key}) {value}")
+        log.info("%s) %s", key, value)
 
     while True:
-        user_input = input("\n|| ").strip()
+        with METRICS.timer(PROMPT):
+            user_input = input("\n|| ").strip()
 
         if user_input in choice_dict:
-            log.info(f"User selected choice {user_input}: {choice_dict[user_input]}")
+            log.info("User selected choice %s: %s", user_input, choice_dict[user_input])
             return choice_dict[user_input]
 
-        log.warning(f"Invalid choice: {user_input}. Expected one of {list(choice_dict.keys())}.")
-        log.warning(f"Invalid choice: {user_input}. Please enter a valid number from the list.")
+        log.warning("Invalid choice: %s. Expected one of %s.", user_input, list(choice_dict.keys()))
+        log.warning("Invalid choice: %s. Please enter a valid number from the list.", user_input)
 
 
 def ask_text_input(qstring: str) -> str:
@@ -126,6 +130,7 @@ def ask_text_input(qstring: str) -> str:
     """
     question = qstring + "? "
     log.question(question)
-    answer = input("|| ").strip()  # Strip leading/trailing whitespace
+    with METRICS.timer(PROMPT):
+        answer = input("|| ").strip()  # Strip leading/trailing whitespace
     # Replace one or more spaces with single underscore
     return re.sub(r"\s+", "_", answer).lower()
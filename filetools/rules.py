@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+#
+# rules.py
+#
+# Non-interactive decisions for the move pipeline. A rules file supplies default
+# libraries and auto-confirm policies; in batch mode anything the rules can't
+# decide is queued into a pending report instead of waiting for a prompt.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from filetools import CONFIG
+from filetools.questions import ask_bool, ask_multichoice
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+PENDING_REPORT_FILE = "pending.json"
+
+# Confirmation kinds understood by the auto_confirm section of the rules file
+CONFIRM_KINDS = ("move", "delete_dirs", "add_show")
+
+# Process-wide Decider instance returned by get_decider()
+_decider: "Decider | None" = None
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class Rules:
+    """Decisions loaded from the rules file.
+
+    Example rules.json:
+        {
+          "movies": {"default_library": "Movies"},
+          "shows": [
+            {"keywords": ["planet", "nature"], "library": "Documentaries", "network": "BBC"},
+            {"keywords": ["the_wire"], "library": "Television", "network": "HBO"}
+          ],
+          "auto_confirm": {"move": true, "delete_dirs": false, "add_show": true}
+        }
+
+    Show rules are tried in order; the first rule with a keyword contained in the
+    sanitized show name decides the library and network of a new show.
+
+    Args:
+        rules_path: Location of the rules file; a missing file means no rules
+    """
+
+    def __init__(self: "Rules", rules_path: Path) -> None:
+        self.rules_path = Path(rules_path)
+        data = self._load_rules()
+
+        self.default_movie_library: str | None = data.get("movies", {}).get("default_library")
+        self.show_rules: list[dict[str, Any]] = data.get("shows", [])
+        auto_confirm = data.get("auto_confirm", {})
+        self.auto_confirm = {kind: bool(auto_confirm.get(kind, False)) for kind in CONFIRM_KINDS}
+
+        for rule in self.show_rules:
+            if rule.get("library") not in CONFIG.shows:
+                log.warning("Show rule refers to unknown library '%s': %s", rule.get("library"), rule)
+        if self.default_movie_library and self.default_movie_library not in CONFIG.movies:
+            log.warning("Unknown default movie library in rules: %s", self.default_movie_library)
+
+    def match_show(self: "Rules", show_name: str) -> tuple[str, str] | None:
+        """Find the library and network a new show belongs to.
+
+        Args:
+            show_name: Sanitized show name, e.g. 'planet_earth'
+
+        Returns:
+            tuple[str, str] | None: (library name, network) of the first matching rule
+        """
+        name = show_name.lower()
+        for rule in self.show_rules:
+            library, network = rule.get("library"), rule.get("network")
+            if library not in CONFIG.shows or not network:
+                continue
+            if any(keyword.lower() in name for keyword in rule.get("keywords", [])):
+                return library, network
+        return None
+
+    def _load_rules(self: "Rules") -> dict[str, Any]:
+        """Load and parse the JSON rules file."""
+        try:
+            with open(self.rules_path) as f:
+                log.debug("Loading rules from %s", self.rules_path)
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            log.warning("Unable to load valid rules from '%s'. %s", self.rules_path, e)
+            return {}
+
+
+class Decider:
+    """Answer the pipeline's questions from rules, flags or the user.
+
+    Order of precedence for every decision:
+        1. The rules file
+        2. --yes, which answers every confirmation with yes
+        3. --batch, which never prompts and queues the decision as pending
+        4. An interactive prompt
+
+    Runs with --yes or --batch are unattended: questions that aren't yes/no,
+    such as which library a new show goes in, are queued as pending in both.
+
+    Args:
+        rules: Rules loaded from the rules file
+        assume_yes: Answer all confirmations with yes
+        batch: Never prompt; queue undecidable questions in the pending report
+    """
+
+    def __init__(self: "Decider", rules: Rules, assume_yes: bool = False, batch: bool = False) -> None:
+        self.rules = rules
+        self.assume_yes = assume_yes
+        self.batch = batch
+        self.pending: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def unattended(self: "Decider") -> bool:
+        """True if nobody is there to answer a prompt (--yes or --batch)."""
+        return self.assume_yes or self.batch
+
+    def choose(self: "Decider", kind: str, prompt: str, choices: list[str], subject: str) -> str | None:
+        """Pick one of several choices, or queue the decision when unattended.
+
+        Args:
+            kind: Kind of decision, recorded in the pending report
+            prompt: Question shown to the user
+            choices: Options to choose from
+            subject: File or show the decision is about
+
+        Returns:
+            str | None: Chosen option, or None if the decision was queued
+        """
+        if len(choices) == 1:
+            return choices[0]
+        if self.unattended:
+            self.defer(kind, subject, prompt, choices=choices)
+            return None
+        log.question(prompt)
+        return ask_multichoice(choices)
+
+    def confirm(self: "Decider", kind: str, question: str, subject: str | list[str]) -> bool:
+        """Ask a yes/no question unless a policy or flag already answers it.
+
+        Args:
+            kind: One of CONFIRM_KINDS, looked up in the rules' auto_confirm section
+            question: Question shown to the user
+            subject: File, show or list of paths the question is about
+
+        Returns:
+            bool: True to go ahead; False if declined or queued in batch mode
+        """
+        if self.rules.auto_confirm.get(kind) or self.assume_yes:
+            log.info("%s [auto-confirmed]", question)
+            return True
+        if self.batch:
+            self.defer(kind, subject, question)
+            return False
+        return bool(ask_bool(question))
+
+    def defer(
+        self: "Decider", kind: str, subject: str | list[str], question: str, **details: str | list[str]
+    ) -> None:
+        """Queue a decision for the pending report.
+
+        Args:
+            kind: Kind of decision
+            subject: File, show or list of paths the decision is about
+            question: Question that could not be answered
+            **details: Extra context stored with the entry
+        """
+        log.warning("Pending decision (%s): %s", kind, question)
+        with self._lock:
+            self.pending.append(
+                {
+                    "kind": kind,
+                    "subject": subject,
+                    "question": question,
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    **details,
+                }
+            )
+
+    def write_pending_report(self: "Decider", path: Path | None = None) -> Path | None:
+        """Merge this run's pending decisions into the pending report.
+
+        Entries already in the report for the same kind and subject are replaced.
+
+        Args:
+            path: Report location, defaults to pending.json next to shows_map.ini
+
+        Returns:
+            Path | None: Report location, or None if there was nothing to report
+        """
+        if not self.pending:
+            return None
+
+        path = Path(path) if path else pending_report_path()
+        try:
+            with open(path) as f:
+                existing = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            existing = []
+
+        def key(entry: dict[str, Any]) -> str:
+            return json.dumps([entry.get("kind"), entry.get("subject")])
+
+        merged = {key(entry): entry for entry in existing}
+        merged.update({key(entry): entry for entry in self.pending})
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(list(merged.values()), f, indent=2)
+        os.replace(tmp_path, path)
+        log.info("%s decisions need attention, see %s", len(self.pending), path)
+        return path
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def configure(assume_yes: bool = False, batch: bool = False) -> "Decider":
+    """Create the process-wide decider for this run.
+
+    Args:
+        assume_yes: Answer all confirmations with yes
+        batch: Never prompt; queue undecidable questions in the pending report
+
+    Returns:
+        Decider: The configured decider
+    """
+    global _decider
+    _decider = Decider(Rules(CONFIG.rules_path), assume_yes, batch)
+    return _decider
+
+
+def get_decider() -> "Decider":
+    """Return the process-wide decider, creating an interactive one if needed.
+
+    Returns:
+        Decider: Shared decider
+    """
+    if _decider is None:
+        return configure()
+    return _decider
+
+
+def pending_report_path() -> Path:
+    """Return the default pending report location next to shows_map.ini.
+
+    Returns:
+        Path: pending.json in the same directory as the settings file
+    """
+    return Path(CONFIG.settings_path).parent.joinpath(PENDING_REPORT_FILE)
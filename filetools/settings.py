@@ -1,15 +1,97 @@
-import importlib.metadata
+#!/usr/bin/env python
+#
+# settings.py
+#
+# Application settings. settings.json is validated against SETTINGS_SCHEMA and
+# compiled once into the lookup tables the rest of the package uses; the
+# compiled snapshot is cached next to the settings file so later runs skip
+# parsing, validating and compiling it.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import hashlib
 import json
 import logging
 import os
+import re
+from collections.abc import Iterable
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
+from filetools.metrics import METRICS
+
 log = logging.getLogger("filetools")
 
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# Compiled snapshot of the settings, stored next to settings.json
+SETTINGS_CACHE_FILE = "settings.cache.json"
+SETTINGS_CACHE_VERSION = 1
+
+# Expected shape of settings.json. A dict is a section with the keys it lists,
+# a dict with only "*" maps any key to the given value, a one-item list is a
+# list of that item, and a type or tuple of types is a value. Keys may be left
+# out; unknown keys are errors, so a misspelt section isn't silently ignored.
+Schema = dict[str, "Schema"] | list["Schema"] | type | tuple[type, ...]
+SETTINGS_SCHEMA: dict[str, Schema] = {
+    "file_processing": {
+        "extensions": {"valid": [str], "excluded": [str], "deletable": [str]},
+        "keywords": {"downloading": [str], "ignore": [str]},
+        "stable_seconds": (int, float),
+    },
+    "metadata": {
+        "year_range": {"min": int, "max": int},
+        "name_cleanup": {"flags": [str]},
+        "show_aliases": {"*": [str]},
+    },
+    "libraries": {
+        "scan_workers": int,
+        "shows": [{"name": str, "path": str}],
+        "movies": [{"name": str, "path": str}],
+        "music": [{"name": str, "path": str}],
+    },
+    "paths": {"default_source": str, "rules": str},
+    "transfers": {"max_per_device": int},
+    "watch": {"settle_seconds": (int, float)},
+}
+
+# Library categories under "libraries"
+_LIBRARY_KINDS = ("shows", "movies", "music")
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+class SettingsError(ValueError):
+    """settings.json can't be parsed or doesn't match SETTINGS_SCHEMA."""
+
 
 class AppConfig:
-    """Load and manage application settings from a JSON configuration file."""
+    """Validated, compiled application settings.
+
+    The first load of a settings file parses it, checks it against
+    SETTINGS_SCHEMA and compiles it: extension lists become lowercase suffix
+    tuples for str.endswith(), keyword lists become one regex alternation and
+    library lists become name -> Path maps. The result is written to
+    settings.cache.json next to the settings file, keyed by the file's mtime and
+    size. Later loads with the same key read the snapshot instead; if only the
+    mtime changed, a matching content hash still reuses it.
+
+    A missing settings file gives the defaults. Anything else that is wrong with
+    it raises SettingsError, listing every problem.
+
+    Args:
+        settings_path: Settings file, FILETOOLS_SETTINGS or settings.json in the project root if None
+
+    Raises:
+        SettingsError: If the settings file is not valid JSON or fails validation
+    """
 
     # Define class-level type hints for all attributes
     settings_path: Path
@@ -18,14 +100,24 @@ class AppConfig:
     deletable_extensions: set[str]
     downloading_indicators: set[str]
     ignore_keywords: set[str]
+    valid_suffixes: tuple[str, ...]
+    excluded_suffixes: tuple[str, ...]
+    deletable_suffixes: tuple[str, ...]
+    downloading_pattern: str | None
+    ignore_pattern: str | None
+    stable_seconds: float
     name_cleanup_flags: list[str]
+    show_aliases: dict[str, list[str]]
     year_min: int
     year_max: int
-    shows: dict[str, str]
-    movies: dict[str, str]
-    music: dict[str, str]
+    shows: dict[str, Path]
+    movies: dict[str, Path]
+    music: dict[str, Path]
+    library_scan_workers: int
     default_source: Path
-    _data: dict[str, Any]
+    rules_path: Path
+    max_moves_per_device: int
+    watch_settle_seconds: float
 
     def __init__(self: "AppConfig", settings_path: Path | None = None) -> None:
         """Initialize AppConfig with settings from JSON file."""
@@ -38,57 +130,309 @@ class AppConfig:
         else:
             self.settings_path = Path(__file__).resolve().parents[1] / "settings.json"
 
-        self._data = self._load_settings()
+        compiled = self._load_compiled()
 
         # File Processing Settings
-        file_processing = self._data.get("file_processing", {})
-        extensions = file_processing.get("extensions", {})
-        keywords = file_processing.get("keywords", {})
-
-        # Convert lists to sets for O(1) lookups
-        self.valid_extensions = set(extensions.get("valid", []))
-        self.excluded_extensions = set(extensions.get("excluded", []))
-        self.deletable_extensions = set(extensions.get("deletable", []))
-        self.downloading_indicators = set(keywords.get("downloading", []))
-        self.ignore_keywords = set(keywords.get("ignore", []))
+        self.valid_extensions = set(compiled["valid_extensions"])
+        self.excluded_extensions = set(compiled["excluded_extensions"])
+        self.deletable_extensions = set(compiled["deletable_extensions"])
+        self.downloading_indicators = set(compiled["downloading_indicators"])
+        self.ignore_keywords = set(compiled["ignore_keywords"])
+        self.valid_suffixes = tuple(compiled["valid_suffixes"])
+        self.excluded_suffixes = tuple(compiled["excluded_suffixes"])
+        self.deletable_suffixes = tuple(compiled["deletable_suffixes"])
+        self.downloading_pattern = compiled["downloading_pattern"]
+        self.ignore_pattern = compiled["ignore_pattern"]
+        self.stable_seconds = compiled["stable_seconds"]
 
         # Metadata Settings
-        metadata = self._data.get("metadata", {})
-        year_range = metadata.get("year_range", {})
-        name_cleanup = metadata.get("name_cleanup", {})
-
-        self.year_min = int(year_range.get("min", 1900))
-        self.year_max = int(year_range.get("max", 2030))
-        self.name_cleanup_flags = name_cleanup.get("flags", [])
+        self.year_min = compiled["year_min"]
+        self.year_max = compiled["year_max"]
+        self.name_cleanup_flags = compiled["name_cleanup_flags"]
+        self.show_aliases = compiled["show_aliases"]
 
         # Library Settings
-        libraries = self._data.get("libraries", {})
-        self.shows = {lib["name"]: Path(lib["path"]) for lib in libraries.get("shows", [])}
-        self.movies = {lib["name"]: Path(lib["path"]) for lib in libraries.get("movies", [])}
-        self.music = {lib["name"]: Path(lib["path"]) for lib in libraries.get("music", [])}
+        self.shows = {name: Path(path) for name, path in compiled["shows"].items()}
+        self.movies = {name: Path(path) for name, path in compiled["movies"].items()}
+        self.music = {name: Path(path) for name, path in compiled["music"].items()}
+        self.library_scan_workers = compiled["library_scan_workers"]
 
         # Path Settings
-        paths = self._data.get("paths", {})
-        default_source = paths.get("default_source", "")
+        default_source = compiled["default_source"]
         self.default_source = Path(default_source) if default_source else Path.cwd()
+        rules = compiled["rules"]
+        self.rules_path = Path(rules) if rules else self.settings_path.parent / "rules.json"
+
+        # Transfer Settings
+        self.max_moves_per_device = compiled["max_moves_per_device"]
 
-        # Load version
-        self.version = self._load_version()
+        # Watch Settings
+        self.watch_settle_seconds = compiled["watch_settle_seconds"]
 
-    def _load_settings(self: "AppConfig") -> dict[str, Any]:
-        """Load and parse the JSON settings file."""
+    @cached_property
+    def library_devices(self: "AppConfig") -> dict[Path, int | None]:
+        """st_dev of every library folder, None if it can't be reached.
+
+        Resolved once per process on first use rather than cached on disk, since
+        device numbers can change when a share is remounted.
+        """
+        devices: dict[Path, int | None] = {}
+        for libraries in (self.shows, self.movies, self.music):
+            for path in libraries.values():
+                try:
+                    devices[path] = os.stat(path).st_dev
+                except OSError:
+                    devices[path] = None
+        return devices
+
+    @cached_property
+    def version(self: "AppConfig") -> str:
+        """Installed package version, looked up on first use."""
+        return load_version()
+
+    @property
+    def cache_path(self: "AppConfig") -> Path:
+        """Location of the compiled snapshot of this settings file."""
+        return self.settings_path.with_name(SETTINGS_CACHE_FILE)
+
+    def _load_compiled(self: "AppConfig") -> dict[str, Any]:
+        """Return the compiled settings, from the cache if the settings file is unchanged."""
         try:
-            log.debug(f"Loading settings from {self.settings_path}")
-            with open(self.settings_path) as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            log.warning(f"Unable to load valid settings from '{self.settings_path}'. {e}")
+            st = os.stat(self.settings_path)
+        except OSError as e:
+            log.warning("Unable to load valid settings from '%s'. %s", self.settings_path, e)
+            return compile_settings({})
+        key = [st.st_mtime_ns, st.st_size]
+
+        cache = self._read_cache()
+        if cache.get("key") == key:
+            METRICS.cache("settings", True)
+            return cache["compiled"]
+
+        log.debug("Loading settings from %s", self.settings_path)
+        try:
+            with open(self.settings_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            log.warning("Unable to load valid settings from '%s'. %s", self.settings_path, e)
+            return compile_settings({})
+        digest = hashlib.sha256(raw).hexdigest()
+
+        METRICS.cache("settings", cache.get("sha256") == digest)
+        if cache.get("sha256") == digest:
+            compiled = cache["compiled"]
+        else:
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError as e:
+                raise SettingsError(f"{self.settings_path} is not valid JSON: {e}") from e
+            errors = validate_settings(data)
+            if errors:
+                problems = "\n  ".join(errors)
+                raise SettingsError(f"{self.settings_path} has invalid settings:\n  {problems}")
+            compiled = compile_settings(data)
+
+        self._write_cache(key, digest, compiled)
+        return compiled
+
+    def _read_cache(self: "AppConfig") -> dict[str, Any]:
+        """Read the compiled snapshot, empty if it is missing, unreadable or for another file.
+
+        A snapshot without exactly the keys compile_settings() produces, e.g. one
+        written by hand or cut short, is ignored and the settings compiled again.
+        """
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != SETTINGS_CACHE_VERSION:
+            return {}
+        if cache.get("source") != str(self.settings_path):
             return {}
+        compiled = cache.get("compiled")
+        if not isinstance(compiled, dict) or compiled.keys() != compile_settings({}).keys():
+            log.debug("Ignoring incomplete settings cache '%s'", self.cache_path)
+            return {}
+        return cache
 
-    def _load_version(self: "AppConfig") -> str:
-        """Load the application version from installed package metadata."""
+    def _write_cache(self: "AppConfig", key: list[int], digest: str, compiled: dict[str, Any]) -> None:
+        """Store the compiled snapshot; a read-only settings directory just means no cache."""
+        data = {
+            "version": SETTINGS_CACHE_VERSION,
+            "source": str(self.settings_path),
+            "key": key,
+            "sha256": digest,
+            "compiled": compiled,
+        }
+        # Hooks can start several runs at once, so each writes its own temp file
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
         try:
-            return importlib.metadata.version("filetools")
-        except importlib.metadata.PackageNotFoundError:
-            log.warning("Unable to load filetools package version.")
-            return "unknown"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            log.debug("Unable to cache compiled settings '%s': %s", self.cache_path, e)
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def compile_keywords(keywords: Iterable[str]) -> str | None:
+    """Turn keywords into one lowercase regex alternation, None if there are none.
+
+    Longer keywords come first so they win over their prefixes. Keywords that
+    look like an extension (.part) must end where a name part ends, so .part
+    matches "x.mkv.part" but not "Show.Party.S01E01.mkv".
+    """
+    words = sorted({word.lower() for word in keywords if word}, key=len, reverse=True)
+    alternatives = [
+        re.escape(word) + (r"(?![a-z0-9])" if word.startswith(".") else "") for word in words
+    ]
+    return "|".join(alternatives) if alternatives else None
+
+
+def compile_settings(data: dict[str, Any]) -> dict[str, Any]:
+    """Compile parsed settings into the JSON-serializable snapshot AppConfig loads.
+
+    Args:
+        data: Parsed settings.json, already validated
+
+    Returns:
+        dict[str, Any]: Flat snapshot with defaults filled in and lookup tables built
+    """
+    file_processing = data.get("file_processing", {})
+    extensions = file_processing.get("extensions", {})
+    keywords = file_processing.get("keywords", {})
+    metadata = data.get("metadata", {})
+    year_range = metadata.get("year_range", {})
+    libraries = data.get("libraries", {})
+    paths = data.get("paths", {})
+
+    compiled: dict[str, Any] = {
+        "valid_extensions": sorted(set(extensions.get("valid", []))),
+        "excluded_extensions": sorted(set(extensions.get("excluded", []))),
+        "deletable_extensions": sorted(set(extensions.get("deletable", []))),
+        "downloading_indicators": sorted(set(keywords.get("downloading", []))),
+        "ignore_keywords": sorted(set(keywords.get("ignore", []))),
+        "stable_seconds": float(file_processing.get("stable_seconds", 60)),
+        "year_min": int(year_range.get("min", 1900)),
+        "year_max": int(year_range.get("max", 2030)),
+        "name_cleanup_flags": metadata.get("name_cleanup", {}).get("flags", []),
+        "show_aliases": metadata.get("show_aliases", {}),
+        "library_scan_workers": int(libraries.get("scan_workers", 8)),
+        # Resolved by AppConfig, an empty default source means the current directory
+        "default_source": paths.get("default_source", ""),
+        "rules": paths.get("rules", ""),
+        "max_moves_per_device": int(data.get("transfers", {}).get("max_per_device", 1)),
+        "watch_settle_seconds": float(data.get("watch", {}).get("settle_seconds", 30)),
+    }
+    for kind in ("valid", "excluded", "deletable"):
+        compiled[f"{kind}_suffixes"] = list(compile_suffixes(compiled[f"{kind}_extensions"]))
+    compiled["downloading_pattern"] = compile_keywords(compiled["downloading_indicators"])
+    compiled["ignore_pattern"] = compile_keywords(compiled["ignore_keywords"])
+    for kind in _LIBRARY_KINDS:
+        compiled[kind] = {lib["name"]: lib["path"] for lib in libraries.get(kind, [])}
+    return compiled
+
+
+def compile_suffixes(names: Iterable[str]) -> tuple[str, ...]:
+    """Lowercase names and extensions as a sorted tuple for str.endswith()."""
+    return tuple(sorted({name.lower() for name in names if name}))
+
+
+def load_version() -> str:
+    """Load the application version from installed package metadata.
+
+    importlib.metadata is imported here rather than at module level, it pulls in
+    the email package and scans site-packages.
+    """
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("filetools")
+    except importlib.metadata.PackageNotFoundError:
+        log.warning("Unable to load filetools package version.")
+        return "unknown"
+
+
+def validate_settings(data: object) -> list[str]:
+    """Check parsed settings against SETTINGS_SCHEMA and for values that can't work.
+
+    Args:
+        data: Parsed settings.json
+
+    Returns:
+        list[str]: One message per problem, empty if the settings are valid
+    """
+    errors: list[str] = []
+    _check_shape(data, SETTINGS_SCHEMA, "", errors)
+    if errors or not isinstance(data, dict):
+        return errors
+
+    year_range = data.get("metadata", {}).get("year_range", {})
+    if year_range.get("min", 1900) > year_range.get("max", 2030):
+        errors.append("metadata.year_range: min is greater than max")
+
+    for section, key, minimum in (
+        ("file_processing", "stable_seconds", 0),
+        ("libraries", "scan_workers", 1),
+        ("transfers", "max_per_device", 1),
+        ("watch", "settle_seconds", 0),
+    ):
+        value = data.get(section, {}).get(key)
+        if value is not None and value < minimum:
+            errors.append(f"{section}.{key}: must be at least {minimum}, got {value}")
+
+    libraries = data.get("libraries", {})
+    for kind in _LIBRARY_KINDS:
+        _check_libraries(kind, libraries.get(kind, []), errors)
+    return errors
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _check_libraries(kind: str, libraries: list[dict[str, str]], errors: list[str]) -> None:
+    """Append a message to errors for every library of a kind that has no usable name or path."""
+    names = set()
+    for index, library in enumerate(libraries):
+        where = f"libraries.{kind}[{index}]"
+        for field in ("name", "path"):
+            if not library.get(field):
+                errors.append(f"{where}: missing {field}")
+        if library.get("name") in names:
+            errors.append(f"{where}: duplicate library name '{library['name']}'")
+        names.add(library.get("name"))
+        if library.get("path") and not os.path.isabs(library["path"]):
+            errors.append(f"{where}: path must be absolute, got '{library['path']}'")
+
+
+def _check_shape(value: object, schema: Schema, where: str, errors: list[str]) -> None:
+    """Append a message to errors for every place value doesn't have the shape of schema."""
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{where or 'settings'}: expected an object, got {type(value).__name__}")
+            return
+        for key, item in value.items():
+            path = f"{where}.{key}" if where else key
+            if "*" in schema:
+                _check_shape(item, schema["*"], path, errors)
+            elif key in schema:
+                _check_shape(item, schema[key], path, errors)
+            else:
+                errors.append(f"unknown setting '{path}'")
+    elif isinstance(schema, list):
+        if not isinstance(value, list):
+            errors.append(f"{where}: expected a list, got {type(value).__name__}")
+            return
+        for index, item in enumerate(value):
+            _check_shape(item, schema[0], f"{where}[{index}]", errors)
+    elif isinstance(value, bool) or not isinstance(value, schema):
+        # bool is an int subclass, but true is never a valid number here
+        expected = " or ".join(t.__name__ for t in (schema if isinstance(schema, tuple) else (schema,)))
+        errors.append(f"{where}: expected {expected}, got {type(value).__name__}")
@@ -0,0 +1,560 @@
+#!/usr/bin/env python
+#
+# shows_map.py
+#
+# Builds and reads the shows_map.ini file that maps show folder names to their
+# library paths. A persistent index of directory mtimes is kept next to it so
+# only network folders that changed since the last run are rescanned.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import configparser
+import json
+import logging
+import os
+import re
+import stat
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from filetools import CONFIG
+from filetools.metrics import METRICS
+from filetools.naming_files import sanitize_show_name
+from filetools.utils import walk_tree
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+SHOWS_MAP_FILE = "shows_map.ini"
+SHOWS_INDEX_FILE = "shows_index.json"
+SHOWS_INDEX_VERSION = 1
+
+# Minimum trigram similarity (Dice coefficient) for a fuzzy show match
+FUZZY_MATCH_THRESHOLD = 0.75
+# A fuzzy match must beat the runner-up for another show by this much
+FUZZY_MATCH_MARGIN = 0.05
+
+# Trailing "(US)", "(2005)" or bare year qualifiers stripped to derive aliases
+_QUALIFIER_PATTERN = re.compile(r"(?:[\s_]*\([^)]*\)|[\s_]+(?:19|20)\d{2})+\s*$")
+
+# Set once the shows map has been brought up to date in this process
+_shows_map_synced = False
+
+# Process-wide ShowMap instance returned by get_show_map()
+_show_map: "ShowMap | None" = None
+
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+class ShowNameIndex:
+    """Normalized lookup structure for resolving show names to show folders.
+
+    Every show folder name and its aliases are normalized with the same
+    sanitization used when renaming files (naming_files.sanitize_show_name), so a
+    renamed episode's show name hits its folder with a single dict lookup. Names
+    that still miss fall back to a ranked trigram similarity search.
+
+    A name is never matched by prefix alone: "house" is not "house of cards".
+    Shows filed with a qualifier such as "The Office (US)" are reached through
+    their qualifier-stripped alias instead.
+
+    Aliases come from two places:
+        - CONFIG.show_aliases, mapping a show folder name to alternate names
+        - The folder name without trailing qualifiers such as "(US)" or a year
+
+    Args:
+        shows: Mapping of show folder names to show paths
+    """
+
+    def __init__(self: "ShowNameIndex", shows: dict[str, Path]) -> None:
+        self._keys: dict[str, str] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._trigram_counts: dict[str, int] = {}
+
+        configured_aliases = {
+            _normalize_show_name(name): aliases for name, aliases in CONFIG.show_aliases.items()
+        }
+        for show_name in shows:
+            self.add(show_name, configured_aliases.get(_normalize_show_name(show_name), []))
+
+    def add(self: "ShowNameIndex", show_name: str, aliases: list[str] | None = None) -> None:
+        """Index a show folder name together with its aliases.
+
+        Args:
+            show_name: Show name as stored in the show map
+            aliases: Alternate names that should resolve to the same show
+        """
+        names = [show_name, _QUALIFIER_PATTERN.sub("", show_name), *(aliases or [])]
+        for name in names:
+            key = _normalize_show_name(name)
+            if not key or key in self._keys:
+                continue
+            self._keys[key] = show_name
+            key_trigrams = _trigrams(key)
+            self._trigram_counts[key] = len(key_trigrams)
+            for trigram in key_trigrams:
+                self._trigrams.setdefault(trigram, set()).add(key)
+
+    def lookup(self: "ShowNameIndex", show_name: str) -> str | None:
+        """Resolve a show name with an exact match of its normalized name or an alias.
+
+        Args:
+            show_name: Show name to resolve
+
+        Returns:
+            str | None: Matching show name from the show map, or None if not found
+        """
+        key = _normalize_show_name(show_name)
+        return self._keys.get(key) if key else None
+
+    def rank(self: "ShowNameIndex", show_name: str, limit: int = 5) -> list[tuple[str, float]]:
+        """Rank indexed shows by trigram similarity to a show name.
+
+        Args:
+            show_name: Show name to compare
+            limit: Maximum number of results
+
+        Returns:
+            list[tuple[str, float]]: (show name, score) pairs, best first, one per show
+        """
+        key = _normalize_show_name(show_name)
+        query = _trigrams(key)
+        if not query:
+            return []
+
+        shared = Counter()
+        for trigram in query:
+            shared.update(self._trigrams.get(trigram, ()))
+
+        best: dict[str, float] = {}
+        for candidate, count in shared.items():
+            score = 2 * count / (len(query) + self._trigram_counts[candidate])
+            show = self._keys[candidate]
+            if score > best.get(show, 0.0):
+                best[show] = score
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def resolve(self: "ShowNameIndex", show_name: str) -> str | None:
+        """Resolve a show name exactly, by alias, or by an unambiguous fuzzy match.
+
+        Args:
+            show_name: Show name to resolve
+
+        Returns:
+            str | None: Matching show name from the show map, or None if no confident match
+        """
+        match = self.lookup(show_name)
+        if match:
+            return match
+
+        ranked = self.rank(show_name, limit=2)
+        if not ranked or ranked[0][1] < FUZZY_MATCH_THRESHOLD:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < FUZZY_MATCH_MARGIN:
+            log.debug("Ambiguous fuzzy match for '%s': %s", show_name, ranked)
+            return None
+
+        log.debug("Fuzzy matched '%s' to '%s' (score %.2f)", show_name, ranked[0][0], ranked[0][1])
+        return ranked[0][0]
+
+
+class ShowMap:
+    """In-memory view of shows_map.ini with O(1) show lookups.
+
+    The file is parsed once and cached. Every lookup compares the file's mtime
+    with the one seen at load time and reloads only when it changed, so a batch
+    of episodes parses the INI once instead of once per file.
+
+    Args:
+        path: Location of shows_map.ini
+
+    Attributes:
+        path: Location of shows_map.ini
+    """
+
+    def __init__(self: "ShowMap", path: Path) -> None:
+        self.path = Path(path)
+        self._shows: dict[str, Path] = {}
+        self._stamp: tuple[int, int] | None = None
+        self._index: ShowNameIndex | None = None
+
+    def __contains__(self: "ShowMap", show_name: str) -> bool:
+        return self.get(show_name) is not None
+
+    def __len__(self: "ShowMap") -> int:
+        self._refresh()
+        return len(self._shows)
+
+    def add(self: "ShowMap", show_name: str, show_path: Path) -> None:
+        """Add or update a show and persist it without rescanning the libraries.
+
+        Args:
+            show_name: Show folder name
+            show_path: Full path of the show folder
+        """
+        self._refresh()
+        self._shows[show_name.lower()] = Path(show_path)
+        self._save()
+        if self._index is not None:
+            self._index.add(show_name.lower())
+        log.debug("Added show to map: %s -> %s", show_name, show_path)
+
+    def get(self: "ShowMap", show_name: str) -> Path | None:
+        """Look up the folder of a show.
+
+        Args:
+            show_name: Show name, matched case-insensitively like ConfigParser keys
+
+        Returns:
+            Path | None: Show folder path, or None if the show is not mapped
+        """
+        self._refresh()
+        return self._shows.get(show_name.lower())
+
+    def items(self: "ShowMap") -> list[tuple[str, Path]]:
+        """Return all (show name, show path) pairs."""
+        self._refresh()
+        return list(self._shows.items())
+
+    def resolve(self: "ShowMap", show_name: str) -> Path | None:
+        """Look up the folder of a show, tolerating small naming differences.
+
+        Tries an exact lookup first, then the normalized name index (aliases and
+        a ranked fuzzy match). The index is built on first use
+        and rebuilt whenever shows_map.ini is reloaded.
+
+        Args:
+            show_name: Show name, typically the sanitized name of a renamed episode
+
+        Returns:
+            Path | None: Show folder path, or None if no confident match exists
+        """
+        path = self.get(show_name)
+        if path is not None:
+            return path
+
+        if self._index is None:
+            self._index = ShowNameIndex(self._shows)
+        match = self._index.resolve(show_name)
+        if match is None:
+            return None
+
+        log.info("Matched show '%s' to '%s'", show_name, match)
+        return self._shows[match]
+
+    def _refresh(self: "ShowMap") -> None:
+        """Reload the map if shows_map.ini changed on disk since it was last read.
+
+        The file is compared by (mtime, size) so a rewrite within the filesystem's
+        timestamp granularity is still noticed in the common case.
+        """
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+
+        config = configparser.ConfigParser()
+        config.read(self.path)
+        shows = config["Shows"] if config.has_section("Shows") else {}
+        self._shows = {name: Path(path) for name, path in shows.items()}
+        self._stamp = stamp
+        self._index = None
+        log.debug("Loaded %s shows from %s", len(self._shows), self.path)
+
+    def _save(self: "ShowMap") -> None:
+        """Write the in-memory map back to shows_map.ini."""
+        config = configparser.ConfigParser()
+        config["Shows"] = {name: str(path) for name, path in self._shows.items()}
+        with open(self.path, "w") as configfile:
+            config.write(configfile)
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self: "ShowMap") -> tuple[int, int] | None:
+        """Return (mtime_ns, size) of shows_map.ini, or None if it does not exist."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+# --------------------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------------------
+
+
+def get_show_map() -> "ShowMap":
+    """Return the process-wide show map.
+
+    The map is brought up to date with make_shows_map() the first time it is
+    requested in a process, so callers that never resolve a show never pay for
+    a library scan. shows_map.ini itself is parsed once and only re-read when its
+    mtime changes.
+
+    Returns:
+        ShowMap: Shared in-memory mapping of show names to paths
+    """
+    global _show_map
+
+    if not _shows_map_synced:
+        make_shows_map()
+
+    if _show_map is None:
+        _show_map = ShowMap(shows_map_path())
+    return _show_map
+
+
+@METRICS.timed("shows_map")
+def make_shows_map(
+    workers: int | None = None,
+    scandir: Callable[[str], Iterable[os.DirEntry]] = os.scandir,
+) -> None:
+    """Create or update the shows_map.ini file mapping show names to filesystem paths.
+
+    Scans all show library paths defined in CONFIG.shows and creates a mapping of
+    show folder names to their full filesystem paths. The mapping is stored in
+    shows_map.ini in the same directory as the settings file.
+
+    The mtime of every library and network folder is recorded in shows_index.json.
+    On later runs a library is only re-listed when its mtime changed, and a network
+    folder is only rescanned when its own mtime changed, so an unchanged library
+    costs one stat() per network folder instead of a full listing.
+
+    On a network mount every stat() and listing is a round trip, so the network
+    folders of a library are checked on a thread pool. Results are merged in
+    folder name order, so the map doesn't depend on which thread finished first.
+
+    Args:
+        workers: Network folders checked concurrently, CONFIG.library_scan_workers if None
+        scandir: Directory listing function, replaceable for benchmarks
+
+    Directory structure expected:
+    library_path/
+        network_folder/
+            show_folder/
+                episode files
+
+    Notes:
+        - Skips folders named 'empty' (case-insensitive)
+        - Creates shows_map.ini and shows_index.json next to the settings file
+        - Only rewrites shows_map.ini when the scan found a change
+        - Logs warnings for invalid library paths
+
+    Example structure in shows_map.ini:
+        [Shows]
+        Show Name = /path/to/library/network/show_name
+        Another Show = /path/to/library/network/another_show
+    """
+    global _shows_map_synced
+
+    old_index = _load_index()
+    new_index: dict[str, Any] = {}
+    changed = False
+    workers = CONFIG.library_scan_workers if workers is None else workers
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="shows-scan") as pool:
+        for _, library_path in CONFIG.shows.items():
+            lib_path = Path(library_path)
+            try:
+                lib_stat = lib_path.stat()
+            except OSError:
+                lib_stat = None
+            if lib_stat is None or not stat.S_ISDIR(lib_stat.st_mode):
+                log.warning("Show library path does not exist: %s", lib_path)
+                continue
+
+            old_library = old_index.get(str(lib_path))
+            library_entry, library_changed = _scan_library(
+                lib_path, lib_stat.st_mtime_ns, old_library, pool, scandir
+            )
+            new_index[str(lib_path)] = library_entry
+            changed = changed or library_changed
+
+    # Libraries removed from the settings also change the map
+    changed = changed or set(old_index) != set(new_index)
+
+    map_path = shows_map_path()
+    if changed or not map_path.exists():
+        _write_shows_map(map_path, new_index)
+        _save_index(new_index)
+        log.debug("Created show map at %s", map_path)
+    else:
+        log.debug("Show map is up to date: %s", map_path)
+
+    _shows_map_synced = True
+
+
+def shows_map_path() -> Path:
+    """Return the location of shows_map.ini.
+
+    Returns:
+        Path: shows_map.ini in the same directory as the settings file
+    """
+    return Path(CONFIG.settings_path).parent.joinpath(SHOWS_MAP_FILE)
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _index_path() -> Path:
+    """Return the location of the persistent shows index."""
+    return Path(CONFIG.settings_path).parent.joinpath(SHOWS_INDEX_FILE)
+
+
+def _list_subdirs(path: Path, scandir: Callable[[str], Iterable[os.DirEntry]]) -> list[Path]:
+    """Return the subdirectories of path, sorted by name."""
+    return [Path(entry.path) for entry in walk_tree(path, 1, scandir) if entry.is_dir()]
+
+
+def _load_index() -> dict[str, Any]:
+    """Load the persistent shows index.
+
+    Returns:
+        dict[str, Any]: Library entries keyed by library path, or an empty dict if the
+        index is missing, unreadable or from another index version
+    """
+    index_path = _index_path()
+    try:
+        with open(index_path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        log.warning("Ignoring unreadable shows index '%s': %s", index_path, e)
+        return {}
+
+    if data.get("version") != SHOWS_INDEX_VERSION:
+        log.debug("Shows index version mismatch, rebuilding: %s", index_path)
+        return {}
+    return data.get("libraries", {})
+
+
+def _normalize_show_name(show_name: str) -> str:
+    """Normalize a show name the same way renamed episode files are sanitized."""
+    return sanitize_show_name(show_name)
+
+
+def _trigrams(key: str) -> set[str]:
+    """Return the padded character trigrams of a normalized show name."""
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)} if key else set()
+
+
+def _save_index(libraries: dict[str, Any]) -> None:
+    """Atomically write the persistent shows index."""
+    index_path = _index_path()
+    tmp_path = index_path.with_suffix(".tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"version": SHOWS_INDEX_VERSION, "libraries": libraries}, f)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        log.warning("Unable to save shows index '%s': %s", index_path, e)
+
+
+def _scan_library(
+    lib_path: Path,
+    lib_mtime: int,
+    old_library: dict[str, Any] | None,
+    pool: ThreadPoolExecutor,
+    scandir: Callable[[str], Iterable[os.DirEntry]] = os.scandir,
+) -> tuple[dict[str, Any], bool]:
+    """Bring the index entry of a single show library up to date.
+
+    Args:
+        lib_path: Path of the show library
+        lib_mtime: Current st_mtime_ns of the library directory
+        old_library: Index entry from the previous run, if any
+        pool: Executor the network folders are checked on
+        scandir: Directory listing function
+
+    Returns:
+        tuple[dict[str, Any], bool]: (library entry, True if anything changed)
+    """
+    old_networks = (old_library or {}).get("networks", {})
+
+    if old_library and old_library.get("mtime_ns") == lib_mtime:
+        network_paths = [lib_path / name for name in sorted(old_networks)]
+    else:
+        log.debug("Library changed, listing network folders: %s", lib_path)
+        network_paths = _list_subdirs(lib_path, scandir)
+
+    changed = old_library is None or old_library.get("mtime_ns") != lib_mtime
+    networks = {}
+    # map() yields in submission order whatever order the folders finish in
+    results = pool.map(
+        lambda path: _scan_network(path, old_networks.get(path.name), scandir), network_paths
+    )
+    for network_path, (network_entry, network_changed) in zip(network_paths, results, strict=True):
+        changed = changed or network_changed
+        if network_entry is not None:
+            networks[network_path.name] = network_entry
+
+    changed = changed or set(networks) != set(old_networks)
+    return {"mtime_ns": lib_mtime, "networks": networks}, changed
+
+
+def _scan_network(
+    network_path: Path,
+    old_network: dict[str, Any] | None,
+    scandir: Callable[[str], Iterable[os.DirEntry]] = os.scandir,
+) -> tuple[dict[str, Any] | None, bool]:
+    """Bring the index entry of a single network folder up to date.
+
+    Runs on the scan pool, so it only reads its arguments.
+
+    Args:
+        network_path: Path of the network folder
+        old_network: Index entry from the previous run, if any
+        scandir: Directory listing function
+
+    Returns:
+        tuple[dict[str, Any] | None, bool]: (network entry or None if the folder
+        vanished, True if it changed)
+    """
+    try:
+        network_mtime = network_path.stat().st_mtime_ns
+    except OSError:
+        # Network folder vanished since the last listing
+        return None, True
+
+    unchanged = bool(old_network) and old_network.get("mtime_ns") == network_mtime
+    METRICS.cache("shows_index", unchanged)
+    if unchanged:
+        return old_network, False
+
+    log.debug("Rescanning network folder: %s", network_path)
+    shows = {
+        show_path.name: str(show_path)
+        for show_path in _list_subdirs(network_path, scandir)
+        if show_path.name.lower() != "empty"
+    }
+    return {"mtime_ns": network_mtime, "shows": shows}, True
+
+
+def _write_shows_map(map_path: Path, libraries: dict[str, Any]) -> None:
+    """Write shows_map.ini from the index.
+
+    Later libraries and networks win when two show folders share a name, matching
+    the order in which a full scan would visit them.
+    """
+    shows_dict = {}
+    for library in libraries.values():
+        for network_name in sorted(library["networks"]):
+            shows_dict.update(library["networks"][network_name]["shows"])
+
+    config = configparser.ConfigParser()
+    config["Shows"] = shows_dict
+    with open(map_path, "w") as configfile:
+        config.write(configfile)
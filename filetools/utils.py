@@ -8,14 +8,19 @@
 # --------------------------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------------------------
-import configparser
 import logging
 import os
 import re
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Union
 
 from filetools import CONFIG
+from filetools.metrics import METRICS
+from filetools.settings import compile_keywords, compile_suffixes
 
 log = logging.getLogger("filetools")
 
@@ -23,11 +28,512 @@ log = logging.getLogger("filetools")
 # Globals
 # --------------------------------------------------------------------------------
 
+# S##E##E##, S##E##, S####E##, #x## and "season 01 episode 01" variants
+TV_PATTERN = re.compile(
+    r"""
+    (?:
+        (?P<multi_season>s\d{2,4})e(?P<multi_start>\d{2})e(?P<multi_end>\d{2})   # Matches S##E##E##
+    ) |
+    (?:
+        (?:^|[\W_])                     # Start of string or non-word boundary
+        s(?P<std_season>\d{2,4})[\W_]*e(?P<std_episode>\d{2})        # Matches S##E## or S####E##
+        (?:$|[\W_])
+    ) |
+    (?:
+        (?:^|[\W_])                     # Start of string or non-word boundary
+        (?P<x_season>\d{1,2})x(?P<x_episode>\d{2})              # Matches #x## format
+        (?:$|[\W_])
+    ) |
+    (?:
+        (?:^|[\W_])                     # Start of string or non-word boundary
+        season[\W_]*?(?P<long_season>\d{2})[\W_]*?episode[\W_]*?(?P<long_episode>\d{2}) # Matches "season 01 episode 01" or variations
+        (?:$|[\W_])
+    ) |
+    (?:
+        (?:^|[\W_])                     # Start of string or non-word boundary
+        season(?P<joined_season>\d{2})episode(?P<joined_episode>\d{2})     # Matches "season01episode01"
+        (?:$|[\W_])
+    )
+    """,
+    re.I | re.VERBOSE,
+)
+
+# "1 of 10" style episode numbering used by mini-series
+ALT_SEASON_PATTERN = re.compile(r"\b(\d{1,2})\s*of\s*(\d{1,2})\b", re.I)
+
+NORMALIZE_TV_PATTERN = re.compile(
+    r"""
+    (?P<season>s\d{2,4})e(?P<episode_start>\d{2})e(?P<episode_end>\d{2}) |
+    s(?P<season1>\d{2,4})e(?P<episode1>\d{2}) |
+    (?P<season2>\d{1,2})x(?P<episode2>\d{2}) |
+    season\s*(?P<season3>\d{1,4})\s*episode\s*(?P<episode3>\d{1,3}) |
+    season(?P<season4>\d{1,4})\s*episode(?P<episode4>\d{1,3}) |
+    season(?P<season5>\d{1,4})episode(?P<episode5>\d{1,3})
+    """,
+    re.I | re.VERBOSE,
+)
+
+YEAR_PATTERN = re.compile(r"[0-9]{4}")
+
+# Levels of the working directory read by extract, rename and cleanup: the files
+# directly inside it and one level of download folders
+WORK_TREE_DEPTH = 2
+
+# Number of distinct filenames the classifier remembers
+CLASSIFIER_CACHE_SIZE = 16384
+
+# Kinds of file reported by FileMatcher.match()
+FILE_VALID = "valid"
+FILE_EXCLUDED = "excluded"
+FILE_DELETABLE = "deletable"
+FILE_DOWNLOADING = "downloading"
+FILE_IGNORED = "ignored"
+
+# Named TV_PATTERN groups holding (season, episode) for each supported format
+_TV_GROUPS = (
+    ("std_season", "std_episode"),
+    ("x_season", "x_episode"),
+    ("long_season", "long_episode"),
+    ("joined_season", "joined_episode"),
+)
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class FilenameInfo:
+    """Everything the filename classifier extracts from a single filename.
+
+    Attributes:
+        filename: The filename that was classified
+        show_name: Text before the season/episode marker, or None for movies
+        season_episode: Normalized marker, e.g. 's01e02' or 's03e08-e09'
+        season: Season number, if a marker was found
+        episode_start: First episode number, if a marker was found
+        episode_end: Last episode number of a multi-episode file, otherwise None
+        alt_season: True if the marker was "# of #" style
+        tv_match: Raw text matched by the standard TV pattern, if any
+        year: Most recent year within CONFIG.year_min..CONFIG.year_max, if any
+        uhd: True if the filename marks a 2160p release
+        hdr: True if the filename marks an HDR release
+    """
+
+    filename: str
+    show_name: str | None = None
+    season_episode: str | None = None
+    season: int | None = None
+    episode_start: int | None = None
+    episode_end: int | None = None
+    alt_season: bool = False
+    tv_match: str | None = None
+    year: str | None = None
+    uhd: bool = False
+    hdr: bool = False
+
+    @property
+    def is_tv(self: "FilenameInfo") -> bool:
+        """True if the filename carries a standard TV episode marker."""
+        return self.tv_match is not None
+
+    @property
+    def season_name(self: "FilenameInfo") -> str | None:
+        """Season folder name, e.g. 'season_01', or 'specials' for season 0."""
+        if self.season is None:
+            return None
+        if self.season == 0:
+            return "specials"
+        return f"season_{self.season:02}"
+
+
+class FilenameClassifier:
+    """Parse media filenames with patterns compiled once per process.
+
+    A single classify() call replaces the separate match_for_altseason(),
+    match_for_tv(), normalize_tv_format() and year/quality checks that callers
+    used to run on the same filename. Results are memoized in a bounded LRU cache
+    keyed on the filename, so the same name seen while sorting, resolving and
+    renaming is only parsed once. Parsing is timed as the parse_filename phase;
+    answers from the memo are not.
+
+    Args:
+        cache_size: Maximum number of filenames kept in the memo
+    """
+
+    def __init__(self: "FilenameClassifier", cache_size: int = CLASSIFIER_CACHE_SIZE) -> None:
+        self._classify_cached = lru_cache(maxsize=cache_size)(self._classify)
+
+    def cache_clear(self: "FilenameClassifier") -> None:
+        """Drop all memoized results and reset the hit/miss counters."""
+        self._classify_cached.cache_clear()
+
+    def cache_info(self: "FilenameClassifier") -> tuple[int, int, int, int]:
+        """Return the memo's hit/miss counters.
+
+        Returns:
+            tuple[int, int, int, int]: functools named tuple of hits, misses, maxsize and currsize
+        """
+        return self._classify_cached.cache_info()
+
+    def classify(self: "FilenameClassifier", filename: str) -> FilenameInfo:
+        """Classify a filename.
+
+        Alternate "# of #" numbering takes precedence over standard markers, as in
+        parse_filename().
+
+        Args:
+            filename: Filename, with or without extension
+
+        Returns:
+            FilenameInfo: Parsed show, season/episode, year and quality information
+        """
+        return self._classify_cached(filename)
+
+    @METRICS.timed("parse_filename")
+    def _classify(self: "FilenameClassifier", filename: str) -> FilenameInfo:
+        """Uncached implementation of classify()."""
+        lowered = filename.lower()
+        common = {
+            "filename": filename,
+            "year": self._year(filename),
+            "uhd": "2160p" in lowered,
+            "hdr": "hdr" in lowered,
+        }
+
+        tv_match = TV_PATTERN.search(filename)
+        tv_text = tv_match.group() if tv_match else None
+
+        alt_match = ALT_SEASON_PATTERN.search(filename)
+        if alt_match:
+            show_name = filename.split(alt_match.group(0))[0].strip()
+            show_name = show_name.split("series")[0].strip()
+            episode = int(alt_match.group(1))
+            return FilenameInfo(
+                show_name=show_name,
+                season_episode=f"s01e{episode:02}",
+                season=1,
+                episode_start=episode,
+                alt_season=True,
+                tv_match=tv_text,
+                **common,
+            )
+
+        if not tv_match:
+            return FilenameInfo(**common)
+
+        show_name = filename.split(tv_text)[0].strip()
+        if tv_match.group("multi_season"):
+            season = int(tv_match.group("multi_season")[1:])
+            start = int(tv_match.group("multi_start"))
+            end = int(tv_match.group("multi_end"))
+            return FilenameInfo(
+                show_name=show_name,
+                season_episode=f"s{season:02}e{start:02}-e{end:02}",
+                season=season,
+                episode_start=start,
+                episode_end=end,
+                tv_match=tv_text,
+                **common,
+            )
+
+        season, episode = next(
+            (int(tv_match.group(s)), int(tv_match.group(e)))
+            for s, e in _TV_GROUPS
+            if tv_match.group(s) is not None
+        )
+        return FilenameInfo(
+            show_name=show_name,
+            season_episode=f"s{season:02}e{episode:02}",
+            season=season,
+            episode_start=episode,
+            tv_match=tv_text,
+            **common,
+        )
+
+    def _year(self: "FilenameClassifier", filename: str) -> str | None:
+        """Return the most recent 4-digit year within the configured year range."""
+        year_min = CONFIG.year_min
+        year_max = CONFIG.year_max
+        years = [m for m in YEAR_PATTERN.findall(filename) if year_min <= int(m) <= year_max]
+        return years[-1] if years else None
+
+
+# Shared classifier used by the parsing helpers below and by naming/moving code
+CLASSIFIER = FilenameClassifier()
+
+
+class FileMatcher:
+    """Sort filenames into the kinds the extension and keyword settings describe.
+
+    Extension lists are lowercase suffix tuples checked with a single
+    str.endswith() call, and keyword lists one regex alternation (see
+    compile_suffixes() and compile_keywords() in settings), so each kind costs
+    one C-level scan however long the lists are. Matching is case-insensitive.
+    Kinds are checked in order, the first that applies wins:
+
+    - FILE_DOWNLOADING: contains a downloading keyword (.part)
+    - FILE_DELETABLE: ends with a deletable name or extension (.nfo, Thumbs.db)
+    - FILE_IGNORED: not a valid video extension, or contains an ignore keyword (sample)
+    - FILE_EXCLUDED: ends with an excluded name or extension (sample.mkv)
+    - FILE_VALID: a video to extract, rename and move
+
+    match_for_sort() decides what moving files out of the working directory
+    does with them, and only looks at names and extensions.
+
+    Args:
+        valid: Video extensions, CONFIG.valid_extensions if None
+        excluded: Excluded names and extensions, CONFIG.excluded_extensions if None
+        deletable: Deletable names and extensions, CONFIG.deletable_extensions if None
+        downloading: Downloading keywords, CONFIG.downloading_indicators if None
+        ignore: Ignore keywords, CONFIG.ignore_keywords if None
+    """
+
+    def __init__(
+        self: "FileMatcher",
+        valid: Iterable[str] | None = None,
+        excluded: Iterable[str] | None = None,
+        deletable: Iterable[str] | None = None,
+        downloading: Iterable[str] | None = None,
+        ignore: Iterable[str] | None = None,
+    ) -> None:
+        # Defaults come precompiled from the settings snapshot
+        self._valid = CONFIG.valid_suffixes if valid is None else compile_suffixes(valid)
+        self._excluded = CONFIG.excluded_suffixes if excluded is None else compile_suffixes(excluded)
+        self._deletable = CONFIG.deletable_suffixes if deletable is None else compile_suffixes(deletable)
+        downloading_pattern = (
+            CONFIG.downloading_pattern if downloading is None else compile_keywords(downloading)
+        )
+        ignore_pattern = CONFIG.ignore_pattern if ignore is None else compile_keywords(ignore)
+        self._downloading = re.compile(downloading_pattern) if downloading_pattern else None
+        self._ignore = re.compile(ignore_pattern) if ignore_pattern else None
+
+    def match(self: "FileMatcher", file_name: str) -> str:
+        """Return the kind of a file from its name.
+
+        Args:
+            file_name: Name of the file, without its directory
+
+        Returns:
+            str: One of FILE_VALID, FILE_EXCLUDED, FILE_DELETABLE, FILE_DOWNLOADING or FILE_IGNORED
+        """
+        name = file_name.lower()
+        if self._downloading and self._downloading.search(name):
+            return FILE_DOWNLOADING
+        if name.endswith(self._deletable):
+            return FILE_DELETABLE
+        if not name.endswith(self._valid) or (self._ignore and self._ignore.search(name)):
+            return FILE_IGNORED
+        if name.endswith(self._excluded):
+            return FILE_EXCLUDED
+        return FILE_VALID
+
+    def match_for_sort(self: "FileMatcher", file_name: str) -> str:
+        """Return the kind of a file in the working directory that is about to be moved.
+
+        Only videos are looked at: anything without a valid extension is
+        FILE_IGNORED, so subtitles and other loose files next to the videos are
+        never deleted here. Ignore and downloading keywords don't apply; a
+        finished file's name can contain them (Trailer.Park.Boys.S01E01.mkv).
+
+        Args:
+            file_name: Name of the file, without its directory
+
+        Returns:
+            str: One of FILE_VALID, FILE_EXCLUDED, FILE_DELETABLE or FILE_IGNORED
+        """
+        name = file_name.lower()
+        if not name.endswith(self._valid):
+            return FILE_IGNORED
+        if name.endswith(self._deletable):
+            return FILE_DELETABLE
+        if name.endswith(self._excluded):
+            return FILE_EXCLUDED
+        return FILE_VALID
+
+
+MATCHER = FileMatcher()
+
+
+class ScanEntry:
+    """A file or directory found by walk_tree().
+
+    Duck-types os.DirEntry (name, path, is_dir(), is_file(), stat()) so it can be
+    passed anywhere a dir_scan() entry is expected. The file type is resolved once
+    from the scandir entry and stat() results are cached.
+
+    Args:
+        name: Entry name
+        parent: Path of the directory holding the entry
+        depth: Depth below the scanned root, 1 for the root's own children
+        is_dir: True if the entry is a directory (following symlinks)
+        dir_entry: Underlying scandir entry, if the entry came from a scan
+    """
+
+    __slots__ = ("name", "path", "parent", "depth", "_is_dir", "_dir_entry", "_stat")
+
+    def __init__(
+        self: "ScanEntry",
+        name: str,
+        parent: str,
+        depth: int,
+        is_dir: bool,
+        dir_entry: os.DirEntry | None = None,
+    ) -> None:
+        self.name = name
+        self.parent = parent
+        self.path = dir_entry.path if dir_entry else os.path.join(parent, name)
+        self.depth = depth
+        self._is_dir = is_dir
+        self._dir_entry = dir_entry
+        self._stat: os.stat_result | None = None
+
+    def __repr__(self: "ScanEntry") -> str:
+        return f"<ScanEntry '{self.path}' depth={self.depth}{' dir' if self._is_dir else ''}>"
+
+    def is_dir(self: "ScanEntry") -> bool:
+        """True if the entry is a directory."""
+        return self._is_dir
+
+    def is_file(self: "ScanEntry") -> bool:
+        """True if the entry is not a directory."""
+        return not self._is_dir
+
+    def is_symlink(self: "ScanEntry") -> bool:
+        """True if the entry itself is a symbolic link."""
+        return self._dir_entry.is_symlink() if self._dir_entry else os.path.islink(self.path)
+
+    def stat(self: "ScanEntry") -> os.stat_result:
+        """Return the entry's stat result, calling stat() at most once.
+
+        Raises:
+            OSError: If the entry no longer exists
+        """
+        if self._stat is None:
+            self._stat = self._dir_entry.stat() if self._dir_entry else os.stat(self.path)
+        return self._stat
+
+
+class TreeScan:
+    """Snapshot of a directory tree, listing each directory at most once.
+
+    Extraction, renaming, sorting and cleanup read the tree from the snapshot
+    instead of rescanning it, and report the changes they make (moved, renamed
+    and deleted paths) so later steps see the tree as it is on disk.
+
+    The root is listed up front; subdirectories are listed the first time they
+    are read, so folders a step decides to skip are never listed at all.
+
+    Args:
+        root: Directory to scan
+        max_depth: Deepest level to include, None for the whole tree
+        scandir: Directory listing function, replaceable for benchmarks
+    """
+
+    def __init__(
+        self: "TreeScan",
+        root: str | Path,
+        max_depth: int | None = None,
+        scandir: Callable[[str], Iterable[os.DirEntry]] = os.scandir,
+    ) -> None:
+        self.root = Path(root)
+        self.max_depth = max_depth
+        self._scandir = scandir
+        # Directory path -> sorted subdirectories / sorted files, for listed directories
+        self._dirs: dict[str, list[ScanEntry]] = {}
+        self._files: dict[str, list[ScanEntry]] = {}
+        self._entries: dict[str, ScanEntry] = {}
+        # Depth of every directory that may still be listed
+        self._depths: dict[str, int] = {str(self.root): 0}
+        self._load(str(self.root))
+
+    def __len__(self: "TreeScan") -> int:
+        return len(self._entries)
+
+    def covers(self: "TreeScan", path: str | Path) -> bool:
+        """True if path is a directory of the tree within max_depth, so dirs() and files() list it."""
+        depth = self._depths.get(str(path))
+        return depth is not None and (self.max_depth is None or depth < self.max_depth)
+
+    def dirs(self: "TreeScan", path: str | Path) -> list[ScanEntry]:
+        """Return the subdirectories of path, sorted by name."""
+        path = str(path)
+        if path not in self._dirs:
+            self._load(path)
+        return list(self._dirs.get(path, ()))
+
+    def files(self: "TreeScan", path: str | Path) -> list[ScanEntry]:
+        """Return the files directly inside path, sorted by name."""
+        path = str(path)
+        if path not in self._files:
+            self._load(path)
+        return list(self._files.get(path, ()))
+
+    def move(self: "TreeScan", src: str | Path, dest: str | Path) -> None:
+        """Record that a file was moved or renamed from src to dest.
+
+        Destinations in directories that haven't been listed yet are picked up
+        when the directory is listed.
+        """
+        self.remove(src)
+        parent, name = os.path.split(str(dest))
+        if parent not in self._files:
+            return
+        entry = ScanEntry(name, parent, self._depths[parent] + 1, False)
+        insort(self._files[parent], entry, key=lambda e: e.name)
+        self._entries[entry.path] = entry
+
+    def remove(self: "TreeScan", path: str | Path) -> None:
+        """Record that a file or directory (and everything below it) was deleted.
+
+        Costs the size of what was removed, not of the tree: the entry is found
+        in its parent's sorted listing by name, and a directory's contents are
+        dropped by following the listings below it.
+        """
+        path = str(path)
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            siblings = (self._dirs if entry._is_dir else self._files).get(entry.parent)
+            if siblings:
+                position = bisect_left(siblings, entry.name, key=lambda e: e.name)
+                if position < len(siblings) and siblings[position] is entry:
+                    del siblings[position]
+                elif entry in siblings:
+                    siblings.remove(entry)
+            if not entry._is_dir:
+                return
+
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            self._depths.pop(directory, None)
+            for child in self._files.pop(directory, ()):
+                self._entries.pop(child.path, None)
+            for child in self._dirs.pop(directory, ()):
+                self._entries.pop(child.path, None)
+                pending.append(child.path)
+
+    def _load(self: "TreeScan", path: str) -> None:
+        """List a directory if it is part of the tree and within max_depth."""
+        if not self.covers(path):
+            return
+        depth = self._depths[path]
+        entries = _list_dir(path, depth + 1, self._scandir)
+        dirs = [entry for entry in entries if entry._is_dir]
+        self._dirs[path] = dirs
+        self._files[path] = [entry for entry in entries if not entry._is_dir]
+        self._entries.update((entry.path, entry) for entry in entries)
+        for entry in dirs:
+            if not entry._dir_entry.is_symlink():
+                self._depths[entry.path] = depth + 1
+
+
 # --------------------------------------------------------------------------------
 # Public API
 # --------------------------------------------------------------------------------
 
 
+@METRICS.timed("dir_scan")
 def dir_scan(scan_path: str | Path, get_files: bool = False) -> list[os.DirEntry]:
     """Scan a directory and return a list of sorted entries.
 
@@ -37,23 +543,8 @@ def dir_scan(scan_path: str | Path, get_files: bool = False) -> list[os.DirEntry
 
     Returns:
         list[os.DirEntry]: Sorted list of directory entries
-
-    Raises:
-        PermissionError: If access to the directory is denied
     """
-    scan_path = Path(scan_path)
-
-    if not scan_path.exists():
-        log.warning(f"Directory scan failed: {scan_path} does not exist.")
-        return []
-
-    if not scan_path.is_dir():
-        log.warning(f"Provided path is not a directory: {scan_path}")
-        return []
-
-    log.debug(f"Scanning directory: {scan_path}, get_files: {get_files}")
-
-    scan_output = []
+    log.debug("Scanning directory: %s, get_files: %s", scan_path, get_files)
 
     try:
         with os.scandir(scan_path) as scan_obj:
@@ -66,33 +557,20 @@ def dir_scan(scan_path: str | Path, get_files: bool = False) -> list[os.DirEntry
                     [entry for entry in scan_obj if entry.is_dir()], key=lambda e: e.name
                 )
 
+    except FileNotFoundError:
+        log.warning("Directory scan failed: %s does not exist.", scan_path)
+        return []
+    except NotADirectoryError:
+        log.warning("Provided path is not a directory: %s", scan_path)
+        return []
     except PermissionError:
-        log.warning(f"Permission denied when scanning {scan_path}")
+        log.warning("Permission denied when scanning %s", scan_path)
         return []
 
-    log.debug(f"Scan complete. Total entries found: {len(scan_output)}")
+    log.debug("Scan complete. Total entries found: %s", len(scan_output))
     return scan_output
 
 
-def get_show_map() -> configparser.ConfigParser:
-    """Read the shows_map.ini file configuration.
-
-    Creates the file if it doesn't exist by calling make_shows_map().
-
-    Returns:
-        configparser.ConfigParser: Parsed configuration mapping show names to paths
-    """
-    shows_map_path = Path(CONFIG.settings_path).parent.joinpath("shows_map.ini")
-
-    if not shows_map_path.exists():
-        log.info("No show_map.ini found. Creating one now...")
-        make_shows_map()
-
-    config = configparser.ConfigParser()
-    config.read(shows_map_path)
-    return config
-
-
 def parse_filename(filename: str) -> tuple[str | None, str | None]:
     """Extract show name and season/episode information from a filename.
 
@@ -108,30 +586,43 @@ def parse_filename(filename: str) -> tuple[str | None, str | None]:
         >>> parse_filename("Show.Name.S01E02.mp4")
         ('Show Name', 's01e02')
     """
-    # Check for alternate season naming (e.g., "1 of 10")
-    alt_season_match = match_for_altseason(filename)
-    if alt_season_match:
-        show_name = filename.split(alt_season_match.group(0))[0].strip()
-        try:  # Test for series in name
-            show_name = show_name.split("series")[0].strip()
-        except IndexError:
-            log.error(f"Failed to split series from show name: {show_name}")
-        season_episode = _fix_season_episode(alt_season_match.group(0))
-        return show_name, season_episode
+    info = CLASSIFIER.classify(filename)
+    return info.show_name, info.season_episode
 
-    # Check for standard S##E## or S####E## format
-    match, match_text = match_for_tv(filename)
-    if match:
-        try:
-            show_name = filename.split(match_text)[0].strip()
-            season_episode = normalize_tv_format(match_text)
-            return show_name, season_episode
-        except IndexError:
-            log.warning(f"Malformed season/episode structure in filename: {filename}")
-            return None, None
-    else:
-        # No valid match found
-        return None, None
+
+def parse_filenames(names: Iterable[str]) -> dict[str, tuple[str | None, str | None]]:
+    """Parse many filenames at once through the classifier's memo.
+
+    Duplicate names are parsed once, and names already seen earlier in the run are
+    answered from the cache. Hit/miss counters are logged at debug level.
+
+    Args:
+        names: Filenames to parse
+
+    Returns:
+        dict[str, tuple[str | None, str | None]]: (show_name, season_episode) per filename,
+        in first-seen order
+
+    Example:
+        >>> parse_filenames(["Show.S01E01.mkv", "Show.S01E02.mkv"])
+        {'Show.S01E01.mkv': ('Show', 's01e01'), 'Show.S01E02.mkv': ('Show', 's01e02')}
+    """
+    results = {}
+    for name in names:
+        if name not in results:
+            info = CLASSIFIER.classify(name)
+            results[name] = (info.show_name, info.season_episode)
+
+    cache = CLASSIFIER.cache_info()
+    log.debug(
+        "Parsed %s filenames | cache hits: %s, misses: %s, size: %s/%s",
+        len(results),
+        cache.hits,
+        cache.misses,
+        cache.currsize,
+        cache.maxsize,
+    )
+    return results
 
 
 def match_for_tv(filename: str) -> tuple[bool, str | None]:
@@ -152,35 +643,7 @@ def match_for_tv(filename: str) -> tuple[bool, str | None]:
     Returns:
         tuple[bool, str | None]: (True, matched_text) if found, (False, None) if not found
     """
-    pattern = re.compile(
-        r"""
-        (?:
-            (?P<season>s\d{2,4})e(?P<episode_start>\d{2})e(?P<episode_end>\d{2})   # Matches S##E##E##
-        ) |
-        (?:
-            (?:^|[\W_])                     # Start of string or non-word boundary
-            (s\d{2,4})[\W_]*e(\d{2})        # Matches S##E## or S####E##
-            (?:$|[\W_])
-        ) |
-        (?:
-            (?:^|[\W_])                     # Start of string or non-word boundary
-            (\d{1,2})x(\d{2})              # Matches #x## format
-            (?:$|[\W_])
-        ) |
-        (?:
-            (?:^|[\W_])                     # Start of string or non-word boundary
-            season[\W_]*?(\d{2})[\W_]*?episode[\W_]*?(\d{2}) # Matches "season 01 episode 01" or variations
-            (?:$|[\W_])
-        ) |
-        (?:
-            (?:^|[\W_])                     # Start of string or non-word boundary
-            season(\d{2})episode(\d{2})     # Matches "season01episode01"
-            (?:$|[\W_])
-        )
-        """,
-        re.I | re.VERBOSE,
-    )
-    match = pattern.search(filename)
+    match = TV_PATTERN.search(filename)
     if match:
         return True, match.group()
     return False, None
@@ -199,58 +662,7 @@ def match_for_altseason(filename: str) -> re.Match | None:
         >>> match_for_altseason("Episode 1 of 10.mp4")
         <re.Match object; span=(8, 14), match='1 of 10'>
     """
-    log.debug(f"Matching alternate season format: {filename} | Type: {type(filename)}")
-    return re.search(r"\b(\d{1,2})\s*of\s*(\d{1,2})\b", filename, re.I)
-
-
-def make_shows_map() -> None:
-    """Create or update the shows_map.ini file mapping show names to filesystem paths.
-
-    Scans all show library paths defined in CONFIG.shows and creates a mapping of
-    show folder names to their full filesystem paths. The mapping is stored in
-    shows_map.ini in the same directory as the settings file.
-
-    Directory structure expected:
-    library_path/
-        network_folder/
-            show_folder/
-                episode files
-
-    Notes:
-        - Skips folders named 'empty' (case-insensitive)
-        - Creates shows_map.ini next to the settings file
-        - Overwrites existing shows_map.ini if present
-        - Logs warnings for invalid library paths
-
-    Example structure in shows_map.ini:
-        [Shows]
-        Show Name = /path/to/library/network/show_name
-        Another Show = /path/to/library/network/another_show
-    """
-    config = configparser.ConfigParser()
-    show_libraries = CONFIG.shows
-    shows_dict = {}
-
-    for _, library_path in show_libraries.items():
-        lib_path = Path(library_path)
-        if not lib_path.is_dir():
-            log.warning(f"Show library path does not exist: {lib_path}")
-            continue
-
-        for network_obj in dir_scan(lib_path):
-            if network_obj.is_dir():
-                network_path = Path(network_obj.path)
-                for show_obj in dir_scan(network_path):
-                    if show_obj.name.lower() != "empty":
-                        shows_dict[show_obj.name] = show_obj.path
-
-    config["Shows"] = shows_dict
-
-    shows_map_path = Path(CONFIG.settings_path).parent.joinpath("shows_map.ini")
-    with open(shows_map_path, "w") as configfile:
-        config.write(configfile)
-
-    log.debug(f"Created show map at {shows_map_path}")
+    return ALT_SEASON_PATTERN.search(filename)
 
 
 def normalize_tv_format(season_episode: str) -> str:
@@ -262,19 +674,7 @@ def normalize_tv_format(season_episode: str) -> str:
     Returns:
         str: Normalized format (e.g., 's01e02' or 's03e08-e09')
     """
-    pattern = re.compile(
-        r"""
-        (?P<season>s\d{2,4})e(?P<episode_start>\d{2})e(?P<episode_end>\d{2}) |
-        s(?P<season1>\d{2,4})e(?P<episode1>\d{2}) |
-        (?P<season2>\d{1,2})x(?P<episode2>\d{2}) |
-        season\s*(?P<season3>\d{1,4})\s*episode\s*(?P<episode3>\d{1,3}) |
-        season(?P<season4>\d{1,4})\s*episode(?P<episode4>\d{1,3}) |
-        season(?P<season5>\d{1,4})episode(?P<episode5>\d{1,3})
-        """,
-        re.I | re.VERBOSE,
-    )
-
-    match = pattern.search(season_episode)
+    match = NORMALIZE_TV_PATTERN.search(season_episode)
     if match:
         if match.group("season") and match.group("episode_start") and match.group("episode_end"):
             season = match.group("season")
@@ -304,85 +704,114 @@ def sort_media(files_obj: list[os.DirEntry]) -> tuple[list[Path], list[Path]]:
         tuple[list[Path], list[Path]]: Lists of movie and show paths respectively
 
     Notes:
-        - Deletes files matching patterns in CONFIG.files_to_delete
-        - Excludes files matching patterns in CONFIG.FILE_EXT_EXCLUDES
-        - Only processes files with extensions in CONFIG.valid_file_extensions
+        - Only looks at files with a valid video extension, see FileMatcher.match_for_sort()
+        - Deletes those MATCHER reports as deletable and skips excluded ones
     """
     movies = []
     shows = []
 
-    # Update the lines to use the correct config attributes
-    files_to_delete = CONFIG.deletable_extensions
-    file_ext_excludes = CONFIG.excluded_extensions
-    valid_extensions = CONFIG.valid_extensions
-
     for file_obj in files_obj:
-        file_name = file_obj.name
-        file_path = Path(file_obj.path)
-
-        if not any(file_name.lower().endswith(ext) for ext in valid_extensions):
-            log.debug(f"Skipping invalid file type: {file_path}")
-            continue
-
-        if _should_delete(file_name, files_to_delete):
-            log.info(f"Deleting: {file_path}")
-            try:
-                os.remove(file_path)
-            except OSError as e:
-                log.warning(f"Failed to delete {file_path}: {e}")
-            continue
-
-        if _should_exclude(file_name, file_ext_excludes):
-            log.debug(f"Skipping excluded file: {file_path}")
-            continue
-
-        if match_for_tv(file_name)[0]:
-            log.debug(f"Adding TV show: {file_path}")
-            shows.append(file_path)
-        else:
-            log.debug(f"Adding movie: {file_path}")
-            movies.append(file_path)
+        media_type = sort_media_file(file_obj.name, Path(file_obj.path))
+        if media_type == "shows":
+            shows.append(Path(file_obj.path))
+        elif media_type == "movies":
+            movies.append(Path(file_obj.path))
 
     return movies, shows
 
 
-# --------------------------------------------------------------------------------
-# Private Methods
-# --------------------------------------------------------------------------------
-def _fix_season_episode(season_episode: str) -> str:
-    """Convert "# of #" format to 's01e##' format.
+def sort_media_file(file_name: str, file_path: Path) -> str | None:
+    """Decide whether a file in the working directory is a movie or a show.
+
+    Deletable videos are removed on the way.
 
     Args:
-        season_episode: String containing "# of #" pattern
+        file_name: Name of the file
+        file_path: Full path of the file
 
     Returns:
-        str: Formatted as 's01e##' where ## is the first number
+        str | None: "movies", "shows", or None if the file isn't moved
     """
-    episode = f"e{int(season_episode.split('of')[0]):02}"
-    return f"s01{episode}"
+    kind = MATCHER.match_for_sort(file_name)
+    if kind == FILE_DELETABLE:
+        log.info("Deleting: %s", file_path, extra={"event": "delete", "src": file_path})
+        try:
+            os.remove(file_path)
+            METRICS.count("files_deleted")
+        except OSError as e:
+            log.warning("Failed to delete %s: %s", file_path, e)
+        return None
+
+    if kind != FILE_VALID:
+        log.debug("Skipping %s file: %s", kind, file_path)
+        return None
 
+    if CLASSIFIER.classify(file_name).is_tv:
+        log.debug("Adding TV show: %s", file_path)
+        return "shows"
+    log.debug("Adding movie: %s", file_path)
+    return "movies"
 
-def _should_delete(file_name: str, files_to_delete: set) -> bool:
-    """Check if file should be deleted based on name patterns.
+
+def walk_tree(
+    root: str | Path,
+    max_depth: int | None = None,
+    scandir: Callable[[str], Iterable[os.DirEntry]] = os.scandir,
+) -> Iterator[ScanEntry]:
+    """Walk a directory tree with one scandir() call per directory.
+
+    Entries of a directory are yielded sorted by name, before the walk descends
+    into its subdirectories. Symlinked directories are reported but not entered.
 
     Args:
-        file_name: Name of file to check
-        files_to_delete: Set of patterns indicating files to delete
+        root: Directory to walk
+        max_depth: Deepest level to yield, 1 for the root's children only; None for no limit
+        scandir: Directory listing function, replaceable for benchmarks
 
-    Returns:
-        bool: True if file matches any deletion pattern
+    Yields:
+        ScanEntry: Every file and directory below root
     """
-    return any(delete_item in file_name for delete_item in files_to_delete)
-
+    stack = [(str(root), 1)]
+    while stack:
+        path, depth = stack.pop()
+        entries = _list_dir(path, depth, scandir)
+        yield from entries
+        if max_depth is None or depth < max_depth:
+            stack.extend(
+                (entry.path, depth + 1)
+                for entry in reversed(entries)
+                if entry._is_dir and not entry._dir_entry.is_symlink()
+            )
 
-def _should_exclude(file_name: str, file_ext_excludes: set) -> bool:
-    """Check if file should be excluded from processing.
 
-    Args:
-        file_name: Name of file to check
-        FILE_EXT_EXCLUDES: Set of patterns indicating files to exclude
+# --------------------------------------------------------------------------------
+# Private Methods
+# --------------------------------------------------------------------------------
+@METRICS.timed("dir_scan")
+def _list_dir(path: str, depth: int, scandir: Callable[[str], Iterable[os.DirEntry]]) -> list[ScanEntry]:
+    """List one directory for walk_tree() and TreeScan, sorted by name.
 
     Returns:
-        bool: True if file matches any exclusion pattern
+        list[ScanEntry]: Entries of the directory, empty if it can't be read
     """
-    return any(exclude_item in file_name for exclude_item in file_ext_excludes)
+    try:
+        with scandir(path) as scan_obj:
+            dir_entries = sorted(scan_obj, key=lambda e: e.name)
+    except FileNotFoundError:
+        log.warning("Directory scan failed: %s does not exist.", path)
+        return []
+    except NotADirectoryError:
+        log.warning("Provided path is not a directory: %s", path)
+        return []
+    except PermissionError:
+        log.warning("Permission denied when scanning %s", path)
+        return []
+
+    entries = []
+    for dir_entry in dir_entries:
+        try:
+            is_dir = dir_entry.is_dir()
+        except OSError:
+            is_dir = False
+        entries.append(ScanEntry(dir_entry.name, path, depth, is_dir, dir_entry))
+    return entries
@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+#
+# watcher.py
+#
+# Watch the download directory with Linux inotify and hand over download folders
+# once they have been quiet for a while and nothing in them is still downloading.
+# Only the folders that changed are processed, instead of rescanning the whole
+# directory on a timer.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from filetools import CONFIG
+from filetools.utils import FILE_DOWNLOADING, MATCHER, dir_scan
+
+log = logging.getLogger("filetools")
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+
+# inotify event masks, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# New download folders and finished single-file downloads in the watched directory
+ROOT_MASK = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+# Files finishing inside a download folder
+FOLDER_MASK = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE | IN_ONLYDIR
+
+# struct inotify_event header: int wd; uint32_t mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Bytes read from the inotify descriptor per read()
+_READ_SIZE = 64 * 1024
+
+_libc: ctypes.CDLL | None = None
+
+# --------------------------------------------------------------------------------
+# Classes
+# --------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class InotifyEvent:
+    """A single event read from an inotify descriptor.
+
+    Attributes:
+        wd: Watch descriptor the event belongs to
+        mask: IN_* flags describing the event
+        cookie: Links the IN_MOVED_FROM and IN_MOVED_TO halves of a rename
+        name: Name of the entry inside the watched directory, empty for the directory itself
+    """
+
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+class Inotify:
+    """Minimal ctypes wrapper around the Linux inotify API.
+
+    Raises:
+        OSError: If inotify is unavailable or the instance can't be created
+    """
+
+    def __init__(self: "Inotify") -> None:
+        self._libc = _load_libc()
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            _raise_errno("inotify_init1")
+        self.fd = fd
+        self._poller = select.poll()
+        self._poller.register(self.fd, select.POLLIN)
+
+    def __enter__(self: "Inotify") -> "Inotify":
+        return self
+
+    def __exit__(self: "Inotify", *exc_info: object) -> None:
+        self.close()
+
+    def add_watch(self: "Inotify", path: str | Path, mask: int) -> int:
+        """Watch a path for the events in mask.
+
+        Returns:
+            int: Watch descriptor reported with the path's events
+
+        Raises:
+            OSError: If the watch can't be added
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            _raise_errno(f"inotify_add_watch({path})")
+        return wd
+
+    def close(self: "Inotify") -> None:
+        """Close the inotify descriptor, removing all watches."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def read(self: "Inotify", timeout: float | None = None) -> list[InotifyEvent]:
+        """Wait for events and return everything queued.
+
+        Args:
+            timeout: Seconds to wait for the first event, None to wait forever
+
+        Returns:
+            list[InotifyEvent]: Events in the order the kernel reported them
+        """
+        if not self._poller.poll(None if timeout is None else max(0, int(timeout * 1000))):
+            return []
+
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                events.append(InotifyEvent(wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+
+class DownloadWatcher:
+    """Report download folders and files that have finished changing.
+
+    The watched directory and each download folder inside it get an inotify
+    watch. Any close-write, create or moved-to event marks the folder (or a file
+    directly in the watched directory) as changed. poll() returns it once it
+    has had no events for settle_seconds, nothing in it carries one of
+    CONFIG.downloading_indicators and no file in it was written to within
+    CONFIG.stable_seconds; a folder that is still downloading keeps waiting.
+
+    Paths passed to expect() are files the caller is about to create itself, so
+    their events don't trigger another round of processing. An expected path
+    with no event within settle_seconds is forgotten, as happens for the files
+    a debug run only reports.
+
+    Args:
+        root: Download directory to watch
+        settle_seconds: Quiet time before a change is reported, CONFIG.watch_settle_seconds if None
+        clock: Monotonic clock, replaceable in tests
+    """
+
+    def __init__(
+        self: "DownloadWatcher",
+        root: str | Path,
+        settle_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.root = Path(root)
+        self.settle_seconds = CONFIG.watch_settle_seconds if settle_seconds is None else settle_seconds
+        self._clock = clock
+        self._inotify = Inotify()
+        self._watches: dict[int, Path] = {}
+        self._pending: dict[Path, float] = {}
+        # Expected paths mapped to when they are forgotten
+        self._expected: dict[Path, float] = {}
+
+        self._add_watch(self.root, ROOT_MASK)
+        for dir_obj in dir_scan(self.root):
+            self._add_watch(Path(dir_obj.path), FOLDER_MASK)
+
+    def __enter__(self: "DownloadWatcher") -> "DownloadWatcher":
+        return self
+
+    def __exit__(self: "DownloadWatcher", *exc_info: object) -> None:
+        self.close()
+
+    def close(self: "DownloadWatcher") -> None:
+        """Stop watching."""
+        self._inotify.close()
+
+    def expect(self: "DownloadWatcher", paths: Iterable[Path]) -> None:
+        """Ignore the next event for each of these paths, if it comes within settle_seconds."""
+        deadline = self._clock() + self.settle_seconds
+        self._expected.update((Path(path), deadline) for path in paths)
+
+    def mark_all(self: "DownloadWatcher") -> None:
+        """Treat every folder and file in the watched directory as changed."""
+        now = self._clock()
+        for entry in dir_scan(self.root) + dir_scan(self.root, True):
+            self._pending[Path(entry.path)] = now
+
+    def poll(self: "DownloadWatcher", timeout: float | None = None) -> list[Path]:
+        """Read pending events and return the paths that have settled.
+
+        Args:
+            timeout: Seconds to wait for events; by default until the next change settles
+
+        Returns:
+            list[Path]: Settled folders and files, sorted by path
+        """
+        if timeout is None:
+            timeout = self._next_timeout()
+        for event in self._inotify.read(timeout):
+            self._handle(event)
+        self._forget_expected()
+        return self._settled()
+
+    def run(
+        self: "DownloadWatcher",
+        handler: Callable[[list[Path]], Iterable[Path] | None],
+        stop: threading.Event | None = None,
+    ) -> None:
+        """Call handler with every batch of settled paths until stopped.
+
+        Args:
+            handler: Processes settled paths and returns the files it created in the
+                     watched directory, which are then ignored by expect()
+            stop: Event that ends the loop when set
+        """
+        log.info("Watching %s (settle time %g seconds)", self.root, self.settle_seconds)
+        while not (stop and stop.is_set()):
+            timeout = self._next_timeout()
+            if stop:
+                timeout = 1.0 if timeout is None else min(timeout, 1.0)
+            ready = self.poll(timeout)
+            if ready:
+                self.expect(handler(ready) or [])
+
+    def _add_watch(self: "DownloadWatcher", path: Path, mask: int) -> None:
+        """Add a watch, tolerating folders that vanished in the meantime."""
+        try:
+            self._watches[self._inotify.add_watch(path, mask)] = path
+        except OSError as e:
+            log.warning("Unable to watch %s: %s", path, e)
+
+    def _handle(self: "DownloadWatcher", event: InotifyEvent) -> None:
+        """Update the pending paths from one inotify event."""
+        if event.mask & IN_Q_OVERFLOW:
+            log.warning("inotify queue overflowed, rechecking the whole directory")
+            self.mark_all()
+            return
+
+        parent = self._watches.get(event.wd)
+        if parent is None:
+            return
+        if event.mask & IN_IGNORED:
+            del self._watches[event.wd]
+            return
+        if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            if parent == self.root:
+                log.warning("Watched directory %s was removed or moved", self.root)
+            return
+
+        if parent != self.root:
+            # Something finished inside a download folder
+            self._touch(parent)
+        else:
+            self._handle_root(event)
+
+    def _handle_root(self: "DownloadWatcher", event: InotifyEvent) -> None:
+        """Update the pending paths from an event for an entry of the watched directory."""
+        path = self.root / event.name
+        if event.mask & IN_ISDIR:
+            if event.mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_watch(path, FOLDER_MASK)
+                self._touch(path)
+        elif event.mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            if self._expected.pop(path, None) is None:
+                self._touch(path)
+
+    def _forget_expected(self: "DownloadWatcher") -> None:
+        """Drop expected paths whose event didn't come in time."""
+        now = self._clock()
+        for path, deadline in list(self._expected.items()):
+            if deadline < now:
+                del self._expected[path]
+
+    def _next_timeout(self: "DownloadWatcher") -> float | None:
+        """Seconds until the oldest pending change settles, None if nothing is pending."""
+        if not self._pending:
+            return None
+        oldest = min(self._pending.values())
+        return max(0.0, oldest + self.settle_seconds - self._clock())
+
+    def _settled(self: "DownloadWatcher") -> list[Path]:
+        """Remove and return pending paths that are quiet and finished downloading."""
+        now = self._clock()
+        ready = []
+        for path, changed in list(self._pending.items()):
+            if now - changed < self.settle_seconds:
+                continue
+            if not path.exists():
+                del self._pending[path]
+            elif _still_downloading(path):
+                log.debug("Still downloading, waiting: %s", path)
+                self._pending[path] = now
+            else:
+                del self._pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+    def _touch(self: "DownloadWatcher", path: Path) -> None:
+        """Mark a path as changed now."""
+        log.debug("Change detected: %s", path)
+        self._pending[path] = self._clock()
+
+
+# --------------------------------------------------------------------------------
+# Private Functions
+# --------------------------------------------------------------------------------
+
+
+def _load_libc() -> ctypes.CDLL:
+    """Load the C library that provides the inotify functions."""
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return _libc
+
+
+def _raise_errno(call: str) -> None:
+    """Raise the OSError for the errno left behind by a failed libc call."""
+    err = ctypes.get_errno()
+    raise OSError(err, f"{call}: {os.strerror(err)}")
+
+
+def _still_downloading(path: Path) -> bool:
+    """True if a file, or any file in a folder, is marked as downloading or changed recently.
+
+    A file counts as changed recently if it was written to within
+    CONFIG.stable_seconds, so folders from clients that don't use .part files
+    aren't handed over while they are still being written.
+    """
+    file_objs = dir_scan(path, True) if path.is_dir() else [path]
+    cutoff = time.time() - CONFIG.stable_seconds
+    for file_obj in file_objs:
+        if MATCHER.match(file_obj.name) == FILE_DOWNLOADING:
+            return True
+        try:
+            if file_obj.stat().st_mtime > cutoff:
+                return True
+        except OSError:
+            continue
+    return False
@@ -0,0 +1,70 @@
+#
+# tests/conftest.py
+#
+# Runs every test against a copy of the repo's settings.json in a temporary
+# directory, so the settings cache, shows map, journals and manifests that are
+# kept next to the settings file never land in the checkout.
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import errno
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+_SETTINGS_DIR = tempfile.mkdtemp(prefix="filetools-tests-")
+shutil.copy(Path(__file__).parents[1] / "settings.json", _SETTINGS_DIR)
+# Must be set before anything touches filetools.CONFIG
+os.environ["FILETOOLS_SETTINGS"] = os.path.join(_SETTINGS_DIR, "settings.json")
+
+from filetools import CONFIG, rules, shows_map  # noqa: E402
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def state_dir(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[Path]:
+    """Keep the state files of each test in its own directory, with no rules and a fresh decider."""
+    state = tmp_path_factory.mktemp("state")
+    monkeypatch.setattr(CONFIG, "settings_path", state / "settings.json")
+    monkeypatch.setattr(CONFIG, "rules_path", state / "rules.json")
+    monkeypatch.setattr(rules, "_decider", None)
+    monkeypatch.setattr(shows_map, "_show_map", None)
+    monkeypatch.setattr(shows_map, "_shows_map_synced", False)
+    yield state
+
+
+@pytest.fixture
+def cross_device(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make os.rename() fail as it does between two filesystems."""
+
+    def rename(src: Path, dest: Path) -> None:
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(os, "rename", rename)
+
+
+@pytest.fixture
+def move(tmp_path: Path) -> tuple[Path, Path, bytes]:
+    """A source file and its destination in a library folder."""
+    data = os.urandom(10_000)
+    src = tmp_path / "downloads" / "a.mkv"
+    dest = tmp_path / "library" / "a.mkv"
+    src.parent.mkdir()
+    dest.parent.mkdir()
+    src.write_bytes(data)
+    return src, dest, data
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    shutil.rmtree(_SETTINGS_DIR, ignore_errors=True)
@@ -0,0 +1,97 @@
+#
+# tests/test_folder_state.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from filetools.folder_state import FolderState
+from filetools.moving_files import get_files_to_extract
+from filetools.utils import WORK_TREE_DEPTH, TreeScan
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+class CountingScandir:
+    """os.scandir() that records which directories were listed."""
+
+    def __init__(self: "CountingScandir") -> None:
+        self.listed: list[str] = []
+
+    def __call__(self: "CountingScandir", path: str) -> Iterator[os.DirEntry]:
+        self.listed.append(path)
+        return os.scandir(path)
+
+
+@pytest.fixture
+def download(tmp_path: Path) -> Path:
+    """A finished download folder holding one movie."""
+    folder = tmp_path / "Some.Movie.2019.1080p"
+    folder.mkdir()
+    movie = folder / "Some.Movie.2019.1080p.mp4"
+    movie.write_text("movie")
+    hours_ago = time.time() - 7200
+    for path in (movie, folder):
+        os.utime(path, (hours_ago, hours_ago))
+    return folder
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_unchanged_folder_is_skipped_without_listing(tmp_path: Path, download: Path) -> None:
+    state = FolderState(stable_seconds=0)
+    state.mark_done(download)
+    state.save()
+
+    # Same inode, mtime and size, seen by a later run
+    scandir = CountingScandir()
+    state = FolderState(stable_seconds=0)
+    assert get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH, scandir), state) == {}
+    assert str(download) not in scandir.listed
+
+    # Anything new in the folder changes its mtime
+    (download / "Some.Movie.2019.1080p.srt").write_text("subtitles")
+    extracted = get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH), state)
+    assert list(extracted) == [download / "Some.Movie.2019.1080p.mp4"]
+
+
+def test_recently_modified_folder_is_held_back(tmp_path: Path, download: Path) -> None:
+    movie = download / "Some.Movie.2019.1080p.mp4"
+    written = time.time()
+    os.utime(movie, (written, written))
+    now = written + 10
+    state = FolderState(stable_seconds=60, clock=lambda: now)
+
+    assert get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH), state) == {}
+
+    now = written + 61
+    extracted = get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH), state)
+    assert list(extracted) == [movie]
+
+
+def test_growing_folder_is_held_back_despite_old_mtimes(tmp_path: Path, download: Path) -> None:
+    movie = download / "Some.Movie.2019.1080p.mp4"
+    now = time.time()
+    state = FolderState(stable_seconds=60, clock=lambda: now)
+    assert get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH), state) != {}
+
+    # A client that preserves mtimes while it keeps writing
+    stat = movie.stat()
+    movie.write_text("movie, and more of it")
+    os.utime(movie, (stat.st_atime, stat.st_mtime))
+
+    assert get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH), state) == {}
+    now += 61
+    assert list(get_files_to_extract(tmp_path, TreeScan(tmp_path, WORK_TREE_DEPTH), state)) == [movie]
@@ -0,0 +1,67 @@
+#
+# tests/test_import.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded by commands that do work, never by --version or --help
+DEFERRED = [
+    "colorlog",
+    "filetools.logger",
+    "filetools.moving_files",
+    "filetools.naming_files",
+    "filetools.pipeline",
+    "filetools.planner",
+    "filetools.rules",
+    "filetools.shows_map",
+    "filetools.utils",
+    "filetools.watcher",
+]
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def imported_modules(*args: str) -> set[str]:
+    """Run `python -X importtime -m filetools` and return every module it imported."""
+    result = subprocess.run(  # noqa: S603 - this interpreter with fixed arguments
+        [sys.executable, "-X", "importtime", "-m", "filetools", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line
+    }
+
+
+@pytest.mark.parametrize(
+    ("args", "forbidden"),
+    [
+        (["--version"], DEFERRED),
+        (["--help"], [*DEFERRED, "filetools.settings", "importlib.metadata"]),
+        (["run", "--help"], [*DEFERRED, "filetools.settings"]),
+        (["watch", "--help"], [*DEFERRED, "filetools.settings"]),
+    ],
+)
+def test_cheap_commands_defer_heavy_imports(args: list[str], forbidden: list[str]) -> None:
+    loaded = imported_modules(*args)
+
+    assert "filetools.cli" in loaded
+    assert sorted(name for name in forbidden if name in loaded) == []
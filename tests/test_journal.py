@@ -0,0 +1,135 @@
+#
+# tests/test_journal.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from filetools import moving_files, rules
+from filetools.journal import MoveJournal, journal_path
+from filetools.moving_files import perform_moves, resume_moves
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def confirm_moves() -> None:
+    rules.configure(assume_yes=True)
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("copy", [False, True])
+def test_existing_library_file_is_not_overwritten(
+    move: tuple[Path, Path, bytes], copy: bool, request: pytest.FixtureRequest
+) -> None:
+    if copy:
+        request.getfixturevalue("cross_device")
+    src, dest, data = move
+    dest.write_bytes(b"ORIGINAL_LIBRARY")
+
+    perform_moves({src: dest}, "movies")
+
+    assert dest.read_bytes() == b"ORIGINAL_LIBRARY"
+    assert src.read_bytes() == data
+
+
+def test_journaled_copy_without_progress_does_not_overwrite(
+    move: tuple[Path, Path, bytes], cross_device: None
+) -> None:
+    src, dest, data = move
+    MoveJournal().start(src, dest, len(data))
+    dest.write_bytes(b"ORIGINAL_LIBRARY")
+
+    resume_moves()
+
+    assert dest.read_bytes() == b"ORIGINAL_LIBRARY"
+    assert src.exists()
+
+
+def test_resume_continues_partial_copy(
+    move: tuple[Path, Path, bytes], cross_device: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src, dest, data = move
+    journal = MoveJournal()
+    journal.start(src, dest, len(data))
+    dest.write_bytes(data[:4096])
+    journal.progress(src, 4096)
+
+    offsets = []
+    copy_file_data = moving_files._copy_file_data
+
+    def spy(src_fd: int, dest_fd: int, size: int, offset: int = 0, checkpoint: object = None) -> int:
+        offsets.append(offset)
+        return copy_file_data(src_fd, dest_fd, size, offset, checkpoint)
+
+    monkeypatch.setattr(moving_files, "_copy_file_data", spy)
+    resume_moves()
+
+    assert offsets == [4096]
+    assert dest.read_bytes() == data
+    assert not src.exists()
+    assert not journal_path().exists()
+
+
+def test_failed_copy_is_kept_for_resume(
+    move: tuple[Path, Path, bytes], cross_device: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src, dest, data = move
+    monkeypatch.setattr(moving_files, "CHECKPOINT_BYTES", 4096)
+    monkeypatch.setattr(moving_files, "COPY_CHUNK_SIZE", 4096)
+    copy_file_data = moving_files._copy_file_data
+
+    def interrupted(
+        src_fd: int, dest_fd: int, size: int, offset: int = 0, checkpoint: object = None
+    ) -> int:
+        copy_file_data(src_fd, dest_fd, 8192, offset, checkpoint)
+        raise OSError(errno.EIO, "Connection lost")
+
+    def copyfile(src: Path, dest: Path) -> None:
+        raise OSError(errno.EIO, "Connection lost")
+
+    monkeypatch.setattr(moving_files, "_copy_file_data", interrupted)
+    monkeypatch.setattr(moving_files.shutil, "copyfile", copyfile)
+    perform_moves({src: dest}, "movies")
+
+    (entry,) = MoveJournal().pending()
+    assert (entry.state, entry.copied) == ("failed", 8192)
+    assert src.exists()
+
+    monkeypatch.setattr(moving_files, "_copy_file_data", copy_file_data)
+    resume_moves()
+    assert dest.read_bytes() == data
+    assert not src.exists()
+
+
+def test_renames_are_not_journaled(move: tuple[Path, Path, bytes]) -> None:
+    src, dest, data = move
+
+    perform_moves({src: dest}, "movies")
+
+    assert dest.read_bytes() == data
+    assert not journal_path().exists()
+
+
+def test_compact_keeps_entries_of_other_processes(tmp_path: Path) -> None:
+    first, second = MoveJournal(), MoveJournal()
+    first.start(tmp_path / "a.mkv", tmp_path / "lib" / "a.mkv", 1)
+    second.start(tmp_path / "b.mkv", tmp_path / "lib" / "b.mkv", 1)
+    first.complete(tmp_path / "a.mkv")
+
+    first.compact()
+
+    assert [entry.src for entry in MoveJournal().pending()] == [str(tmp_path / "b.mkv")]
+    assert not list(journal_path().parent.glob("*.tmp"))
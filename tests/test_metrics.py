@@ -0,0 +1,100 @@
+#
+# tests/test_metrics.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+from pathlib import Path
+
+import pytest
+
+from filetools.metrics import METRICS, PROMPT, Metrics
+from filetools.utils import CLASSIFIER, sort_media_file
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def metrics() -> Metrics:
+    """Metrics of a run that moved two files onto one device."""
+    metrics = Metrics()
+    metrics.add_time("move", 0.5)
+    metrics.add_time("move", 1.5)
+    metrics.add_time(PROMPT, 3.0)
+    metrics.count("files_moved", 2)
+    metrics.count("bytes_moved", 3 * 2**30)
+    metrics.transfer('Movies "4K"', 2**30, 0.5)
+    metrics.transfer('Movies "4K"', 2 * 2**30, 1.5)
+    metrics.cache("folder_state", True)
+    metrics.cache("folder_state", False)
+    metrics.cache("folder_state", True)
+    return metrics
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_timed_counts_calls_that_raise() -> None:
+    metrics = Metrics()
+
+    @metrics.timed("extract")
+    def extract(fail: bool) -> str:
+        if fail:
+            raise OSError("disk gone")
+        return "done"
+
+    assert extract(False) == "done"
+    with pytest.raises(OSError, match="disk gone"):
+        extract(True)
+
+    assert metrics.timers["extract"][0] == 2
+
+
+def test_summary(metrics: Metrics) -> None:
+    lines = metrics.summary()
+
+    assert lines[0].endswith("waiting on 1 prompts")
+    assert lines[1:] == [
+        "move                  2 calls     2.000 s  1.0 files/s",
+        "bytes_moved: 3221225472, files_moved: 2",
+        'Device Movies "4K": 2 files, 3.00 GiB in 2.0 s (1536.0 MiB/s)',
+        "Cache folder_state: 67% hits (2/3)",
+    ]
+
+
+def test_textfile(metrics: Metrics, tmp_path: Path) -> None:
+    path = tmp_path / "filetools.prom"
+
+    metrics.write_textfile(path)
+
+    lines = path.read_text().splitlines()
+    assert lines[:2] == [
+        "# HELP filetools_run_seconds Wall time of the run",
+        "# TYPE filetools_run_seconds gauge",
+    ]
+    assert "filetools_prompt_wait_seconds 3" in lines
+    assert 'filetools_phase_seconds{phase="move"} 2' in lines
+    assert 'filetools_phase_calls{phase="move"} 2' in lines
+    assert "filetools_files_moved 2" in lines
+    assert 'filetools_device_bytes{device="Movies \\"4K\\""} 3221225472' in lines
+    assert 'filetools_cache_misses{cache="folder_state"} 1' in lines
+    # Every sample has its HELP and TYPE lines, and nothing is left beside the file
+    samples = {line.split("{")[0].split(" ")[0] for line in lines if not line.startswith("#")}
+    assert samples == {line.split(" ")[2] for line in lines if line.startswith("# TYPE")}
+    assert [p.name for p in tmp_path.iterdir()] == ["filetools.prom"]
+
+
+def test_classifier_times_parsing_but_not_cache_hits() -> None:
+    CLASSIFIER.cache_clear()
+    METRICS.reset()
+
+    CLASSIFIER.classify("The.Wire.S01E02.720p.mkv")
+    CLASSIFIER.classify("The.Wire.S01E02.720p.mkv")
+    sort_media_file("Some.Movie.2019.1080p.mp4", Path("Some.Movie.2019.1080p.mp4"))
+
+    assert METRICS.timers["parse_filename"][0] == 2
@@ -0,0 +1,62 @@
+#
+# tests/test_moving_files.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import os
+from pathlib import Path
+
+import pytest
+
+from filetools.journal import MoveJournal
+from filetools.moving_files import move_file
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def corrupt_writes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Flip the first byte written to every file, as a faulty disk or link would."""
+    pwrite = os.pwrite
+
+    def corrupting_pwrite(fd: int, data: bytes, offset: int) -> int:
+        data = bytes(data)
+        if offset == 0:
+            data = bytes([data[0] ^ 0xFF]) + data[1:]
+        return pwrite(fd, data, offset)
+
+    monkeypatch.setattr(os, "pwrite", corrupting_pwrite)
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("journaled", [False, True])
+def test_verified_copy_removes_the_source(
+    move: tuple[Path, Path, bytes], cross_device: None, journaled: bool
+) -> None:
+    src, dest, data = move
+
+    move_file(src, dest, MoveJournal() if journaled else None, verify=True)
+
+    assert not src.exists()
+    assert dest.read_bytes() == data
+
+
+@pytest.mark.parametrize("journaled", [False, True])
+def test_checksum_mismatch_keeps_the_source(
+    move: tuple[Path, Path, bytes], cross_device: None, corrupt_writes: None, journaled: bool
+) -> None:
+    src, dest, data = move
+
+    with pytest.raises(OSError, match="Checksum mismatch"):
+        move_file(src, dest, MoveJournal() if journaled else None, verify=True)
+
+    assert src.read_bytes() == data
+    assert not dest.exists()
@@ -0,0 +1,134 @@
+#
+# tests/test_naming_files.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+from pathlib import Path
+
+from filetools.naming_files import (
+    _apply_rename_batch,
+    _rename_tmp_path,
+    _write_rename_manifest,
+    apply_renames,
+    plan_renames,
+    rename_files,
+    rename_manifest_path,
+    undo_renames,
+)
+from filetools.utils import dir_scan
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_files_wanting_the_same_name_keep_theirs(tmp_path: Path) -> None:
+    first = tmp_path / "The.Wire.S01E02.720p.mkv"
+    second = tmp_path / "the.wire.s01e02.mkv"
+    first.write_text("first")
+    second.write_text("second")
+
+    plan = plan_renames(dir_scan(tmp_path, True))
+
+    assert plan.renames == {}
+    assert sorted(plan.collisions[tmp_path / "the_wire_s01e02.mkv"]) == [first, second]
+
+    rename_files(tmp_path)
+
+    assert first.read_text() == "first"
+    assert second.read_text() == "second"
+    assert not (tmp_path / "the_wire_s01e02.mkv").exists()
+
+
+def test_existing_file_is_not_renamed_over(tmp_path: Path) -> None:
+    taken = tmp_path / "the_wire_s01e02.mkv"
+    taken.write_text("already renamed")
+    (tmp_path / "The.Wire.S01E02.720p.mkv").write_text("new download")
+
+    plan = plan_renames(dir_scan(tmp_path, True))
+    assert plan.collisions == {taken: [tmp_path / "The.Wire.S01E02.720p.mkv"]}
+
+    rename_files(tmp_path)
+    assert taken.read_text() == "already renamed"
+
+
+def test_target_created_after_planning_is_not_renamed_over(tmp_path: Path) -> None:
+    download = tmp_path / "The.Wire.S01E02.720p.mkv"
+    download.write_text("new download")
+    plan = plan_renames(dir_scan(tmp_path, True))
+    target = tmp_path / "the_wire_s01e02.mkv"
+    assert plan.renames == {download: target}
+
+    target.write_text("arrived meanwhile")
+    done = apply_renames(plan)
+
+    assert done == {}
+    assert target.read_text() == "arrived meanwhile"
+    assert download.read_text() == "new download"
+
+    # Undo leaves the file that arrived alone
+    assert undo_renames() == {}
+    assert target.read_text() == "arrived meanwhile"
+
+
+def test_batch_refuses_an_existing_target(tmp_path: Path) -> None:
+    a, b = tmp_path / "a.mkv", tmp_path / "b.mkv"
+    a.write_text("a")
+    b.write_text("b")
+
+    assert _apply_rename_batch({a: b}) == {}
+    assert (a.read_text(), b.read_text()) == ("a", "b")
+
+
+def test_other_files_of_the_directory_block_their_names(tmp_path: Path) -> None:
+    download = tmp_path / "The.Wire.S01E02.720p.mkv"
+    download.write_text("new download")
+
+    plan = plan_renames(dir_scan(tmp_path, True), {tmp_path / "the_wire_s01e02.mkv"})
+
+    assert plan.renames == {}
+    assert list(plan.collisions) == [tmp_path / "the_wire_s01e02.mkv"]
+
+
+def test_undo_reverts_the_last_batch(tmp_path: Path) -> None:
+    (tmp_path / "The.Wire.S01E02.720p.mkv").write_text("show")
+    (tmp_path / "Some.Movie.2019.1080p.mp4").write_text("movie")
+    (tmp_path / "info.nfo").write_text("deletable")
+
+    rename_files(tmp_path)
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == ["some_movie_(2019).mp4", "the_wire_s01e02.mkv"]
+
+    undone = undo_renames()
+
+    assert len(undone) == 2
+    assert (tmp_path / "The.Wire.S01E02.720p.mkv").read_text() == "show"
+    assert (tmp_path / "Some.Movie.2019.1080p.mp4").read_text() == "movie"
+    assert not rename_manifest_path().exists()
+
+
+def test_swap_within_one_batch(tmp_path: Path) -> None:
+    a, b = tmp_path / "a.mkv", tmp_path / "b.mkv"
+    a.write_text("a")
+    b.write_text("b")
+
+    done = _apply_rename_batch({a: b, b: a})
+
+    assert done == {a: b, b: a}
+    assert (a.read_text(), b.read_text()) == ("b", "a")
+    assert not list(tmp_path.glob(".*"))
+
+
+def test_undo_finds_a_file_left_under_its_temporary_name(tmp_path: Path) -> None:
+    src, dest = tmp_path / "a.mkv", tmp_path / "b.mkv"
+    _write_rename_manifest({src: dest})
+    # Interrupted while src was parked for a chained rename
+    _rename_tmp_path(src).write_text("a")
+
+    undo_renames()
+
+    assert src.read_text() == "a"
+    assert not _rename_tmp_path(src).exists()
@@ -0,0 +1,43 @@
+#
+# tests/test_pipeline.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import os
+import time
+from pathlib import Path
+
+from filetools.naming_files import undo_renames
+from filetools.pipeline import run_pipeline
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_pipeline_renames_through_planner_and_manifest(tmp_path: Path) -> None:
+    taken = tmp_path / "the_wire_s01e02.mkv"
+    taken.write_text("library copy")
+    (tmp_path / "The.Wire.S01E02.720p.mkv").write_text("download")
+    folder = tmp_path / "Some.Movie.2019.1080p"
+    folder.mkdir()
+    (folder / "Some.Movie.2019.1080p.mp4").write_text("movie")
+    # A finished download, not one still being written to
+    hours_ago = time.time() - 7200
+    for path in (folder / "Some.Movie.2019.1080p.mp4", folder):
+        os.utime(path, (hours_ago, hours_ago))
+
+    pipeline = run_pipeline(tmp_path, move=False)
+
+    # The taken target is a collision, not a silent skip or an overwrite
+    assert taken.read_text() == "library copy"
+    assert (tmp_path / "The.Wire.S01E02.720p.mkv").read_text() == "download"
+    assert (tmp_path / "some_movie_(2019).mp4").read_text() == "movie"
+    assert pipeline.counts["renamed"] == 1
+
+    undone = undo_renames()
+
+    assert undone == {tmp_path / "some_movie_(2019).mp4": tmp_path / "Some.Movie.2019.1080p.mp4"}
+    assert (tmp_path / "Some.Movie.2019.1080p.mp4").read_text() == "movie"
@@ -0,0 +1,116 @@
+#
+# tests/test_planner.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from filetools import CONFIG, rules
+from filetools.planner import Plan, apply_plan, build_plan, load_plan, write_plan
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def work(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A download directory holding one finished movie folder, and a movie library."""
+    work = tmp_path / "downloads"
+    folder = work / "Some.Movie.2019.1080p"
+    folder.mkdir(parents=True)
+    (folder / "Some.Movie.2019.1080p.mp4").write_text("movie")
+    (folder / "info.nfo").write_text("info")
+    hours_ago = time.time() - 7200
+    for path in (*folder.iterdir(), folder):
+        os.utime(path, (hours_ago, hours_ago))
+
+    (tmp_path / "library").mkdir()
+    monkeypatch.setattr(CONFIG, "movies", {"Movies": tmp_path / "library"})
+    rules.configure(assume_yes=True)
+    return work
+
+
+def saved_plan(work: Path, fmt: str = "json") -> tuple[Plan, Path]:
+    """Plan a full run for work and write the plan next to it."""
+    plan = build_plan(work)
+    plan_path = work.parent / f"plan.{fmt}"
+    with open(plan_path, "w") as f:
+        write_plan(plan, f, fmt)
+    return plan, plan_path
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_build_plan_touches_nothing(work: Path) -> None:
+    before = sorted(work.rglob("*"))
+
+    plan = build_plan(work)
+
+    folder = work / "Some.Movie.2019.1080p"
+    renamed = work / "some_movie_(2019).mp4"
+    assert [(op.operation, op.src, op.dest) for op in plan.operations] == [
+        ("extract", str(folder / "Some.Movie.2019.1080p.mp4"), str(work / "Some.Movie.2019.1080p.mp4")),
+        ("rename", str(work / "Some.Movie.2019.1080p.mp4"), str(renamed)),
+        ("move", str(renamed), str(work.parent / "library" / "some_movie_(2019)" / renamed.name)),
+        ("rmdir", str(folder), None),
+    ]
+    assert plan.operations[-1].files == [str(folder / "info.nfo")]
+    assert sorted(work.rglob("*")) == before
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_plan_round_trips(work: Path, fmt: str) -> None:
+    plan, plan_path = saved_plan(work, fmt)
+
+    assert load_plan(plan_path) == plan
+
+
+def test_load_plan_rejects_another_version(work: Path) -> None:
+    _, plan_path = saved_plan(work)
+    plan_path.write_text(plan_path.read_text().replace('"version": 1', '"version": 99'))
+
+    assert load_plan(plan_path) is None
+
+
+def test_apply_plan_carries_out_the_plan(work: Path) -> None:
+    _, plan_path = saved_plan(work)
+
+    apply_plan(plan_path)
+
+    library = work.parent / "library"
+    assert (library / "some_movie_(2019)" / "some_movie_(2019).mp4").read_text() == "movie"
+    assert list(work.iterdir()) == []
+
+
+def test_apply_plan_skips_destinations_taken_since(work: Path, caplog: pytest.LogCaptureFixture) -> None:
+    _, plan_path = saved_plan(work)
+    taken = work.parent / "library" / "some_movie_(2019)" / "some_movie_(2019).mp4"
+    taken.parent.mkdir()
+    taken.write_text("arrived meanwhile")
+
+    apply_plan(plan_path)
+
+    assert taken.read_text() == "arrived meanwhile"
+    assert (work / "some_movie_(2019).mp4").read_text() == "movie"
+    assert f"{taken} already exists" in caplog.text
+
+
+def test_apply_plan_does_not_rename_over_a_new_file(work: Path) -> None:
+    _, plan_path = saved_plan(work)
+    (work / "some_movie_(2019).mp4").write_text("arrived meanwhile")
+
+    apply_plan(plan_path)
+
+    assert (work / "some_movie_(2019).mp4").read_text() == "arrived meanwhile"
+    assert (work / "Some.Movie.2019.1080p.mp4").read_text() == "movie"
+    assert not (work.parent / "library" / "some_movie_(2019)").exists()
@@ -0,0 +1,73 @@
+#
+# tests/test_rules.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import builtins
+import json
+from pathlib import Path
+
+import pytest
+
+from filetools import CONFIG, rules
+from filetools.moving_files import _choose_library, _prompt_for_new_show
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def no_input(monkeypatch: pytest.MonkeyPatch) -> None:
+    def prompt(*args: object) -> str:
+        raise AssertionError("unattended run prompted for input")
+
+    monkeypatch.setattr(builtins, "input", prompt)
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("flags", [{"assume_yes": True}, {"batch": True}])
+def test_unattended_new_show_is_deferred(flags: dict[str, bool]) -> None:
+    decider = rules.configure(**flags)
+
+    assert _prompt_for_new_show("new_show", "season_01", "new_show_s01e01.mkv", {}) is None
+
+    (entry,) = decider.pending
+    assert (entry["kind"], entry["subject"], entry["file"]) == (
+        "add_show",
+        "new_show",
+        "new_show_s01e01.mkv",
+    )
+    report = json.loads(decider.write_pending_report().read_text())
+    assert [item["subject"] for item in report] == ["new_show"]
+
+
+def test_unattended_new_show_uses_a_matching_rule(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(CONFIG, "shows", {"Television": tmp_path / "tv"})
+    CONFIG.rules_path.write_text(
+        json.dumps({"shows": [{"keywords": ["planet"], "library": "Television", "network": "BBC"}]})
+    )
+    decider = rules.configure(assume_yes=True)
+    new_shows: dict[str, Path] = {}
+
+    dest = _prompt_for_new_show("planet_earth", "season_01", "planet_earth_s01e01.mkv", new_shows)
+
+    assert dest == tmp_path / "tv" / "BBC" / "planet_earth" / "season_01" / "planet_earth_s01e01.mkv"
+    assert new_shows == {"planet_earth": tmp_path / "tv" / "BBC" / "planet_earth"}
+    assert not decider.pending
+
+
+def test_unattended_library_choice_is_deferred(tmp_path: Path) -> None:
+    decider = rules.configure(assume_yes=True)
+    libraries = {"Movies": str(tmp_path / "a"), "Kids": str(tmp_path / "b")}
+
+    assert _choose_library(libraries, "Select a movie library:", "movie.mkv") is None
+    assert [entry["kind"] for entry in decider.pending] == ["movie_library"]
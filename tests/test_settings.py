@@ -0,0 +1,132 @@
+#
+# tests/test_settings.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from filetools import settings
+from filetools.settings import AppConfig, SettingsError, validate_settings
+
+# --------------------------------------------------------------------------------
+# Globals
+# --------------------------------------------------------------------------------
+SETTINGS = {
+    "file_processing": {"extensions": {"valid": [".mkv", ".MP4"]}, "keywords": {"ignore": ["sample"]}},
+    "libraries": {"movies": [{"name": "Movies", "path": "/media/Movies"}]},
+}
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def settings_path(tmp_path: Path) -> Path:
+    """A valid settings file with no cache next to it yet."""
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps(SETTINGS))
+    return path
+
+
+def fail_if_validated(data: object) -> list[str]:
+    """Stand-in for validate_settings() where the cached snapshot must be used."""
+    pytest.fail("settings were validated again instead of loaded from the cache")
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_validation_reports_every_problem() -> None:
+    errors = validate_settings(
+        {"file_processing": {"extensions": {"valid": ".mkv"}}, "pathz": {"rules": "rules.json"}}
+    )
+
+    assert errors == [
+        "file_processing.extensions.valid: expected a list, got str",
+        "unknown setting 'pathz'",
+    ]
+
+
+def test_validation_checks_values() -> None:
+    errors = validate_settings(
+        {
+            "metadata": {"year_range": {"min": 2030, "max": 1900}},
+            "libraries": {
+                "movies": [{"name": "Movies", "path": "media/Movies"}, {"name": "Movies", "path": "/m"}]
+            },
+            "transfers": {"max_per_device": 0},
+        }
+    )
+
+    assert errors == [
+        "metadata.year_range: min is greater than max",
+        "transfers.max_per_device: must be at least 1, got 0",
+        "libraries.movies[0]: path must be absolute, got 'media/Movies'",
+        "libraries.movies[1]: duplicate library name 'Movies'",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("text", "message"),
+    [
+        ("{not json", "is not valid JSON"),
+        ('{"transfers": {"max_per_device": "2"}}', "has invalid settings"),
+    ],
+)
+def test_invalid_settings_file_raises(settings_path: Path, text: str, message: str) -> None:
+    settings_path.write_text(text)
+
+    with pytest.raises(SettingsError, match=message):
+        AppConfig(settings_path)
+
+
+def test_compiled_settings_are_loaded_from_the_cache(
+    settings_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config = AppConfig(settings_path)
+    assert config.valid_suffixes == (".mkv", ".mp4")
+    assert config.movies == {"Movies": Path("/media/Movies")}
+    assert config.cache_path.exists()
+
+    monkeypatch.setattr(settings, "validate_settings", fail_if_validated)
+    cached = AppConfig(settings_path)
+
+    assert vars(cached) == vars(config)
+
+
+def test_touched_settings_file_reuses_the_cache(
+    settings_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    AppConfig(settings_path)
+    st = settings_path.stat()
+    os.utime(settings_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    monkeypatch.setattr(settings, "validate_settings", fail_if_validated)
+
+    assert AppConfig(settings_path).valid_suffixes == (".mkv", ".mp4")
+
+
+def test_changed_settings_file_is_compiled_again(settings_path: Path) -> None:
+    AppConfig(settings_path)
+    settings_path.write_text(json.dumps({**SETTINGS, "transfers": {"max_per_device": 3}}))
+
+    assert AppConfig(settings_path).max_moves_per_device == 3
+
+
+def test_incomplete_cache_is_rebuilt(settings_path: Path) -> None:
+    config = AppConfig(settings_path)
+    cache = json.loads(config.cache_path.read_text())
+    del cache["compiled"]["valid_suffixes"]
+    config.cache_path.write_text(json.dumps(cache))
+
+    assert AppConfig(settings_path).valid_suffixes == (".mkv", ".mp4")
+    assert "valid_suffixes" in json.loads(config.cache_path.read_text())["compiled"]
@@ -0,0 +1,70 @@
+#
+# tests/test_shows_map.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+from pathlib import Path
+
+import pytest
+
+from filetools import CONFIG
+from filetools.shows_map import ShowMap, ShowNameIndex
+
+SHOWS = {
+    "house of cards": Path("/lib/netflix/house of cards"),
+    "dexter new blood": Path("/lib/showtime/dexter new blood"),
+    "star trek discovery": Path("/lib/cbs/star trek discovery"),
+    "the office (us)": Path("/lib/nbc/the office (us)"),
+    "doctor who (2005)": Path("/lib/bbc/doctor who (2005)"),
+    "the wire": Path("/lib/hbo/the wire"),
+}
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("name", ["house", "dexter", "star_trek", "Star.Trek"])
+def test_prefix_of_a_show_is_not_a_match(name: str) -> None:
+    index = ShowNameIndex(SHOWS)
+    assert index.lookup(name) is None
+    assert index.resolve(name) is None
+
+
+@pytest.mark.parametrize(
+    ("name", "show"),
+    [
+        ("House.Of.Cards", "house of cards"),
+        ("the_wire", "the wire"),
+        ("The Office", "the office (us)"),
+        ("doctor_who", "doctor who (2005)"),
+    ],
+)
+def test_exact_and_qualifier_alias_matches(name: str, show: str) -> None:
+    assert ShowNameIndex(SHOWS).lookup(name) == show
+
+
+def test_configured_alias(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(CONFIG, "show_aliases", {"the wire": ["The Wire Baltimore"]})
+    assert ShowNameIndex(SHOWS).lookup("the_wire_baltimore") == "the wire"
+
+
+def test_fuzzy_match_needs_a_close_unambiguous_name() -> None:
+    index = ShowNameIndex(SHOWS)
+    assert index.lookup("star_trek_discovry") is None
+    assert index.resolve("star_trek_discovry") == "star trek discovery"
+    assert index.resolve("the_offices_of_cards") is None
+
+
+def test_show_map_resolve_reads_the_ini(tmp_path: Path) -> None:
+    map_path = tmp_path / "shows_map.ini"
+    map_path.write_text("[Shows]\n" + "".join(f"{name} = {path}\n" for name, path in SHOWS.items()))
+    show_map = ShowMap(map_path)
+
+    assert show_map.resolve("the_office") == SHOWS["the office (us)"]
+    assert show_map.resolve("house") is None
+
+    show_map.add("House", Path("/lib/nbc/house"))
+    assert show_map.resolve("house") == Path("/lib/nbc/house")
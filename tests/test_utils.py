@@ -0,0 +1,108 @@
+#
+# tests/test_utils.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+import os
+from pathlib import Path
+
+import pytest
+
+from filetools.utils import (
+    FILE_DELETABLE,
+    FILE_DOWNLOADING,
+    FILE_EXCLUDED,
+    FILE_IGNORED,
+    FILE_VALID,
+    MATCHER,
+    WORK_TREE_DEPTH,
+    TreeScan,
+    sort_media,
+)
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def make_tree(root: Path) -> None:
+    for folder in ("a", "b", "c"):
+        (root / folder / "Subs").mkdir(parents=True)
+        (root / folder / f"{folder}.mkv").touch()
+        (root / folder / "Subs" / "eng.srt").touch()
+    (root / "loose.mkv").touch()
+
+
+def test_remove_directory_drops_everything_below_it(tmp_path: Path) -> None:
+    make_tree(tmp_path)
+    tree = TreeScan(tmp_path, WORK_TREE_DEPTH)
+    for folder in tree.dirs(tmp_path):
+        tree.files(folder.path)
+    size = len(tree)
+
+    tree.remove(tmp_path / "b")
+
+    assert [entry.name for entry in tree.dirs(tmp_path)] == ["a", "c"]
+    assert tree.files(tmp_path / "b") == []
+    assert not tree.covers(tmp_path / "b")
+    # b, b/Subs and b/b.mkv; Subs/eng.srt is below the snapshot's depth
+    assert len(tree) == size - 3
+    assert [entry.name for entry in tree.files(tmp_path / "a")] == ["a.mkv"]
+
+
+def test_remove_and_move_files(tmp_path: Path) -> None:
+    make_tree(tmp_path)
+    tree = TreeScan(tmp_path, WORK_TREE_DEPTH)
+    tree.files(tmp_path / "a")
+
+    tree.move(tmp_path / "a" / "a.mkv", tmp_path / "a.mkv")
+    tree.remove(tmp_path / "loose.mkv")
+
+    assert [entry.name for entry in tree.files(tmp_path)] == ["a.mkv"]
+    assert tree.files(tmp_path / "a") == []
+
+
+@pytest.mark.parametrize(
+    ("name", "kind"),
+    [
+        ("Show.Party.S01E01.mkv", FILE_VALID),
+        ("Show.Party.S01E01.mkv.part", FILE_DOWNLOADING),
+        ("Show.Partners.S01E01.mkv", FILE_VALID),
+        ("movie.NFO", FILE_DELETABLE),
+        ("Thumbs.db", FILE_DELETABLE),
+        ("Some.Movie.2019.Sample.mkv", FILE_IGNORED),
+        ("Some.Movie.2019.mkv.rar", FILE_IGNORED),
+        ("sample.mkv", FILE_IGNORED),
+        ("Trailer.mkv", FILE_IGNORED),
+    ],
+)
+def test_matcher_match(name: str, kind: str) -> None:
+    assert MATCHER.match(name) == kind
+
+
+@pytest.mark.parametrize(
+    ("name", "kind"),
+    [
+        ("Trailer.Park.Boys.S01E01.mkv", FILE_VALID),
+        ("The.Sample.2020.mkv", FILE_VALID),
+        ("Trailer.mkv", FILE_EXCLUDED),
+        ("movie.srt", FILE_IGNORED),
+        ("Show.Party.S01E01.mkv.part", FILE_IGNORED),
+    ],
+)
+def test_matcher_match_for_sort(name: str, kind: str) -> None:
+    assert MATCHER.match_for_sort(name) == kind
+
+
+def test_sort_media_only_looks_at_videos(tmp_path: Path) -> None:
+    for name in ("Trailer.Park.Boys.S01E01.mkv", "The.Sample.2020.mkv", "notes.txt", "movie.srt"):
+        (tmp_path / name).touch()
+
+    movies, shows = sort_media(list(os.scandir(tmp_path)))
+
+    assert movies == [tmp_path / "The.Sample.2020.mkv"]
+    assert shows == [tmp_path / "Trailer.Park.Boys.S01E01.mkv"]
+    assert (tmp_path / "notes.txt").exists()
+    assert (tmp_path / "movie.srt").exists()
@@ -0,0 +1,121 @@
+#
+# tests/test_watcher.py
+#
+
+# --------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from filetools import CONFIG
+from filetools.watcher import DownloadWatcher
+
+# --------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self: "FakeClock") -> None:
+        self.now = 1000.0
+
+    def __call__(self: "FakeClock") -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def watcher(
+    tmp_path: Path, clock: FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[DownloadWatcher]:
+    # Files written by the tests count as finished as soon as they settle
+    monkeypatch.setattr(CONFIG, "stable_seconds", 0)
+    with DownloadWatcher(tmp_path, settle_seconds=5, clock=clock) as watcher:
+        yield watcher
+
+
+# --------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------
+
+
+def test_single_file_is_reported_once_settled(
+    tmp_path: Path, watcher: DownloadWatcher, clock: FakeClock
+) -> None:
+    movie = tmp_path / "Some.Movie.2019.mkv"
+    movie.write_text("movie")
+
+    assert watcher.poll(0.5) == []
+    clock.now += 5
+    assert watcher.poll(0) == [movie]
+    assert watcher.poll(0) == []
+
+
+def test_folder_is_reported_instead_of_its_files(
+    tmp_path: Path, watcher: DownloadWatcher, clock: FakeClock
+) -> None:
+    folder = tmp_path / "The.Wire.S01E02"
+    folder.mkdir()
+    watcher.poll(0.5)
+    (folder / "The.Wire.S01E02.mkv").write_text("episode")
+
+    assert watcher.poll(0.5) == []
+    clock.now += 5
+    assert watcher.poll(0) == [folder]
+
+
+def test_part_file_holds_back_its_folder(
+    tmp_path: Path, watcher: DownloadWatcher, clock: FakeClock
+) -> None:
+    folder = tmp_path / "Planet.Earth.S01E01"
+    folder.mkdir()
+    part = folder / "Planet.Earth.S01E01.mkv.part"
+    part.write_text("half")
+    watcher.poll(0.5)
+
+    clock.now += 5
+    assert watcher.poll(0) == []
+    clock.now += 60
+    assert watcher.poll(0) == []
+
+    part.rename(folder / "Planet.Earth.S01E01.mkv")
+    assert watcher.poll(0.5) == []
+    clock.now += 5
+    assert watcher.poll(0) == [folder]
+
+
+def test_expected_file_is_not_reported(
+    tmp_path: Path, watcher: DownloadWatcher, clock: FakeClock
+) -> None:
+    renamed = tmp_path / "some_movie_(2019).mkv"
+    watcher.expect([renamed])
+    renamed.write_text("movie")
+
+    watcher.poll(0.5)
+    clock.now += 5
+    assert watcher.poll(0) == []
+
+
+def test_expected_paths_without_events_are_forgotten(
+    tmp_path: Path, watcher: DownloadWatcher, clock: FakeClock
+) -> None:
+    # A debug run reports files it never creates
+    never_created = tmp_path / "never_created.mkv"
+    watcher.expect([never_created])
+
+    clock.now += 6
+    watcher.poll(0)
+    never_created.write_text("a real download by that name")
+
+    watcher.poll(0.5)
+    clock.now += 5
+    assert watcher.poll(0) == [never_created]